@@ -1,16 +1,123 @@
 import os
-from neo4j import GraphDatabase
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from fastapi import Request, Response
+from neo4j import READ_ACCESS, WRITE_ACCESS, AsyncGraphDatabase, Bookmarks
 from dotenv import load_dotenv
 
+from app.database.instrumented import InstrumentedSession
+from app.database.memory_repository import MemoryRepository, SqlitePersistence
+from app.database.neo4j_repository import Neo4jRepository
+
 load_dotenv()
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
 
-neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# "neo4j", or "memory" for the embedded backend. MEMORY_STORE_PATH makes
+# the embedded backend persist to that SQLite file.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "neo4j")
+MEMORY_STORE_PATH = os.getenv("MEMORY_STORE_PATH")
+
+# Opt-in query diagnostics: log statements slower than SLOW_QUERY_MS, and
+# send every statement as PROFILE so /metrics reports db hits.
+SLOW_QUERY_MS = float(os.environ["SLOW_QUERY_MS"]) if os.getenv("SLOW_QUERY_MS") else None
+PROFILE_QUERIES = os.getenv("PROFILE_QUERIES", "").lower() in ("1", "true", "yes")
+
+if STORAGE_BACKEND not in ("neo4j", "memory"):
+    raise RuntimeError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+# Connection pool and managed-transaction retry settings (times in
+# seconds); the driver defaults apply to anything left unset.
+DRIVER_SETTINGS = {
+    "max_connection_pool_size": ("NEO4J_MAX_POOL_SIZE", int),
+    "connection_acquisition_timeout": ("NEO4J_ACQUISITION_TIMEOUT", float),
+    "connection_timeout": ("NEO4J_CONNECTION_TIMEOUT", float),
+    "max_connection_lifetime": ("NEO4J_MAX_CONNECTION_LIFETIME", float),
+    "max_transaction_retry_time": ("NEO4J_MAX_RETRY_TIME", float),
+}
+
+
+def driver_config() -> dict:
+    return {
+        option: convert(os.environ[name])
+        for option, (name, convert) in DRIVER_SETTINGS.items()
+        if os.getenv(name)
+    }
+
+
+neo4j_driver = AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), **driver_config())
+
+# Clients send back the bookmarks of their last write so that a following
+# read, possibly served by a read replica or another API process, waits
+# until it can see that write.
+BOOKMARKS_HEADER = "X-Neo4j-Bookmarks"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Bookmarks of the current request, also used by sessions opened later for
+# a streamed response body.
+_request_bookmarks: ContextVar[tuple[str, ...]] = ContextVar("request_bookmarks", default=())
+
+_memory_repository: Optional[MemoryRepository] = None
+
+
+def memory_repository() -> MemoryRepository:
+    global _memory_repository
+    if _memory_repository is None:
+        persistence = SqlitePersistence(MEMORY_STORE_PATH) if MEMORY_STORE_PATH else None
+        _memory_repository = MemoryRepository(persistence)
+    return _memory_repository
+
+
+def instrumented(session) -> InstrumentedSession:
+    return InstrumentedSession(session, PROFILE_QUERIES, SLOW_QUERY_MS)
+
+
+def parse_bookmarks(value: Optional[str]) -> tuple[str, ...]:
+    if not value:
+        return ()
+    return tuple(bookmark.strip() for bookmark in value.split(",") if bookmark.strip())
+
+
+@asynccontextmanager
+async def open_repository(
+    write: bool = False,
+    on_bookmarks: Optional[Callable[[Bookmarks], None]] = None
+):
+    """A repository on its own session, for work that outlives the request
+    handler (e.g. a streamed response body).
+
+    Auto-commit queries use the read or write access mode; managed
+    transactions pick theirs per call. The session starts from the
+    request's bookmarks and ``on_bookmarks`` receives new ones after every
+    committed transaction.
+    """
+    if STORAGE_BACKEND == "memory":
+        yield memory_repository()
+        return
+    bookmark_manager = AsyncGraphDatabase.bookmark_manager(
+        initial_bookmarks=Bookmarks.from_raw_values(_request_bookmarks.get()), bookmarks_consumer=on_bookmarks
+    )
+    async with neo4j_driver.session(
+        default_access_mode=WRITE_ACCESS if write else READ_ACCESS,
+        bookmark_manager=bookmark_manager
+    ) as session:
+        yield Neo4jRepository(instrumented(session))
+
+
+async def get_repository(request: Request, response: Response):
+    _request_bookmarks.set(parse_bookmarks(request.headers.get(BOOKMARKS_HEADER)))
+
+    def publish(bookmarks: Bookmarks):
+        response.headers[BOOKMARKS_HEADER] = ",".join(sorted(bookmarks.raw_values))
+
+    async with open_repository(request.method not in READ_METHODS, publish) as repo:
+        yield repo
 
 
-def get_db():
-    with neo4j_driver.session() as session:
-        yield session
+async def close_storage():
+    if _memory_repository is not None:
+        _memory_repository.close()
+    await neo4j_driver.close()
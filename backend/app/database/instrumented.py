@@ -0,0 +1,129 @@
+import time
+from typing import Optional
+
+from app.services.instrumentation import record_query, record_query_error
+
+
+class InstrumentedResult:
+    """Counts records and, once the result is exhausted, records the query
+    with the driver's result summary.
+
+    Only time spent inside the driver (``run`` and waiting for each record)
+    is counted, not the caller's work between records.
+    """
+
+    def __init__(self, result, query: str, elapsed: float, slow_query_ms: Optional[float]):
+        self._result = result
+        self._query = query
+        self._elapsed = elapsed
+        self._slow_query_ms = slow_query_ms
+        self._rows = 0
+        self._recorded = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        records = self._result.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                record = await records.__anext__()
+            except StopAsyncIteration:
+                self._elapsed += time.perf_counter() - started
+                break
+            self._elapsed += time.perf_counter() - started
+            self._rows += 1
+            yield record
+        await self._record()
+
+    async def single(self, strict: bool = False):
+        started = time.perf_counter()
+        record = await self._result.single(strict)
+        self._elapsed += time.perf_counter() - started
+        self._rows = 1 if record is not None else 0
+        await self._record()
+        return record
+
+    async def consume(self):
+        started = time.perf_counter()
+        summary = await self._result.consume()
+        self._elapsed += time.perf_counter() - started
+        self._finish(summary)
+        return summary
+
+    async def _record(self):
+        if not self._recorded:
+            await self.consume()
+
+    def _finish(self, summary):
+        if self._recorded:
+            return
+        self._recorded = True
+        record_query(self._query, self._elapsed, self._rows, summary, self._slow_query_ms)
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+
+def _profiled(query: str) -> str:
+    # Administration commands (SHOW ...) cannot be profiled.
+    if query.lstrip().upper().startswith("SHOW"):
+        return query
+    return f"PROFILE {query}"
+
+
+async def _run(runner, query: str, parameters: Optional[dict], kwargs: dict,
+               profile: bool, slow_query_ms: Optional[float]) -> InstrumentedResult:
+    started = time.perf_counter()
+    try:
+        result = await runner.run(_profiled(query) if profile else query, parameters, **kwargs)
+    except Exception:
+        record_query_error(query)
+        raise
+    return InstrumentedResult(result, query, time.perf_counter() - started, slow_query_ms)
+
+
+class InstrumentedTransaction:
+    def __init__(self, tx, profile: bool, slow_query_ms: Optional[float]):
+        self._tx = tx
+        self._profile = profile
+        self._slow_query_ms = slow_query_ms
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs) -> InstrumentedResult:
+        return await _run(self._tx, query, parameters, kwargs, self._profile, self._slow_query_ms)
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+
+class InstrumentedSession:
+    """Wraps a driver session so every ``run`` (including those inside
+    ``execute_read``/``execute_write``) is timed and counted.
+
+    With ``profile`` each statement is sent as ``PROFILE`` so the summary
+    carries db hits; that costs server time and is meant for diagnosis.
+    Queries slower than ``slow_query_ms`` are logged.
+    """
+
+    def __init__(self, session, profile: bool = False, slow_query_ms: Optional[float] = None):
+        self._session = session
+        self._profile = profile
+        self._slow_query_ms = slow_query_ms
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs) -> InstrumentedResult:
+        return await _run(self._session, query, parameters, kwargs, self._profile, self._slow_query_ms)
+
+    def _wrap(self, work):
+        def instrumented_work(tx, *args, **kwargs):
+            return work(InstrumentedTransaction(tx, self._profile, self._slow_query_ms), *args, **kwargs)
+        return instrumented_work
+
+    async def execute_read(self, work, *args, **kwargs):
+        return await self._session.execute_read(self._wrap(work), *args, **kwargs)
+
+    async def execute_write(self, work, *args, **kwargs):
+        return await self._session.execute_write(self._wrap(work), *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
@@ -0,0 +1,560 @@
+import asyncio
+import functools
+import json
+import sqlite3
+import uuid
+from bisect import bisect_right
+from itertools import islice
+from typing import AsyncIterator, Optional
+
+from app.database.repository import BatchOperation, GraphFilter, GraphRepository, NodeRecord, StorageError
+from app.database.search import FULLTEXT_PROPERTIES
+from app.models.schemas import NodeType
+
+# Search weights: a match in the display name counts double.
+_SEARCH_WEIGHTS = {"title": 2.0, "name": 2.0, "description": 1.0, "traits": 1.0}
+
+
+def _natural_key(label: str) -> str:
+    return "title" if label == "Book" else "name"
+
+
+def _clean(properties: dict) -> dict:
+    return {key: value for key, value in properties.items() if value is not None}
+
+
+class SqlitePersistence:
+    """Write-through copy of the in-memory graph in a SQLite file.
+
+    Nodes and relationships are stored as JSON property blobs; the whole
+    file is read back into memory on startup.
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS nodes (
+                id TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                properties TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                properties TEXT NOT NULL
+            );
+        """)
+
+    def load(self) -> tuple[list[tuple[str, dict]], list[dict]]:
+        nodes = [
+            (label, json.loads(properties))
+            for label, properties in self.connection.execute("SELECT label, properties FROM nodes")
+        ]
+        links = [
+            {"id": link_id, "type": rel_type, "source": source, "target": target,
+             "properties": json.loads(properties)}
+            for link_id, rel_type, source, target, properties in self.connection.execute(
+                "SELECT id, type, source, target, properties FROM links"
+            )
+        ]
+        return nodes, links
+
+    def write(
+        self,
+        nodes: list[tuple[str, dict]] = (),
+        links: list[dict] = (),
+        deleted_nodes: list[str] = (),
+        deleted_links: list[str] = ()
+    ):
+        """Apply one change set in a single transaction."""
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO nodes (id, label, properties) VALUES (?, ?, ?)",
+                    [(props["id"], label, json.dumps(props, ensure_ascii=False)) for label, props in nodes]
+                )
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO links (id, type, source, target, properties) VALUES (?, ?, ?, ?, ?)",
+                    [(link["id"], link["type"], link["source"], link["target"],
+                      json.dumps(link["properties"], ensure_ascii=False)) for link in links]
+                )
+                self.connection.executemany("DELETE FROM nodes WHERE id = ?", [(i,) for i in deleted_nodes])
+                self.connection.executemany("DELETE FROM links WHERE id = ?", [(i,) for i in deleted_links])
+        except sqlite3.Error as exc:
+            raise StorageError(str(exc)) from exc
+
+    def close(self):
+        self.connection.close()
+
+
+def _serialized(method):
+    # Writes check the current graph, persist a change set and then apply
+    # it. The persist step awaits a worker thread, so writes hold a lock to
+    # keep another write from interleaving with those steps.
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self._write_lock:
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class MemoryRepository(GraphRepository):
+    """Embedded backend holding the whole graph in process memory.
+
+    Intended for local development, tests and benchmarks without a Neo4j
+    server. Reads run synchronously on the event loop. With
+    ``persistence`` set every write is also committed to SQLite, in a
+    worker thread, before the call returns and before the in-memory graph
+    changes; writes are serialized so each stays atomic with respect to
+    other requests.
+    """
+
+    def __init__(self, persistence: Optional[SqlitePersistence] = None):
+        self.persistence = persistence
+        self._write_lock = asyncio.Lock()
+        self.nodes: dict[str, NodeRecord] = {}
+        self.links: dict[str, dict] = {}
+        # node id -> ids of its relationships, in creation order
+        self.adjacency: dict[str, dict[str, None]] = {}
+        # (label, natural key) -> node ids
+        self.keys: dict[tuple[str, str], dict[str, None]] = {}
+        # (source, target, type) -> relationship id, for merges
+        self.link_keys: dict[tuple[str, str, str], str] = {}
+        # label -> sorted node ids, rebuilt lazily for keyset paging
+        self._order: dict[str, list[str]] = {}
+        if persistence is not None:
+            nodes, links = persistence.load()
+            for label, properties in nodes:
+                self._put_node(label, properties)
+            for link in links:
+                self._put_link(link)
+
+    # Index maintenance
+
+    def _put_node(self, label: str, properties: dict):
+        previous = self.nodes.get(properties["id"])
+        if previous is not None:
+            self._drop_key(previous)
+        self.nodes[properties["id"]] = (label, properties)
+        self.adjacency.setdefault(properties["id"], {})
+        key = properties.get(_natural_key(label))
+        if key is not None:
+            self.keys.setdefault((label, key), {})[properties["id"]] = None
+        if previous is None:
+            self._order.pop(label, None)
+
+    def _drop_key(self, record: NodeRecord):
+        label, properties = record
+        key = properties.get(_natural_key(label))
+        ids = self.keys.get((label, key))
+        if ids is not None:
+            ids.pop(properties["id"], None)
+            if not ids:
+                del self.keys[(label, key)]
+
+    def _put_link(self, link: dict):
+        self.links[link["id"]] = link
+        self.adjacency.setdefault(link["source"], {})[link["id"]] = None
+        self.adjacency.setdefault(link["target"], {})[link["id"]] = None
+        self.link_keys[(link["source"], link["target"], link["type"])] = link["id"]
+
+    def _drop_link(self, rel_id: str) -> Optional[dict]:
+        link = self.links.pop(rel_id, None)
+        if link is None:
+            return None
+        self.adjacency.get(link["source"], {}).pop(rel_id, None)
+        self.adjacency.get(link["target"], {}).pop(rel_id, None)
+        if self.link_keys.get((link["source"], link["target"], link["type"])) == rel_id:
+            del self.link_keys[(link["source"], link["target"], link["type"])]
+        return link
+
+    def _drop_node(self, node_id: str):
+        label, _ = self.nodes[node_id]
+        self._drop_key(self.nodes.pop(node_id))
+        self.adjacency.pop(node_id, None)
+        self._order.pop(label, None)
+
+    async def _persist(self, **changes):
+        if self.persistence is not None:
+            await asyncio.to_thread(self.persistence.write, **changes)
+
+    def _find(self, label: str, node_id: str) -> Optional[dict]:
+        record = self.nodes.get(node_id)
+        if record is None or record[0] != label:
+            return None
+        return record[1]
+
+    @staticmethod
+    def _project(properties: dict, full_properties: bool) -> dict:
+        if full_properties:
+            return dict(properties)
+        return {field: properties[field] for field in ("id", "title", "name") if properties.get(field) is not None}
+
+    # Nodes
+
+    @_serialized
+    async def create_node(self, label: str, properties: dict) -> dict:
+        node = {"id": str(uuid.uuid4()), **_clean(properties)}
+        await self._persist(nodes=[(label, node)])
+        self._put_node(label, node)
+        return dict(node)
+
+    async def get_node(self, label: str, node_id: str) -> Optional[dict]:
+        node = self._find(label, node_id)
+        return dict(node) if node is not None else None
+
+    @_serialized
+    async def update_node(self, label: str, node_id: str, updates: dict) -> Optional[dict]:
+        node = self._find(label, node_id)
+        if node is None:
+            return None
+        updated = _clean({**node, **updates})
+        await self._persist(nodes=[(label, updated)])
+        self._put_node(label, updated)
+        return dict(updated)
+
+    @_serialized
+    async def delete_node(self, label: str, node_id: str) -> Optional[list[str]]:
+        if self._find(label, node_id) is None:
+            return None
+        link_ids = list(self.adjacency.get(node_id, {}))
+        await self._persist(deleted_nodes=[node_id], deleted_links=link_ids)
+        for link_id in link_ids:
+            self._drop_link(link_id)
+        self._drop_node(node_id)
+        return link_ids
+
+    async def list_nodes(self, label: str, fields: list[str], cursor: Optional[str], limit: int) -> list[dict]:
+        return [row async for row in self.iter_nodes_page(label, fields, cursor, limit)]
+
+    async def iter_nodes_page(
+        self, label: str, fields: list[str], cursor: Optional[str], limit: Optional[int]
+    ) -> AsyncIterator[dict]:
+        order = self._order.get(label)
+        if order is None:
+            order = self._order[label] = sorted(
+                node_id for node_id, (node_label, _) in self.nodes.items() if node_label == label
+            )
+        start = bisect_right(order, cursor) if cursor else 0
+        stop = len(order) if limit is None else start + limit
+        # The id list is replaced, not mutated, on writes, so iterating it
+        # while the consumer awaits is safe; deleted nodes are skipped.
+        for node_id in islice(order, start, stop):
+            node = self.nodes.get(node_id)
+            if node is not None:
+                yield {field: node[1].get(field) for field in fields}
+
+    async def get_nodes(self, ids: list[str], full_properties: bool = True) -> list[NodeRecord]:
+        return [
+            (self.nodes[node_id][0], self._project(self.nodes[node_id][1], full_properties))
+            for node_id in ids if node_id in self.nodes
+        ]
+
+    # Relationships
+
+    @_serialized
+    async def create_relationship(
+        self, source_id: str, target_id: str, rel_type: str, properties: dict
+    ) -> Optional[dict]:
+        if source_id not in self.nodes or target_id not in self.nodes:
+            return None
+        rel_id = str(uuid.uuid4())
+        link = {
+            "id": rel_id,
+            "type": rel_type,
+            "source": source_id,
+            "target": target_id,
+            "properties": {**_clean(properties), "id": rel_id},
+        }
+        await self._persist(links=[link])
+        self._put_link(link)
+        return {"id": link["id"], "source": source_id, "target": target_id, "properties": dict(link["properties"])}
+
+    @_serialized
+    async def delete_relationship(self, rel_id: str) -> bool:
+        if rel_id not in self.links:
+            return False
+        await self._persist(deleted_links=[rel_id])
+        self._drop_link(rel_id)
+        return True
+
+    # Graph reads
+
+    async def load_graph(self, graph_filter: GraphFilter) -> tuple[list[NodeRecord], list[dict]]:
+        nodes = [node async for node in self.iter_graph_nodes(graph_filter)]
+        links = [link async for link in self.iter_graph_links(graph_filter)]
+        return nodes, links
+
+    async def iter_graph_nodes(self, graph_filter: GraphFilter) -> AsyncIterator[NodeRecord]:
+        # Iterate over a copy of the references so writes made while the
+        # consumer awaits do not break the iteration.
+        for label, properties in list(self.nodes.values()):
+            if graph_filter.matches(label, properties):
+                yield label, dict(properties)
+
+    def _link_matches(self, link: dict, graph_filter: GraphFilter) -> bool:
+        if graph_filter.relation_types and link["type"] not in graph_filter.relation_types:
+            return False
+        if not graph_filter.restricts_nodes():
+            return True
+        source = self.nodes.get(link["source"])
+        target = self.nodes.get(link["target"])
+        return (source is not None and target is not None
+                and graph_filter.matches(*source) and graph_filter.matches(*target))
+
+    async def iter_graph_links(self, graph_filter: GraphFilter) -> AsyncIterator[dict]:
+        for link in list(self.links.values()):
+            if self._link_matches(link, graph_filter):
+                yield {"source": link["source"], "target": link["target"], "type": link["type"],
+                       "properties": dict(link["properties"])}
+
+    async def load_topology(self) -> tuple[list[NodeRecord], list[tuple[str, str, str]]]:
+        nodes = [(label, self._project(properties, False)) for label, properties in self.nodes.values()]
+        links = [(link["source"], link["target"], link["type"]) for link in self.links.values()]
+        return nodes, links
+
+    async def search(
+        self, text: str, node_types: Optional[list[str]], skip: int, limit: int
+    ) -> list[tuple[str, dict, float]]:
+        # A linear scan standing in for the full-text index: every term
+        # contained in a searchable property adds that property's weight.
+        terms = text.lower().split()
+        if not terms:
+            return []
+        matches = []
+        for label, properties in self.nodes.values():
+            if node_types and label not in node_types:
+                continue
+            score = 0.0
+            for prop in FULLTEXT_PROPERTIES:
+                value = properties.get(prop)
+                if value is None:
+                    continue
+                value = str(value).lower()
+                score += sum(_SEARCH_WEIGHTS[prop] for term in terms if term in value)
+            if score:
+                matches.append((label, dict(properties), score))
+        matches.sort(key=lambda match: -match[2])
+        return matches[skip:skip + limit]
+
+    async def neighbors(self, node_id: str) -> list[dict]:
+        neighbors = []
+        for link_id in self.adjacency.get(node_id, {}):
+            link = self.links[link_id]
+            is_outgoing = link["source"] == node_id
+            label, properties = self.nodes[link["target"] if is_outgoing else link["source"]]
+            neighbors.append({
+                "label": label,
+                "properties": dict(properties),
+                "relation_type": link["type"],
+                "is_outgoing": is_outgoing,
+            })
+        return neighbors
+
+    async def expand(
+        self,
+        frontier: list[str],
+        relation_types: Optional[list[str]],
+        fanout: int,
+        full_properties: bool
+    ) -> list[dict]:
+        rows = []
+        for node_id in frontier:
+            followed = 0
+            for link_id in self.adjacency.get(node_id, {}):
+                if followed >= fanout:
+                    break
+                link = self.links[link_id]
+                if relation_types and link["type"] not in relation_types:
+                    continue
+                followed += 1
+                other = link["target"] if link["source"] == node_id else link["source"]
+                label, properties = self.nodes[other]
+                rows.append({
+                    "source": link["source"],
+                    "target": link["target"],
+                    "type": link["type"],
+                    "rel_props": dict(link["properties"]),
+                    "label": label,
+                    "props": self._project(properties, full_properties),
+                })
+        return rows
+
+    # Bulk import
+
+    @_serialized
+    async def merge_nodes(self, label: str, rows: list[dict]) -> list[tuple[dict, bool]]:
+        key_field = _natural_key(label)
+        staged: dict[str, dict] = {}
+        # Later rows with the same key update the node created by an
+        # earlier one, as consecutive MERGEs would.
+        created_ids: dict[str, str] = {}
+        written = []
+        for row in rows:
+            key = row[key_field]
+            node_ids = list(self.keys.get((label, key), ()))
+            if not node_ids and key in created_ids:
+                node_ids = [created_ids[key]]
+            if not node_ids:
+                node_id = created_ids[key] = str(uuid.uuid4())
+                staged[node_id] = _clean({"id": node_id, **row})
+                written.append((staged[node_id], True))
+                continue
+            for node_id in node_ids:
+                base = staged[node_id] if node_id in staged else self.nodes[node_id][1]
+                staged[node_id] = _clean({**base, **row})
+                written.append((staged[node_id], False))
+
+        await self._persist(nodes=[(label, properties) for properties in staged.values()])
+        for properties in staged.values():
+            self._put_node(label, properties)
+        return [(dict(properties), created) for properties, created in written]
+
+    @_serialized
+    async def merge_relationships(self, rows: list[dict]) -> list[tuple[str, dict, bool]]:
+        pending: dict[tuple[str, str, str], dict] = {}
+        written = []
+        for row in rows:
+            if self._find(row["source_label"], row["source"]) is None:
+                continue
+            if self._find(row["target_label"], row["target"]) is None:
+                continue
+            link_key = (row["source"], row["target"], row["type"])
+            created = False
+            if link_key in self.link_keys:
+                link = self.links[self.link_keys[link_key]]
+            elif link_key in pending:
+                link = pending[link_key]
+            else:
+                rel_id = str(uuid.uuid4())
+                link = pending[link_key] = {
+                    "id": rel_id,
+                    "type": row["type"],
+                    "source": row["source"],
+                    "target": row["target"],
+                    "properties": {"id": rel_id},
+                }
+                created = True
+            written.append((row["type"], {
+                "id": link["id"],
+                "source": link["source"],
+                "target": link["target"],
+                "props": dict(link["properties"]),
+            }, created))
+
+        await self._persist(links=list(pending.values()))
+        for link in pending.values():
+            self._put_link(link)
+        return written
+
+    async def load_keys(self, keys: Optional[list[str]] = None) -> list[tuple[str, str, str]]:
+        if keys is None:
+            return [
+                (label, properties.get(_natural_key(label)), node_id)
+                for node_id, (label, properties) in self.nodes.items()
+            ]
+        return [
+            (node_type.value, key, node_id)
+            for key in keys
+            for node_type in NodeType
+            for node_id in self.keys.get((node_type.value, key), ())
+        ]
+
+    # Batches
+
+    @_serialized
+    async def apply_batch(self, operations: list[BatchOperation], atomic: bool) -> tuple[list, bool]:
+        # Every operation is first applied to a staged view on top of the
+        # current graph, so the whole batch can be checked, persisted in one
+        # SQLite transaction and only then made visible.
+        nodes: dict[str, NodeRecord] = {}
+        links: dict[str, dict] = {}
+        staged_adjacency: dict[str, list[str]] = {}
+        deleted_nodes: dict[str, None] = {}
+        deleted_links: dict[str, None] = {}
+
+        def find(label: Optional[str], node_id: str) -> Optional[NodeRecord]:
+            if node_id in deleted_nodes:
+                return None
+            record = nodes.get(node_id) or self.nodes.get(node_id)
+            if record is None or (label is not None and record[0] != label):
+                return None
+            return record
+
+        outcomes = []
+        for op in operations:
+            outcome = None
+            if op.action == "create_node":
+                nodes[op.id] = (op.label, _clean(op.properties))
+                outcome = dict(nodes[op.id][1])
+            elif op.action == "update_node":
+                record = find(op.label, op.id)
+                if record is not None:
+                    nodes[op.id] = (op.label, _clean({**record[1], **op.properties}))
+                    outcome = dict(nodes[op.id][1])
+            elif op.action == "create_relationship":
+                if find(None, op.source) and find(None, op.target):
+                    links[op.id] = {
+                        "id": op.id,
+                        "type": op.label,
+                        "source": op.source,
+                        "target": op.target,
+                        "properties": _clean(op.properties),
+                    }
+                    staged_adjacency.setdefault(op.source, []).append(op.id)
+                    staged_adjacency.setdefault(op.target, []).append(op.id)
+                    outcome = {"id": op.id, "source": op.source, "target": op.target,
+                               "properties": dict(links[op.id]["properties"])}
+            elif op.action == "delete_relationship":
+                if op.id not in deleted_links and (op.id in links or op.id in self.links):
+                    deleted_links[op.id] = None
+                    outcome = True
+            elif op.action == "delete_node":
+                if find(op.label, op.id) is not None:
+                    outcome = [
+                        link_id
+                        for link_id in [*self.adjacency.get(op.id, {}), *staged_adjacency.get(op.id, [])]
+                        if link_id not in deleted_links
+                    ]
+                    deleted_links.update(dict.fromkeys(outcome))
+                    deleted_nodes[op.id] = None
+            outcomes.append(outcome)
+
+        if atomic and any(outcome is None for outcome in outcomes):
+            return outcomes, False
+        await self._persist(
+            nodes=list(nodes.values()),
+            links=list(links.values()),
+            deleted_nodes=list(deleted_nodes),
+            deleted_links=list(deleted_links)
+        )
+        for label, properties in nodes.values():
+            self._put_node(label, properties)
+        for link in links.values():
+            self._put_link(link)
+        for link_id in deleted_links:
+            self._drop_link(link_id)
+        for node_id in deleted_nodes:
+            self._drop_node(node_id)
+        return outcomes, True
+
+    # Administration
+
+    async def schema_state(self) -> dict:
+        return {
+            "backend": "memory",
+            "persistent": self.persistence is not None,
+            "nodes": len(self.nodes),
+            "links": len(self.links),
+            "constraints": [],
+            "indexes": [],
+            "online": True,
+        }
+
+    def close(self):
+        if self.persistence is not None:
+            self.persistence.close()
@@ -0,0 +1,545 @@
+from typing import AsyncIterator, Optional
+
+from neo4j.exceptions import DriverError, Neo4jError
+
+from app.database.repository import BatchOperation, GraphFilter, GraphRepository, NodeRecord, StorageError
+from app.database.resolver import (
+    node_by_key_match, node_by_row_id_match, node_labels, node_match,
+    relationship_by_row_id_match, relationship_match, relationship_types
+)
+from app.database.schema import get_schema_state
+from app.database.search import FULLTEXT_INDEX, build_fulltext_query
+from app.models.schemas import NodeType
+
+AUTHOR_BATCH_QUERY = """
+UNWIND $rows AS row
+MERGE (a:Author {name: row.name})
+WITH a, row, a.id IS NULL AS created
+SET a.id = coalesce(a.id, randomUUID()),
+    a.birth_year = row.birth_year,
+    a.death_year = row.death_year,
+    a.nationality = row.nationality
+RETURN a AS n, created
+"""
+
+BOOK_BATCH_QUERY = """
+UNWIND $rows AS row
+MERGE (b:Book {title: row.title})
+WITH b, row, b.id IS NULL AS created
+SET b.id = coalesce(b.id, randomUUID()),
+    b.publication_year = row.publication_year,
+    b.genre = row.genre,
+    b.description = row.description
+RETURN b AS n, created
+"""
+
+MERGE_QUERIES = {
+    "Author": AUTHOR_BATCH_QUERY,
+    "Book": BOOK_BATCH_QUERY,
+}
+
+
+def relationship_batch_query(rel_type: str, source_label: str, target_label: str) -> str:
+    # Labels and the relationship type cannot be parameterized, so rows are
+    # grouped by them and the (validated) names are formatted into the
+    # statement. Endpoints arrive as ids, so each is one unique-index seek.
+    return f"""
+UNWIND $rows AS row
+MATCH (a:{source_label} {{id: row.source}})
+MATCH (b:{target_label} {{id: row.target}})
+MERGE (a)-[r:{rel_type}]->(b)
+WITH a, b, r, r.id IS NULL AS created
+SET r.id = coalesce(r.id, randomUUID())
+RETURN r.id AS id, a.id AS source, b.id AS target, properties(r) AS props, created
+"""
+
+
+KEYS_QUERY = """
+MATCH (n) WHERE n.id IS NOT NULL
+RETURN labels(n)[0] AS label, CASE WHEN n:Book THEN n.title ELSE n.name END AS key, n.id AS id
+"""
+
+SELECTED_KEYS_QUERY = f"""
+UNWIND $keys AS key
+WITH {{key: key}} AS row
+{node_by_key_match("n", "key")}
+RETURN labels(n)[0] AS label, row.key AS key, n.id AS id
+"""
+
+
+async def _write_nodes(tx, query: str, rows: list[dict]) -> list[tuple[dict, bool]]:
+    result = await tx.run(query, rows=rows)
+    return [(dict(record["n"]), record["created"]) async for record in result]
+
+
+async def _write_relationships(tx, rows: list[dict]) -> list[tuple[str, dict, bool]]:
+    groups: dict[tuple[str, str, str], list[dict]] = {}
+    for row in rows:
+        groups.setdefault((row["type"], row["source_label"], row["target_label"]), []).append(row)
+    written = []
+    for (rel_type, source_label, target_label), group in groups.items():
+        result = await tx.run(relationship_batch_query(rel_type, source_label, target_label), rows=group)
+        written.extend([(rel_type, record.data(), record["created"]) async for record in result])
+    return written
+
+
+# One UNWIND statement per (action, label or type) group of a batch; every
+# statement returns the index of each row it applied, so rows that matched
+# nothing are the ones missing from the results.
+BATCH_QUERIES = {
+    "create_node": lambda label: f"""
+UNWIND $rows AS row
+CREATE (n:{label})
+SET n = row.properties
+RETURN row.i AS i, properties(n) AS outcome
+""",
+    "update_node": lambda label: f"""
+UNWIND $rows AS row
+MATCH (n:{label} {{id: row.id}})
+SET n += row.properties
+RETURN row.i AS i, properties(n) AS outcome
+""",
+    "create_relationship": lambda rel_type: f"""
+UNWIND $rows AS row
+{node_by_row_id_match("a", "row", "source")}
+{node_by_row_id_match("b", "row", "target")}
+CREATE (a)-[r:{rel_type}]->(b)
+SET r = row.properties
+RETURN row.i AS i, {{id: r.id, source: a.id, target: b.id, properties: properties(r)}} AS outcome
+""",
+    "delete_relationship": lambda _: f"""
+UNWIND $rows AS row
+{relationship_by_row_id_match("r", "row", "id")}
+DELETE r
+RETURN row.i AS i, true AS outcome
+""",
+    "delete_node": lambda label: f"""
+UNWIND $rows AS row
+MATCH (n:{label} {{id: row.id}})
+WITH row, n, [(n)-[r]-() | r.id] AS link_ids
+DETACH DELETE n
+RETURN row.i AS i, link_ids AS outcome
+""",
+}
+
+
+class _RolledBack(Exception):
+    def __init__(self, outcomes: list):
+        self.outcomes = outcomes
+
+
+async def _write_batch(tx, operations: list[BatchOperation], atomic: bool) -> list:
+    groups: dict[tuple[str, Optional[str]], list[dict]] = {}
+    for i, op in enumerate(operations):
+        label = op.label if op.action != "delete_relationship" else None
+        groups.setdefault((op.action, label), []).append({
+            "i": i, "id": op.id, "properties": op.properties, "source": op.source, "target": op.target,
+        })
+    outcomes = [None] * len(operations)
+    # Operations arrive ordered by action, so the groups run in that order.
+    for (action, label), rows in groups.items():
+        result = await tx.run(BATCH_QUERIES[action](label), rows=rows)
+        async for record in result:
+            outcomes[record["i"]] = record["outcome"]
+    if atomic and any(outcome is None for outcome in outcomes):
+        raise _RolledBack(outcomes)
+    return outcomes
+
+
+async def _fetch(tx, *statements: tuple[str, dict]) -> list[list]:
+    """Every record of each statement, read inside one transaction."""
+    results = []
+    for query, params in statements:
+        result = await tx.run(query, params)
+        results.append([record async for record in result])
+    return results
+
+
+def _present(props: dict) -> dict:
+    # Map projections yield null for keys a node lacks (``name`` on a book,
+    # ``title`` on an author); lean responses leave those keys out.
+    return {key: value for key, value in props.items() if value is not None}
+
+
+def _node_type(labels: list[str]) -> str:
+    return labels[0] if labels else "Unknown"
+
+
+def _page_query(label: str, fields: list[str], cursor: Optional[str], limit: Optional[int]) -> str:
+    # Ordering and the cursor predicate both use the id uniqueness
+    # index, so every page costs the same regardless of its position.
+    projection = ", ".join(f".{field}" for field in fields)
+    predicate = "n.id > $cursor" if cursor else "n.id IS NOT NULL"
+    return f"""
+    MATCH (n:{label})
+    WHERE {predicate}
+    RETURN n {{{projection}}} AS row
+    ORDER BY n.id
+    {"LIMIT $limit" if limit is not None else ""}
+    """
+
+
+def _label_predicates(graph_filter: GraphFilter, var: str) -> dict[str, list[str]]:
+    """The conditions on ``var`` per included label. Each compares one
+    indexed property (see ``PROPERTY_INDEXES``), so every label branch is
+    an index seek or range scan rather than a filter over all nodes."""
+    labels = graph_filter.node_types or [node_type.value for node_type in NodeType]
+    predicates: dict[str, list[str]] = {label: [] for label in labels}
+    if "Book" in predicates:
+        if graph_filter.year_from is not None:
+            predicates["Book"].append(f"{var}.publication_year >= $year_from")
+        if graph_filter.year_to is not None:
+            predicates["Book"].append(f"{var}.publication_year <= $year_to")
+        if graph_filter.genres:
+            predicates["Book"].append(f"{var}.genre IN $genres")
+    if "Author" in predicates and graph_filter.nationalities:
+        predicates["Author"].append(f"{var}.nationality IN $nationalities")
+    return predicates
+
+
+def _filter_params(graph_filter: GraphFilter) -> dict:
+    return {
+        "year_from": graph_filter.year_from,
+        "year_to": graph_filter.year_to,
+        "genres": graph_filter.genres,
+        "nationalities": graph_filter.nationalities,
+    }
+
+
+def _graph_nodes_match(graph_filter: GraphFilter) -> str:
+    """Cypher binding ``n`` to every node matching the filter."""
+    if not graph_filter.restricts_nodes():
+        return "MATCH (n)"
+    branches = []
+    for label, conditions in _label_predicates(graph_filter, "x").items():
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        branches.append(f"MATCH (x:{label}){where} RETURN x AS n")
+    return "CALL {\n    " + "\n    UNION ALL\n    ".join(branches) + "\n}"
+
+
+def _graph_links_match(graph_filter: GraphFilter) -> str:
+    """Cypher binding ``r`` to each relationship from ``n`` whose other
+    end ``m`` also matches the filter."""
+    rel_pattern = f":{'|'.join(graph_filter.relation_types)}" if graph_filter.relation_types else ""
+    match = f"MATCH (n)-[r{rel_pattern}]->(m)"
+    if not graph_filter.restricts_nodes():
+        return match
+    member = " OR ".join(
+        f"(m:{label}" + "".join(f" AND {condition}" for condition in conditions) + ")"
+        for label, conditions in _label_predicates(graph_filter, "m").items()
+    )
+    return f"{match}\n    WHERE {member}"
+
+
+def _subgraph_query(graph_filter: GraphFilter) -> str:
+    # One statement: the filtered nodes, each with its outgoing links to
+    # other filtered nodes, so no link can point outside the node set.
+    return f"""
+{_graph_nodes_match(graph_filter)}
+CALL {{
+    WITH n
+    {_graph_links_match(graph_filter)}
+    RETURN collect({{source: n.id, target: m.id, type: type(r), props: properties(r)}}) AS links
+}}
+RETURN n, labels(n) as labels, links
+"""
+
+
+def _graph_node_query(graph_filter: GraphFilter) -> str:
+    return f"{_graph_nodes_match(graph_filter)}\nRETURN n, labels(n) as labels"
+
+
+def _graph_link_query(graph_filter: GraphFilter) -> str:
+    return f"""
+{_graph_nodes_match(graph_filter)}
+{_graph_links_match(graph_filter)}
+RETURN n.id as source, m.id as target, type(r) as type, properties(r) as props
+"""
+
+
+def _graph_node(record) -> NodeRecord:
+    node_type = _node_type(record["labels"])
+    node_labels.put(record["n"]["id"], node_type)
+    return node_type, dict(record["n"])
+
+
+def _graph_link(record) -> dict:
+    return {
+        "source": record["source"],
+        "target": record["target"],
+        "type": record["type"],
+        "properties": record["props"],
+    }
+
+
+class Neo4jRepository(GraphRepository):
+    """Runs every operation as Cypher on one Neo4j session.
+
+    Reads and writes go through managed transactions (``execute_read`` /
+    ``execute_write``), so the driver routes reads to read replicas on a
+    cluster and retries transient failures. Only the streaming iterators
+    use auto-commit queries, which cannot be retried once records have been
+    handed out; they follow the session's default access mode.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def _transaction(self, execute, work, *args):
+        # Driver and server failures surface as StorageError, as they do
+        # from every other backend.
+        try:
+            return await execute(work, *args)
+        except (Neo4jError, DriverError) as exc:
+            raise StorageError(str(exc)) from exc
+
+    async def _read(self, query: str, **params) -> list:
+        (records,) = await self._transaction(self.session.execute_read, _fetch, (query, params))
+        return records
+
+    async def _write(self, query: str, **params) -> list:
+        (records,) = await self._transaction(self.session.execute_write, _fetch, (query, params))
+        return records
+
+    async def create_node(self, label: str, properties: dict) -> dict:
+        query = f"CREATE (n:{label} {{id: randomUUID()}}) SET n += $properties RETURN n"
+        records = await self._write(query, properties=properties)
+        node = dict(records[0]["n"])
+        node_labels.put(node["id"], label)
+        return node
+
+    async def get_node(self, label: str, node_id: str) -> Optional[dict]:
+        records = await self._read(f"MATCH (n:{label} {{id: $id}}) RETURN n", id=node_id)
+        return dict(records[0]["n"]) if records else None
+
+    async def update_node(self, label: str, node_id: str, updates: dict) -> Optional[dict]:
+        assignments = ", ".join(f"n.{key} = ${key}" for key in updates)
+        query = f"MATCH (n:{label} {{id: $id}}) SET {assignments} RETURN n"
+        records = await self._write(query, id=node_id, **updates)
+        return dict(records[0]["n"]) if records else None
+
+    async def delete_node(self, label: str, node_id: str) -> Optional[list[str]]:
+        query = f"""
+    MATCH (n:{label} {{id: $id}})
+    WITH n, [(n)-[r]-() | r.id] AS link_ids
+    DETACH DELETE n
+    RETURN link_ids
+    """
+        records = await self._write(query, id=node_id)
+        if not records:
+            return None
+        link_ids = records[0]["link_ids"]
+        node_labels.discard(node_id)
+        for link_id in link_ids:
+            relationship_types.discard(link_id)
+        return link_ids
+
+    async def list_nodes(self, label: str, fields: list[str], cursor: Optional[str], limit: int) -> list[dict]:
+        records = await self._read(_page_query(label, fields, cursor, limit), cursor=cursor, limit=limit)
+        return [record["row"] for record in records]
+
+    async def iter_nodes_page(
+        self, label: str, fields: list[str], cursor: Optional[str], limit: Optional[int]
+    ) -> AsyncIterator[dict]:
+        result = await self.session.run(_page_query(label, fields, cursor, limit), cursor=cursor, limit=limit)
+        async for record in result:
+            yield record["row"]
+
+    async def get_nodes(self, ids: list[str], full_properties: bool = True) -> list[NodeRecord]:
+        props = "properties(n)" if full_properties else "n {.id, .title, .name}"
+        query = f"""
+    UNWIND $ids AS id
+    {node_by_row_id_match("n")}
+    RETURN {props} AS props, labels(n) AS labels
+    """
+        nodes = []
+        for record in await self._read(query, ids=ids):
+            node_type = _node_type(record["labels"])
+            node_labels.put(record["props"]["id"], node_type)
+            nodes.append((node_type, _present(record["props"])))
+        return nodes
+
+    async def create_relationship(
+        self, source_id: str, target_id: str, rel_type: str, properties: dict
+    ) -> Optional[dict]:
+        query = f"""
+    {node_match("a", "source_id", source_id)}
+    {node_match("b", "target_id", target_id)}
+    CREATE (a)-[r:{rel_type} {{id: randomUUID()}}]->(b)
+    SET r += $properties
+    RETURN r, a.id as source, b.id as target
+    """
+        records = await self._write(query, source_id=source_id, target_id=target_id, properties=properties)
+        if not records:
+            return None
+        record = records[0]
+        relationship_types.put(record["r"]["id"], rel_type)
+        return {
+            "id": record["r"]["id"],
+            "source": record["source"],
+            "target": record["target"],
+            "properties": dict(record["r"]),
+        }
+
+    async def delete_relationship(self, rel_id: str) -> bool:
+        query = f"""
+    {relationship_match("r", "id", rel_id)}
+    DELETE r
+    RETURN count(r) as deleted
+    """
+        records = await self._write(query, id=rel_id)
+        if records and records[0]["deleted"] > 0:
+            relationship_types.discard(rel_id)
+            return True
+        return False
+
+    async def load_graph(self, graph_filter: GraphFilter) -> tuple[list[NodeRecord], list[dict]]:
+        records = await self._read(_subgraph_query(graph_filter), **_filter_params(graph_filter))
+        nodes = [_graph_node(record) for record in records]
+        links = [_graph_link(link) for record in records for link in record["links"]]
+        return nodes, links
+
+    async def iter_graph_nodes(self, graph_filter: GraphFilter) -> AsyncIterator[NodeRecord]:
+        result = await self.session.run(_graph_node_query(graph_filter), _filter_params(graph_filter))
+        async for record in result:
+            yield _graph_node(record)
+
+    async def iter_graph_links(self, graph_filter: GraphFilter) -> AsyncIterator[dict]:
+        result = await self.session.run(_graph_link_query(graph_filter), _filter_params(graph_filter))
+        async for record in result:
+            yield _graph_link(record)
+
+    async def load_topology(self) -> tuple[list[NodeRecord], list[tuple[str, str, str]]]:
+        node_records, link_records = await self._transaction(
+            self.session.execute_read,
+            _fetch,
+            ("MATCH (n) WHERE n.id IS NOT NULL RETURN n {.id, .title, .name} AS props, labels(n)[0] AS type", {}),
+            ("MATCH (a)-[r]->(b) RETURN a.id AS source, b.id AS target, type(r) AS type", {}),
+        )
+        nodes = [(record["type"], _present(record["props"])) for record in node_records]
+        links = [(record["source"], record["target"], record["type"]) for record in link_records]
+        return nodes, links
+
+    async def search(
+        self, text: str, node_types: Optional[list[str]], skip: int, limit: int
+    ) -> list[tuple[str, dict, float]]:
+        fulltext_query = build_fulltext_query(text)
+        if not fulltext_query:
+            return []
+        query = """
+    CALL db.index.fulltext.queryNodes($index, $search_term) YIELD node AS n, score
+    WHERE $types IS NULL OR any(label IN labels(n) WHERE label IN $types)
+    RETURN n, labels(n) as labels, score
+    SKIP $skip
+    LIMIT $limit
+    """
+        records = await self._read(query,
+                                   index=FULLTEXT_INDEX,
+                                   search_term=fulltext_query,
+                                   types=node_types,
+                                   skip=skip,
+                                   limit=limit)
+        matches = []
+        for record in records:
+            node_type = _node_type(record["labels"])
+            node_labels.put(record["n"]["id"], node_type)
+            matches.append((node_type, dict(record["n"]), record["score"]))
+        return matches
+
+    async def neighbors(self, node_id: str) -> list[dict]:
+        query = f"""
+    {node_match("n", "id", node_id)}
+    MATCH (n)-[r]-(neighbor)
+    RETURN neighbor, labels(neighbor) as labels, type(r) as relation_type,
+           startNode(r).id = $id as is_outgoing
+    """
+        neighbors = []
+        for record in await self._read(query, id=node_id):
+            node_type = _node_type(record["labels"])
+            node_labels.put(record["neighbor"]["id"], node_type)
+            neighbors.append({
+                "label": node_type,
+                "properties": dict(record["neighbor"]),
+                "relation_type": record["relation_type"],
+                "is_outgoing": record["is_outgoing"],
+            })
+        return neighbors
+
+    async def expand(
+        self,
+        frontier: list[str],
+        relation_types: Optional[list[str]],
+        fanout: int,
+        full_properties: bool
+    ) -> list[dict]:
+        rel_pattern = f":{'|'.join(relation_types)}" if relation_types else ""
+        neighbor_props = "properties(m)" if full_properties else "m {.id, .title, .name}"
+        # One round trip per hop: every frontier node contributes at most
+        # `fanout` relationships.
+        query = f"""
+    UNWIND $frontier AS id
+    {node_by_row_id_match("n")}
+    CALL {{
+        WITH n
+        MATCH (n)-[r{rel_pattern}]-(m)
+        RETURN r, m
+        LIMIT $fanout
+    }}
+    RETURN startNode(r).id AS source, endNode(r).id AS target, type(r) AS type,
+           properties(r) AS rel_props, {neighbor_props} AS props, labels(m) AS labels
+    """
+        rows = []
+        for record in await self._read(query, frontier=frontier, fanout=fanout):
+            node_type = _node_type(record["labels"])
+            node_labels.put(record["props"]["id"], node_type)
+            rows.append({
+                "source": record["source"],
+                "target": record["target"],
+                "type": record["type"],
+                "rel_props": record["rel_props"],
+                "label": node_type,
+                "props": _present(record["props"]),
+            })
+        return rows
+
+    async def merge_nodes(self, label: str, rows: list[dict]) -> list[tuple[dict, bool]]:
+        written = await self._transaction(self.session.execute_write, _write_nodes, MERGE_QUERIES[label], rows)
+        for properties, _ in written:
+            node_labels.put(properties["id"], label)
+        return written
+
+    async def merge_relationships(self, rows: list[dict]) -> list[tuple[str, dict, bool]]:
+        written = await self._transaction(self.session.execute_write, _write_relationships, rows)
+        for rel_type, row, _ in written:
+            relationship_types.put(row["id"], rel_type)
+        return written
+
+    async def load_keys(self, keys: Optional[list[str]] = None) -> list[tuple[str, str, str]]:
+        if keys is None:
+            records = await self._read(KEYS_QUERY)
+        else:
+            records = await self._read(SELECTED_KEYS_QUERY, keys=keys)
+        return [(record["label"], record["key"], record["id"]) for record in records]
+
+    async def apply_batch(self, operations: list[BatchOperation], atomic: bool) -> tuple[list, bool]:
+        try:
+            outcomes = await self._transaction(self.session.execute_write, _write_batch, operations, atomic)
+        except _RolledBack as rollback:
+            return rollback.outcomes, False
+        for op, outcome in zip(operations, outcomes):
+            if outcome is None:
+                continue
+            if op.action == "create_node":
+                node_labels.put(op.id, op.label)
+            elif op.action == "create_relationship":
+                relationship_types.put(op.id, op.label)
+            elif op.action == "delete_relationship":
+                relationship_types.discard(op.id)
+            elif op.action == "delete_node":
+                node_labels.discard(op.id)
+                for link_id in outcome:
+                    relationship_types.discard(link_id)
+        return outcomes, True
+
+    async def schema_state(self) -> dict:
+        return await get_schema_state(self.session)
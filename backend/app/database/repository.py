@@ -0,0 +1,210 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+# (label, properties) of a stored node.
+NodeRecord = tuple[str, dict]
+
+# Batch operations are applied in this order, so nodes exist before they are
+# linked and relationships are removed before their nodes.
+BATCH_ACTIONS = ("create_node", "update_node", "create_relationship", "delete_relationship", "delete_node")
+
+
+class StorageError(Exception):
+    """A storage backend failed to execute a read or write."""
+
+
+@dataclass
+class GraphFilter:
+    """Which part of the graph ``load_graph`` returns.
+
+    Attribute filters constrain only the label they belong to: the year
+    range and genres apply to books, nationalities to authors. A
+    relationship is included only if both its endpoints are.
+    """
+
+    node_types: Optional[list[str]] = None
+    relation_types: Optional[list[str]] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    genres: list[str] = field(default_factory=list)
+    nationalities: list[str] = field(default_factory=list)
+
+    def restricts_nodes(self) -> bool:
+        return bool(self.node_types or self.year_from is not None or self.year_to is not None
+                    or self.genres or self.nationalities)
+
+    def matches(self, label: str, properties: dict) -> bool:
+        if self.node_types and label not in self.node_types:
+            return False
+        if label == "Book":
+            year = properties.get("publication_year")
+            if self.year_from is not None and (year is None or year < self.year_from):
+                return False
+            if self.year_to is not None and (year is None or year > self.year_to):
+                return False
+            if self.genres and properties.get("genre") not in self.genres:
+                return False
+        if label == "Author" and self.nationalities and properties.get("nationality") not in self.nationalities:
+            return False
+        return True
+
+
+@dataclass
+class BatchOperation:
+    """One write of ``GraphRepository.apply_batch``.
+
+    ``id`` is the node or relationship id, already generated for creates.
+    ``label`` is the node label, or the relationship type for
+    ``create_relationship``; ``properties`` are the full properties of a
+    created node or relationship, or the updates of ``update_node``.
+    """
+
+    action: str
+    id: str
+    label: Optional[str] = None
+    properties: Optional[dict] = None
+    source: Optional[str] = None
+    target: Optional[str] = None
+
+
+class GraphRepository(ABC):
+    """Every storage operation the routers and services need.
+
+    Nodes are addressed by their ``id`` property and carry exactly one
+    label from ``NodeType``; relationships carry an ``id`` property and one
+    type from ``RelationType``. Properties are plain dicts without ``None``
+    values, matching what Neo4j stores.
+    """
+
+    # Nodes
+
+    @abstractmethod
+    async def create_node(self, label: str, properties: dict) -> dict:
+        """Create a node with a generated id; returns its properties."""
+
+    @abstractmethod
+    async def get_node(self, label: str, node_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def update_node(self, label: str, node_id: str, updates: dict) -> Optional[dict]:
+        """Set ``updates`` on the node; returns the new properties, or None
+        if there is no such node."""
+
+    @abstractmethod
+    async def delete_node(self, label: str, node_id: str) -> Optional[list[str]]:
+        """Delete the node and its relationships; returns the ids of the
+        removed relationships, or None if there is no such node."""
+
+    @abstractmethod
+    async def list_nodes(self, label: str, fields: list[str], cursor: Optional[str], limit: int) -> list[dict]:
+        """Up to ``limit`` nodes with ``id > cursor`` ordered by id, each
+        projected onto ``fields`` (missing properties are None)."""
+
+    @abstractmethod
+    def iter_nodes_page(
+        self, label: str, fields: list[str], cursor: Optional[str], limit: Optional[int]
+    ) -> AsyncIterator[dict]:
+        """Like ``list_nodes`` but yields rows as they are read; without a
+        ``limit`` every node after ``cursor`` is yielded."""
+
+    @abstractmethod
+    async def get_nodes(self, ids: list[str], full_properties: bool = True) -> list[NodeRecord]:
+        """Nodes with the given ids, in no particular order; without
+        ``full_properties`` only ``id``, ``title`` and ``name`` are read."""
+
+    # Relationships
+
+    @abstractmethod
+    async def create_relationship(
+        self, source_id: str, target_id: str, rel_type: str, properties: dict
+    ) -> Optional[dict]:
+        """Returns ``{id, source, target, properties}``, or None if either
+        endpoint does not exist."""
+
+    @abstractmethod
+    async def delete_relationship(self, rel_id: str) -> bool:
+        ...
+
+    # Graph reads
+
+    @abstractmethod
+    async def load_graph(self, graph_filter: GraphFilter) -> tuple[list[NodeRecord], list[dict]]:
+        """The nodes matching ``graph_filter`` and the relationships between
+        them as ``{source, target, type, properties}``."""
+
+    @abstractmethod
+    def iter_graph_nodes(self, graph_filter: GraphFilter) -> AsyncIterator[NodeRecord]:
+        """The nodes of ``load_graph``, yielded as they are read."""
+
+    @abstractmethod
+    def iter_graph_links(self, graph_filter: GraphFilter) -> AsyncIterator[dict]:
+        """The relationships of ``load_graph``, yielded as they are read."""
+
+    @abstractmethod
+    async def load_topology(self) -> tuple[list[NodeRecord], list[tuple[str, str, str]]]:
+        """Nodes with only ``id``/``title``/``name`` and every relationship
+        as ``(source, target, type)``."""
+
+    @abstractmethod
+    async def search(
+        self, text: str, node_types: Optional[list[str]], skip: int, limit: int
+    ) -> list[tuple[str, dict, float]]:
+        """Nodes matching free text as ``(label, properties, score)``, best
+        match first."""
+
+    @abstractmethod
+    async def neighbors(self, node_id: str) -> list[dict]:
+        """``{label, properties, relation_type, is_outgoing}`` for every
+        relationship of the node."""
+
+    @abstractmethod
+    async def expand(
+        self,
+        frontier: list[str],
+        relation_types: Optional[list[str]],
+        fanout: int,
+        full_properties: bool
+    ) -> list[dict]:
+        """One traversal hop: up to ``fanout`` relationships per frontier
+        node as ``{source, target, type, rel_props, label, props}``, where
+        ``label``/``props`` describe the node on the other end."""
+
+    # Bulk import
+
+    @abstractmethod
+    async def merge_nodes(self, label: str, rows: list[dict]) -> list[tuple[dict, bool]]:
+        """Create or update nodes by natural key (``title`` for books,
+        ``name`` otherwise) in one transaction; returns ``(properties,
+        created)`` per row."""
+
+    @abstractmethod
+    async def merge_relationships(self, rows: list[dict]) -> list[tuple[str, dict, bool]]:
+        """Create missing relationships between the nodes with ids
+        ``row["source"]``/``row["target"]`` (labelled ``source_label``/
+        ``target_label``) in one transaction; returns ``(type, {id, source,
+        target, props}, created)`` per relationship."""
+
+    @abstractmethod
+    async def load_keys(self, keys: Optional[list[str]] = None) -> list[tuple[str, str, str]]:
+        """``(label, natural key, id)`` of every node, or only of the nodes
+        whose natural key is in ``keys``."""
+
+    @abstractmethod
+    async def apply_batch(self, operations: list[BatchOperation], atomic: bool) -> tuple[list, bool]:
+        """Apply ``operations`` (ordered by ``BATCH_ACTIONS``) in one
+        transaction; returns ``(outcomes, committed)``.
+
+        Outcomes line up with the operations and are what the matching
+        single-item method returns: node properties, ``{id, source, target,
+        properties}``, True, or the removed relationship ids; None when the
+        node or relationship does not exist. With ``atomic`` nothing is
+        written if any outcome is None.
+        """
+
+    # Administration
+
+    @abstractmethod
+    async def schema_state(self) -> dict:
+        ...
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.schemas import NodeType, RelationType
+
+# Node labels and relationship types never change for a given id, so a
+# cached entry is either correct or refers to something already deleted (in
+# which case the labelled MATCH simply finds nothing).
+DEFAULT_CACHE_SIZE = 200_000
+
+
+class LabelCache:
+    """Bounded LRU map from node/relationship id to its label or type."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        label = self._entries.get(key)
+        if label is not None:
+            self._entries.move_to_end(key)
+        return label
+
+    def put(self, key: str, label: str):
+        self._entries[key] = label
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+node_labels = LabelCache()
+relationship_types = LabelCache()
+
+
+def node_match(var: str, param: str, node_id: Optional[str] = None) -> str:
+    """Cypher that binds ``var`` to the node whose id is ``$param``.
+
+    Uses a single labelled lookup when the label is known, otherwise one
+    indexed lookup per ``NodeType`` instead of a label-less scan.
+    """
+    label = node_labels.get(node_id)
+    if label:
+        return f"MATCH ({var}:{label} {{id: ${param}}})"
+    branches = "\n        UNION ALL\n        ".join(
+        f"MATCH (x:{node_type.value} {{id: ${param}}}) RETURN x AS {var}"
+        for node_type in NodeType
+    )
+    return f"CALL {{\n        {branches}\n    }}"
+
+
+def relationship_match(var: str, param: str, rel_id: Optional[str] = None) -> str:
+    """Cypher that binds ``var`` to the relationship whose id is ``$param``."""
+    rel_type = relationship_types.get(rel_id)
+    if rel_type:
+        return f"MATCH ()-[{var}:{rel_type} {{id: ${param}}}]->()"
+    branches = "\n        UNION ALL\n        ".join(
+        f"MATCH ()-[x:{rel_type.value} {{id: ${param}}}]->() RETURN x AS {var}"
+        for rel_type in RelationType
+    )
+    return f"CALL {{\n        {branches}\n    }}"
+
+
+def node_by_key_match(var: str, key: str, row: str = "row") -> str:
+    """Cypher that binds ``var`` to the nodes whose natural key (``Book.title``
+    or ``name`` for every other label) equals ``row.key``, inside an UNWIND."""
+    branches = []
+    for node_type in NodeType:
+        prop = "title" if node_type == NodeType.BOOK else "name"
+        branches.append(
+            f"WITH {row} MATCH (x:{node_type.value} {{{prop}: {row}.{key}}}) RETURN x AS {var}"
+        )
+    return "CALL {\n    " + "\n    UNION ALL\n    ".join(branches) + "\n}"
+
+
+def node_by_row_id_match(var: str, row: str = "id", key: Optional[str] = None) -> str:
+    """Cypher that binds ``var`` to the node whose id is the value of ``row``
+    (or of ``row.key``), for use after ``UNWIND $ids AS id``."""
+    value = f"{row}.{key}" if key else row
+    branches = "\n    UNION ALL\n    ".join(
+        f"WITH {row} MATCH (x:{node_type.value} {{id: {value}}}) RETURN x AS {var}"
+        for node_type in NodeType
+    )
+    return "CALL {\n    " + branches + "\n}"
+
+
+def relationship_by_row_id_match(var: str, row: str = "id", key: Optional[str] = None) -> str:
+    """Like ``node_by_row_id_match`` for relationships."""
+    value = f"{row}.{key}" if key else row
+    branches = "\n    UNION ALL\n    ".join(
+        f"WITH {row} MATCH ()-[x:{rel_type.value} {{id: {value}}}]->() RETURN x AS {var}"
+        for rel_type in RelationType
+    )
+    return "CALL {\n    " + branches + "\n}"
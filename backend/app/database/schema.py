@@ -0,0 +1,84 @@
+import logging
+
+from neo4j.exceptions import Neo4jError
+
+from app.database.search import fulltext_index_statement
+from app.models.schemas import NodeType, RelationType
+
+logger = logging.getLogger(__name__)
+
+# (name, label, property) for plain range indexes on lookup/filter keys.
+PROPERTY_INDEXES = [
+    ("author_name", "Author", "name"),
+    ("book_title", "Book", "title"),
+    ("book_publication_year", "Book", "publication_year"),
+    ("book_genre", "Book", "genre"),
+    ("author_nationality", "Author", "nationality"),
+    ("era_name", "Era", "name"),
+    ("movement_name", "Movement", "name"),
+    ("character_name", "Character", "name"),
+    ("plot_name", "Plot", "name"),
+]
+
+
+def schema_statements() -> list[str]:
+    statements = []
+    # Uniqueness constraints also provide the index behind `{id: $id}` lookups.
+    for node_type in NodeType:
+        statements.append(
+            f"CREATE CONSTRAINT {node_type.value.lower()}_id_unique IF NOT EXISTS "
+            f"FOR (n:{node_type.value}) REQUIRE n.id IS UNIQUE"
+        )
+    for name, label, prop in PROPERTY_INDEXES:
+        statements.append(
+            f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+        )
+    # Relationship property indexes are scoped to a single type.
+    for rel_type in RelationType:
+        statements.append(
+            f"CREATE INDEX {rel_type.value.lower()}_id IF NOT EXISTS "
+            f"FOR ()-[r:{rel_type.value}]-() ON (r.id)"
+        )
+    statements.append(fulltext_index_statement())
+    return statements
+
+
+async def ensure_schema(driver) -> int:
+    """Create all constraints and indexes that do not exist yet.
+
+    Every statement is idempotent, so this is safe to run on each startup.
+    Schema commands cannot share a transaction, so each runs on its own.
+    Returns the number of statements that failed.
+    """
+    failed = 0
+    async with driver.session() as session:
+        for statement in schema_statements():
+            try:
+                result = await session.run(statement)
+                await result.consume()
+            except Neo4jError as exc:
+                failed += 1
+                logger.warning("Schema statement failed: %s (%s)", statement, exc.message)
+    return failed
+
+
+async def get_schema_state(session) -> dict:
+    constraints_query = """
+    SHOW CONSTRAINTS
+    YIELD name, type, entityType, labelsOrTypes, properties
+    RETURN name, type, entityType, labelsOrTypes, properties
+    """
+    indexes_query = """
+    SHOW INDEXES
+    YIELD name, type, entityType, labelsOrTypes, properties, state, populationPercent, owningConstraint
+    RETURN name, type, entityType, labelsOrTypes, properties, state, populationPercent, owningConstraint
+    """
+    result = await session.run(constraints_query)
+    constraints = [record.data() async for record in result]
+    result = await session.run(indexes_query)
+    indexes = [record.data() async for record in result]
+    return {
+        "constraints": constraints,
+        "indexes": indexes,
+        "online": all(index["state"] == "ONLINE" for index in indexes),
+    }
@@ -0,0 +1,38 @@
+import re
+
+from app.models.schemas import NodeType
+
+FULLTEXT_INDEX = "node_search"
+
+# Properties carrying searchable text across all node types.
+FULLTEXT_PROPERTIES = ["title", "name", "description", "traits"]
+
+# The CJK analyzer indexes Hangul/Han runs as overlapping bigrams, so Korean
+# titles match on partial words without a morphological analyzer.
+FULLTEXT_ANALYZER = "cjk"
+
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def fulltext_index_statement() -> str:
+    labels = "|".join(node_type.value for node_type in NodeType)
+    properties = ", ".join(f"n.{prop}" for prop in FULLTEXT_PROPERTIES)
+    return (
+        f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX} IF NOT EXISTS "
+        f"FOR (n:{labels}) ON EACH [{properties}] "
+        f"OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{FULLTEXT_ANALYZER}'}}}}"
+    )
+
+
+def build_fulltext_query(text: str) -> str:
+    """Turn free user input into a Lucene query.
+
+    Every term is escaped and matched both as analyzed text and as a prefix,
+    so that single syllables and unfinished words still find results while
+    whole-word matches score higher.
+    """
+    clauses = []
+    for term in text.lower().split():
+        escaped = _LUCENE_SPECIAL.sub(r"\\\1", term)
+        clauses.append(f"({escaped}^2 OR {escaped}*)")
+    return " ".join(clauses)
@@ -1,8 +1,15 @@
-from fastapi import FastAPI
+import logging
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from neo4j.exceptions import DriverError, Neo4jError
+
+from app.routers import books, authors, relationships, graph, schema, events
+from app.database.connection import BOOKMARKS_HEADER, STORAGE_BACKEND, close_storage, neo4j_driver
+from app.database.schema import ensure_schema
+from app.services.instrumentation import PROMETHEUS_MEDIA_TYPE, InstrumentationMiddleware, registry
 
-from app.routers import books, authors, relationships, graph
-from app.database.connection import neo4j_driver
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Book Topology API",
@@ -22,12 +29,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Graph-Epoch", "X-Graph-Seq", "X-Layout", BOOKMARKS_HEADER],
 )
 
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(books.router, prefix="/api/books", tags=["books"])
 app.include_router(authors.router, prefix="/api/authors", tags=["authors"])
 app.include_router(relationships.router, prefix="/api/relationships", tags=["relationships"])
 app.include_router(graph.router, prefix="/api/graph", tags=["graph"])
+app.include_router(schema.router, prefix="/api/schema", tags=["schema"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
 
 
 @app.get("/")
@@ -40,6 +52,25 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@app.on_event("startup")
+async def startup_event():
+    if STORAGE_BACKEND != "neo4j":
+        return
+    # Don't block the API from starting if the database is unreachable;
+    # the statements are idempotent and run again on the next start.
+    try:
+        failed = await ensure_schema(neo4j_driver)
+        if failed:
+            logger.warning("%d schema statements failed", failed)
+    except (DriverError, Neo4jError) as exc:
+        logger.warning("Schema bootstrap skipped: %s", exc)
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
-    neo4j_driver.close()
+    await close_storage()
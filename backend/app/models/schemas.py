@@ -45,6 +45,12 @@ class BookResponse(BaseModel):
     description: Optional[str] = None
 
 
+class BookRecommendation(BaseModel):
+    id: str
+    title: str
+    score: float
+
+
 # Author schemas
 class AuthorCreate(BaseModel):
     name: str
@@ -120,8 +126,11 @@ class PlotResponse(BaseModel):
 
 # Relationship schemas
 class RelationshipCreate(BaseModel):
-    source_id: str
-    target_id: str
+    # Each endpoint is given by id or by natural key (a book title or a name)
+    source_id: Optional[str] = None
+    source_key: Optional[str] = None
+    target_id: Optional[str] = None
+    target_key: Optional[str] = None
     relation_type: RelationType
     properties: Optional[dict] = None
 
@@ -140,6 +149,10 @@ class GraphNode(BaseModel):
     label: str
     type: NodeType
     properties: dict
+    # Server-computed position, only set when a layout was requested
+    x: Optional[float] = None
+    y: Optional[float] = None
+    z: Optional[float] = None
 
 
 class GraphLink(BaseModel):
@@ -152,3 +165,127 @@ class GraphLink(BaseModel):
 class GraphData(BaseModel):
     nodes: list[GraphNode]
     links: list[GraphLink]
+
+
+class SubgraphData(GraphData):
+    # Nodes on the last expanded hop; their further neighbors were not loaded.
+    frontier: list[str]
+    truncated: bool
+
+
+class GraphPath(BaseModel):
+    nodes: list[str]
+    links: list[GraphLink]
+
+
+class PathsData(BaseModel):
+    nodes: list[GraphNode]
+    paths: list[GraphPath]
+    # False when the time budget ran out before all requested paths were found.
+    complete: bool
+
+
+# Import schemas
+class ImportPhaseStats(BaseModel):
+    rows: int = 0
+    skipped: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    rows_per_sec: float = 0.0
+
+
+class ImportFailure(BaseModel):
+    phase: str
+    batch: int
+    offset: int
+    error: str
+
+
+class KeyMatch(BaseModel):
+    id: str
+    type: str
+
+
+class AmbiguousKey(BaseModel):
+    # A relationship endpoint name shared by several nodes; the
+    # relationship was created for every match.
+    key: str
+    matches: list[KeyMatch]
+
+
+class ImportResult(BaseModel):
+    message: str
+    imported: dict[str, int]
+    phases: dict[str, ImportPhaseStats]
+    failure: Optional[ImportFailure] = None
+    ambiguous: list[AmbiguousKey] = []
+
+
+# Batch schemas
+class BookBatchCreate(BookCreate):
+    # Client-side id other items of the batch can refer to
+    ref: Optional[str] = None
+
+
+class BookBatchUpdate(BookUpdate):
+    id: str
+
+
+class BookBatch(BaseModel):
+    create: list[BookBatchCreate] = []
+    update: list[BookBatchUpdate] = []
+    delete: list[str] = []
+
+
+class AuthorBatchCreate(AuthorCreate):
+    ref: Optional[str] = None
+
+
+class AuthorBatchUpdate(AuthorUpdate):
+    id: str
+
+
+class AuthorBatch(BaseModel):
+    create: list[AuthorBatchCreate] = []
+    update: list[AuthorBatchUpdate] = []
+    delete: list[str] = []
+
+
+class NodeBatchCreate(BaseModel):
+    ref: Optional[str] = None
+    type: NodeType
+    properties: dict
+
+
+class RelationshipBatchCreate(BaseModel):
+    # Each endpoint is either an existing node id or the ref of a node
+    # created in the same batch.
+    source_id: Optional[str] = None
+    source_ref: Optional[str] = None
+    target_id: Optional[str] = None
+    target_ref: Optional[str] = None
+    relation_type: RelationType
+    properties: Optional[dict] = None
+
+
+class RelationshipBatch(BaseModel):
+    nodes: list[NodeBatchCreate] = []
+    create: list[RelationshipBatchCreate] = []
+    delete: list[str] = []
+
+
+class BatchItemResult(BaseModel):
+    section: str
+    index: int
+    ref: Optional[str] = None
+    id: Optional[str] = None
+    ok: bool = False
+    error: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    # False when nothing was written: an atomic batch with a failed item,
+    # or a storage error (given in ``error``).
+    committed: bool
+    results: list[BatchItemResult]
+    error: Optional[str] = None
@@ -1,115 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.database.connection import get_db
-from app.models.schemas import AuthorCreate, AuthorUpdate, AuthorResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from app.database.connection import get_repository
+from app.models.schemas import AuthorCreate, AuthorUpdate, AuthorResponse, AuthorBatch, BatchResult
+from app.services.batch import build_node_batch, run_batch
+from app.services.changes import change_log, node_data
+from app.services.pagination import (
+    LIMIT_DESCRIPTION, MAX_PAGE_SIZE, STREAM_DESCRIPTION, fetch_page, parse_fields, stream_page
+)
+from typing import Literal, Optional
 
 router = APIRouter()
 
 
+def _author_response(node: dict) -> AuthorResponse:
+    return AuthorResponse(
+        id=node["id"],
+        name=node["name"],
+        birth_year=node.get("birth_year"),
+        death_year=node.get("death_year"),
+        nationality=node.get("nationality")
+    )
+
+
 @router.post("/", response_model=AuthorResponse)
-async def create_author(author: AuthorCreate, db=Depends(get_db)):
-    query = """
-    CREATE (a:Author {
-        id: randomUUID(),
-        name: $name,
-        birth_year: $birth_year,
-        death_year: $death_year,
-        nationality: $nationality
-    })
-    RETURN a
-    """
-    result = db.run(query,
-                    name=author.name,
-                    birth_year=author.birth_year,
-                    death_year=author.death_year,
-                    nationality=author.nationality)
-    record = result.single()
-    if record:
-        node = record["a"]
-        return AuthorResponse(
-            id=node["id"],
-            name=node["name"],
-            birth_year=node.get("birth_year"),
-            death_year=node.get("death_year"),
-            nationality=node.get("nationality")
-        )
-    raise HTTPException(status_code=500, detail="Failed to create author")
-
-
-@router.get("/", response_model=list[AuthorResponse])
-async def get_authors(db=Depends(get_db)):
-    query = "MATCH (a:Author) RETURN a"
-    result = db.run(query)
-    authors = []
-    for record in result:
-        node = record["a"]
-        authors.append(AuthorResponse(
-            id=node["id"],
-            name=node["name"],
-            birth_year=node.get("birth_year"),
-            death_year=node.get("death_year"),
-            nationality=node.get("nationality")
-        ))
-    return authors
+async def create_author(author: AuthorCreate, repo=Depends(get_repository)):
+    node = await repo.create_node("Author", author.model_dump())
+    change_log.record("added", "node", node["id"], node_data("Author", node))
+    return _author_response(node)
+
+
+@router.post("/batch", response_model=BatchResult)
+async def batch_authors(
+    batch: AuthorBatch,
+    response: Response,
+    atomic: bool = Query(False, description="Write nothing unless every item applies"),
+    repo=Depends(get_repository)
+):
+    result = await run_batch(repo, build_node_batch("Author", batch), atomic)
+    if result.error:
+        response.status_code = 500
+    return result
+
+
+@router.get("/", response_model=list[AuthorResponse], response_model_exclude_unset=True)
+async def get_authors(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description=STREAM_DESCRIPTION),
+    repo=Depends(get_repository)
+):
+    field_list = parse_fields(fields, AuthorResponse)
+    if stream:
+        return stream_page("Author", field_list, cursor, limit)
+    rows = await fetch_page(repo, "Author", field_list, cursor, limit, response)
+    return [AuthorResponse(**row) for row in rows]
 
 
 @router.get("/{author_id}", response_model=AuthorResponse)
-async def get_author(author_id: str, db=Depends(get_db)):
-    query = "MATCH (a:Author {id: $id}) RETURN a"
-    result = db.run(query, id=author_id)
-    record = result.single()
-    if record:
-        node = record["a"]
-        return AuthorResponse(
-            id=node["id"],
-            name=node["name"],
-            birth_year=node.get("birth_year"),
-            death_year=node.get("death_year"),
-            nationality=node.get("nationality")
-        )
+async def get_author(author_id: str, repo=Depends(get_repository)):
+    node = await repo.get_node("Author", author_id)
+    if node:
+        return _author_response(node)
     raise HTTPException(status_code=404, detail="Author not found")
 
 
 @router.put("/{author_id}", response_model=AuthorResponse)
-async def update_author(author_id: str, author: AuthorUpdate, db=Depends(get_db)):
-    updates = []
-    params = {"id": author_id}
-
-    if author.name is not None:
-        updates.append("a.name = $name")
-        params["name"] = author.name
-    if author.birth_year is not None:
-        updates.append("a.birth_year = $birth_year")
-        params["birth_year"] = author.birth_year
-    if author.death_year is not None:
-        updates.append("a.death_year = $death_year")
-        params["death_year"] = author.death_year
-    if author.nationality is not None:
-        updates.append("a.nationality = $nationality")
-        params["nationality"] = author.nationality
-
+async def update_author(author_id: str, author: AuthorUpdate, repo=Depends(get_repository)):
+    updates = author.model_dump(exclude_none=True)
     if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    query = f"MATCH (a:Author {{id: $id}}) SET {', '.join(updates)} RETURN a"
-    result = db.run(query, **params)
-    record = result.single()
-    if record:
-        node = record["a"]
-        return AuthorResponse(
-            id=node["id"],
-            name=node["name"],
-            birth_year=node.get("birth_year"),
-            death_year=node.get("death_year"),
-            nationality=node.get("nationality")
-        )
+    node = await repo.update_node("Author", author_id, updates)
+    if node:
+        change_log.record("updated", "node", node["id"], node_data("Author", node))
+        return _author_response(node)
     raise HTTPException(status_code=404, detail="Author not found")
 
 
 @router.delete("/{author_id}")
-async def delete_author(author_id: str, db=Depends(get_db)):
-    query = "MATCH (a:Author {id: $id}) DETACH DELETE a RETURN count(a) as deleted"
-    result = db.run(query, id=author_id)
-    record = result.single()
-    if record and record["deleted"] > 0:
+async def delete_author(author_id: str, repo=Depends(get_repository)):
+    link_ids = await repo.delete_node("Author", author_id)
+    if link_ids is not None:
+        for link_id in link_ids:
+            change_log.record("removed", "link", link_id)
+        change_log.record("removed", "node", author_id)
         return {"message": "Author deleted successfully"}
     raise HTTPException(status_code=404, detail="Author not found")
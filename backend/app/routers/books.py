@@ -1,115 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.database.connection import get_db
-from app.models.schemas import BookCreate, BookUpdate, BookResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from app.database.connection import get_repository
+from app.models.schemas import (
+    BookCreate, BookUpdate, BookResponse, BookRecommendation, BookBatch, BatchResult
+)
+from app.services.batch import build_node_batch, run_batch
+from app.services.changes import change_log, node_data
+from app.services.pagination import (
+    LIMIT_DESCRIPTION, MAX_PAGE_SIZE, STREAM_DESCRIPTION, fetch_page, parse_fields, stream_page
+)
+from app.services.recommendations import RECOMMENDATION_K, recommendation_cache
+from app.services.snapshot import snapshot_cache
+from typing import Literal, Optional
 
 router = APIRouter()
 
 
+def _book_response(node: dict) -> BookResponse:
+    return BookResponse(
+        id=node["id"],
+        title=node["title"],
+        publication_year=node.get("publication_year"),
+        genre=node.get("genre"),
+        description=node.get("description")
+    )
+
+
 @router.post("/", response_model=BookResponse)
-async def create_book(book: BookCreate, db=Depends(get_db)):
-    query = """
-    CREATE (b:Book {
-        id: randomUUID(),
-        title: $title,
-        publication_year: $publication_year,
-        genre: $genre,
-        description: $description
-    })
-    RETURN b
-    """
-    result = db.run(query,
-                    title=book.title,
-                    publication_year=book.publication_year,
-                    genre=book.genre,
-                    description=book.description)
-    record = result.single()
-    if record:
-        node = record["b"]
-        return BookResponse(
-            id=node["id"],
-            title=node["title"],
-            publication_year=node["publication_year"],
-            genre=node["genre"],
-            description=node["description"]
-        )
-    raise HTTPException(status_code=500, detail="Failed to create book")
-
-
-@router.get("/", response_model=list[BookResponse])
-async def get_books(db=Depends(get_db)):
-    query = "MATCH (b:Book) RETURN b"
-    result = db.run(query)
-    books = []
-    for record in result:
-        node = record["b"]
-        books.append(BookResponse(
-            id=node["id"],
-            title=node["title"],
-            publication_year=node.get("publication_year"),
-            genre=node.get("genre"),
-            description=node.get("description")
-        ))
-    return books
+async def create_book(book: BookCreate, repo=Depends(get_repository)):
+    node = await repo.create_node("Book", book.model_dump())
+    change_log.record("added", "node", node["id"], node_data("Book", node))
+    return _book_response(node)
+
+
+@router.post("/batch", response_model=BatchResult)
+async def batch_books(
+    batch: BookBatch,
+    response: Response,
+    atomic: bool = Query(False, description="Write nothing unless every item applies"),
+    repo=Depends(get_repository)
+):
+    result = await run_batch(repo, build_node_batch("Book", batch), atomic)
+    if result.error:
+        response.status_code = 500
+    return result
+
+
+@router.get("/", response_model=list[BookResponse], response_model_exclude_unset=True)
+async def get_books(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description=STREAM_DESCRIPTION),
+    repo=Depends(get_repository)
+):
+    field_list = parse_fields(fields, BookResponse)
+    if stream:
+        return stream_page("Book", field_list, cursor, limit)
+    rows = await fetch_page(repo, "Book", field_list, cursor, limit, response)
+    return [BookResponse(**row) for row in rows]
 
 
 @router.get("/{book_id}", response_model=BookResponse)
-async def get_book(book_id: str, db=Depends(get_db)):
-    query = "MATCH (b:Book {id: $id}) RETURN b"
-    result = db.run(query, id=book_id)
-    record = result.single()
-    if record:
-        node = record["b"]
-        return BookResponse(
-            id=node["id"],
-            title=node["title"],
-            publication_year=node.get("publication_year"),
-            genre=node.get("genre"),
-            description=node.get("description")
-        )
+async def get_book(book_id: str, repo=Depends(get_repository)):
+    node = await repo.get_node("Book", book_id)
+    if node:
+        return _book_response(node)
     raise HTTPException(status_code=404, detail="Book not found")
 
 
-@router.put("/{book_id}", response_model=BookResponse)
-async def update_book(book_id: str, book: BookUpdate, db=Depends(get_db)):
-    updates = []
-    params = {"id": book_id}
-
-    if book.title is not None:
-        updates.append("b.title = $title")
-        params["title"] = book.title
-    if book.publication_year is not None:
-        updates.append("b.publication_year = $publication_year")
-        params["publication_year"] = book.publication_year
-    if book.genre is not None:
-        updates.append("b.genre = $genre")
-        params["genre"] = book.genre
-    if book.description is not None:
-        updates.append("b.description = $description")
-        params["description"] = book.description
+@router.get("/{book_id}/recommendations", response_model=list[BookRecommendation])
+async def get_book_recommendations(
+    book_id: str,
+    limit: int = Query(10, ge=1, le=RECOMMENDATION_K),
+    repo=Depends(get_repository)
+):
+    snapshot = await snapshot_cache.get(repo)
+    index = await recommendation_cache.get(snapshot)
+    ranked = index.top.get(book_id)
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return [
+        BookRecommendation(id=other_id, title=snapshot.labels[snapshot.index[other_id]], score=score)
+        for other_id, score in ranked[:limit]
+    ]
 
+
+@router.put("/{book_id}", response_model=BookResponse)
+async def update_book(book_id: str, book: BookUpdate, repo=Depends(get_repository)):
+    updates = book.model_dump(exclude_none=True)
     if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    query = f"MATCH (b:Book {{id: $id}}) SET {', '.join(updates)} RETURN b"
-    result = db.run(query, **params)
-    record = result.single()
-    if record:
-        node = record["b"]
-        return BookResponse(
-            id=node["id"],
-            title=node["title"],
-            publication_year=node.get("publication_year"),
-            genre=node.get("genre"),
-            description=node.get("description")
-        )
+    node = await repo.update_node("Book", book_id, updates)
+    if node:
+        change_log.record("updated", "node", node["id"], node_data("Book", node))
+        return _book_response(node)
     raise HTTPException(status_code=404, detail="Book not found")
 
 
 @router.delete("/{book_id}")
-async def delete_book(book_id: str, db=Depends(get_db)):
-    query = "MATCH (b:Book {id: $id}) DETACH DELETE b RETURN count(b) as deleted"
-    result = db.run(query, id=book_id)
-    record = result.single()
-    if record and record["deleted"] > 0:
+async def delete_book(book_id: str, repo=Depends(get_repository)):
+    link_ids = await repo.delete_node("Book", book_id)
+    if link_ids is not None:
+        for link_id in link_ids:
+            change_log.record("removed", "link", link_id)
+        change_log.record("removed", "node", book_id)
         return {"message": "Book deleted successfully"}
     raise HTTPException(status_code=404, detail="Book not found")
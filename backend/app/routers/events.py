@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from app.services.events import broadcaster, event_stream
+
+router = APIRouter()
+
+
+@router.get("")
+@router.get("/")
+async def subscribe_events(request: Request):
+    return StreamingResponse(
+        event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats")
+async def get_event_stats():
+    return broadcaster.stats()
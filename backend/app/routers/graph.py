@@ -1,133 +1,418 @@
-from fastapi import APIRouter, Depends, Query
-from app.database.connection import get_db
-from app.models.schemas import GraphData, GraphNode, GraphLink, NodeType
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from app.database.connection import get_repository, open_repository
+from app.database.repository import GraphFilter
+from app.models.schemas import GraphData, GraphNode, GraphLink, GraphPath, NodeType, PathsData, RelationType, SubgraphData
+from app.services.analytics import metrics_cache
+from app.services.changes import change_log, coalesce, display_label
+from app.services.encoding import FastJSONResponse, dumps
+from app.services.graph_cache import etag_matches, graph_cache
+from app.services.instrumentation import phase
+from app.services.layout import layout_cache
+from app.services.ndjson import ndjson_response
+from app.services.paths import MAX_PATH_DEPTH, MAX_PATH_TIMEOUT_MS, MAX_PATHS, path_index, shortest_paths
+from app.services.snapshot import snapshot_cache
+from app.services.wire import COLUMNAR_MEDIA_TYPE, to_columnar, wants_columnar
+from typing import AsyncIterator, Callable, Literal, Optional
+import asyncio
+import numpy as np
 
 router = APIRouter()
 
+MAX_PROPERTY_IDS = 500
+
+MAX_SUBGRAPH_SEEDS = 50
+MAX_SUBGRAPH_DEPTH = 4
+MAX_SUBGRAPH_NODES = 5000
+MAX_SUBGRAPH_FANOUT = 500
+
+
+def _parse_filter(value: Optional[str], allowed: dict, name: str) -> Optional[list[str]]:
+    if not value:
+        return None
+    values = sorted(set(value.split(",")))
+    if not set(values) <= set(allowed):
+        raise HTTPException(status_code=400, detail=f"Unknown {name}")
+    return values
+
+
+def _split(value: Optional[str]) -> list[str]:
+    if not value:
+        return []
+    return sorted({item.strip() for item in value.split(",") if item.strip()})
+
+
+def _graph_filter_key(graph_filter: GraphFilter) -> str:
+    return "|".join([
+        ",".join(graph_filter.node_types or []),
+        ",".join(graph_filter.relation_types or []),
+        f"{graph_filter.year_from}-{graph_filter.year_to}",
+        ",".join(graph_filter.genres),
+        ",".join(graph_filter.nationalities),
+    ])
+
+
+def _graph_node(node_type: str, properties: dict) -> dict:
+    # A GraphNode as a plain dict: graph responses are encoded directly
+    # instead of building and validating one model per node.
+    return {
+        "id": properties["id"],
+        "label": display_label(node_type, properties),
+        "type": node_type if node_type in NodeType._value2member_map_ else NodeType.BOOK.value,
+        "properties": properties,
+    }
+
+
+def _graph_link(source: str, target: str, rel_type: str, properties: Optional[dict]) -> dict:
+    return {"source": source, "target": target, "type": rel_type, "properties": properties}
+
+
+async def _load_graph(repo, graph_filter: GraphFilter) -> dict:
+    with phase("load"):
+        nodes, links = await repo.load_graph(graph_filter)
+    with phase("build"):
+        return {
+            "nodes": [_graph_node(node_type, properties) for node_type, properties in nodes],
+            "links": [
+                _graph_link(link["source"], link["target"], link["type"], link["properties"])
+                for link in links
+            ],
+        }
+
+
+async def _current_snapshot():
+    async with open_repository() as repo:
+        return await snapshot_cache.get(repo)
+
+
+def _cached_coordinates(layout: bool) -> Optional[dict[str, tuple[float, float, float]]]:
+    """Coordinates of the current graph if its layout is already computed.
+
+    Otherwise the layout is started in the background and None returned, so
+    the response goes out without coordinates instead of waiting for it.
+    """
+    if not layout:
+        return None
+    current = layout_cache.current(change_log.seq)
+    if current is None:
+        layout_cache.refresh(_current_snapshot)
+        return None
+    return current.coordinates()
+
+
+async def _node_decorator(
+    repo,
+    coordinates: Optional[dict[str, tuple[float, float, float]]],
+    metrics: bool
+) -> Optional[Callable[[dict], None]]:
+    """A function adding coordinates and/or metrics to a node dict, or None
+    if there is nothing to add."""
+    if coordinates is None and not metrics:
+        return None
+    snapshot = await snapshot_cache.get(repo) if metrics else None
+    graph_metrics = await metrics_cache.get(snapshot) if metrics else None
+
+    def decorate(node: dict):
+        if coordinates is not None:
+            xyz = coordinates.get(node["id"])
+            if xyz is not None:
+                node["x"], node["y"], node["z"] = xyz
+        if graph_metrics is not None:
+            i = snapshot.index.get(node["id"])
+            if i is not None:
+                node["properties"].update(graph_metrics.node(i))
+    return decorate
+
+
+async def _graph_lines(
+    graph_filter: GraphFilter,
+    coordinates: Optional[dict[str, tuple[float, float, float]]],
+    metrics: bool
+) -> AsyncIterator[dict]:
+    # Nodes first, then links, then a closing line with the counts so a
+    # client can tell a complete stream from a dropped connection. The two
+    # phases are separate reads, so a link whose endpoint was created after
+    # the node phase (or not sent for any other reason) is left out.
+    async with open_repository() as repo:
+        decorate = await _node_decorator(repo, coordinates, metrics)
+        sent: set[str] = set()
+        async for node_type, properties in repo.iter_graph_nodes(graph_filter):
+            node = _graph_node(node_type, properties)
+            if decorate:
+                decorate(node)
+            sent.add(node["id"])
+            yield {"kind": "node", **node}
+        links = 0
+        async for link in repo.iter_graph_links(graph_filter):
+            if link["source"] not in sent or link["target"] not in sent:
+                continue
+            links += 1
+            yield {"kind": "link", **_graph_link(link["source"], link["target"], link["type"], link["properties"])}
+        yield {"kind": "end", "nodes": len(sent), "links": links}
+
 
 @router.get("", response_model=GraphData)
 @router.get("/", response_model=GraphData)
 async def get_graph_data(
+    request: Request,
     node_types: Optional[str] = Query(None, description="Comma-separated node types to include"),
     relation_types: Optional[str] = Query(None, description="Comma-separated relation types to include"),
-    db=Depends(get_db)
+    year_from: Optional[int] = Query(None, description="Only books published in or after this year"),
+    year_to: Optional[int] = Query(None, description="Only books published in or before this year"),
+    genre: Optional[str] = Query(None, description="Comma-separated genres; only books of these genres"),
+    nationality: Optional[str] = Query(None, description="Comma-separated nationalities; only authors of these"),
+    properties: bool = Query(False, description="Include node properties in the columnar format"),
+    layout: bool = Query(False, description="Include precomputed x/y/z coordinates once computed; X-Layout: pending until then"),
+    metrics: bool = Query(False, description="Add degree, pagerank, component and community to node properties"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description="Send nodes, then links, as newline-delimited JSON while they are read"),
+    repo=Depends(get_repository)
 ):
-    nodes = []
-    links = []
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise HTTPException(status_code=400, detail="year_from is after year_to")
+    graph_filter = GraphFilter(
+        node_types=_parse_filter(node_types, NodeType._value2member_map_, "node type"),
+        relation_types=_parse_filter(relation_types, RelationType._value2member_map_, "relation type"),
+        year_from=year_from,
+        year_to=year_to,
+        genres=_split(genre),
+        nationalities=_split(nationality),
+    )
+    coordinates = _cached_coordinates(layout)
+    layout_headers = {"X-Layout": "pending"} if layout and coordinates is None else {}
+    if stream:
+        return ndjson_response(
+            _graph_lines(graph_filter, coordinates, metrics),
+            {"X-Graph-Epoch": change_log.epoch, "X-Graph-Seq": str(change_log.seq), **layout_headers}
+        )
+    columnar = wants_columnar(request.headers.get("accept"))
+    media_type = COLUMNAR_MEDIA_TYPE if columnar else "application/json"
 
-    # Parse filters
-    type_filter = node_types.split(",") if node_types else None
-    rel_filter = relation_types.split(",") if relation_types else None
+    variant = f"columnar{'+properties' if properties else ''}" if columnar else "json"
+    if coordinates is not None:
+        variant += "+layout"
+    if metrics:
+        variant += "+metrics"
+    key = f"graph|{variant}|{_graph_filter_key(graph_filter)}"
+    version = graph_cache.version
+    etag = graph_cache.etag(key, version)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept",
+        # Position in the change log this snapshot reflects, for /changes.
+        "X-Graph-Epoch": change_log.epoch,
+        "X-Graph-Seq": str(change_log.seq),
+        **layout_headers,
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
 
-    # Build node query
-    if type_filter:
-        labels = " OR ".join([f"n:{t}" for t in type_filter])
-        node_query = f"MATCH (n) WHERE {labels} RETURN n, labels(n) as labels"
-    else:
-        node_query = "MATCH (n) RETURN n, labels(n) as labels"
-
-    result = db.run(node_query)
-    for record in result:
-        node = record["n"]
-        labels = record["labels"]
-        node_type = labels[0] if labels else "Unknown"
-
-        # Determine label based on node type
-        if "Book" in labels:
-            label = node.get("title", "Unknown Book")
-        elif "Author" in labels:
-            label = node.get("name", "Unknown Author")
-        else:
-            label = node.get("name", node.get("title", "Unknown"))
-
-        nodes.append(GraphNode(
-            id=node["id"],
-            label=label,
-            type=NodeType(node_type) if node_type in NodeType.__members__.values() else NodeType.BOOK,
-            properties=dict(node)
-        ))
+    payload = graph_cache.get(key)
+    if payload is None:
+        graph = await _load_graph(repo, graph_filter)
+        decorate = await _node_decorator(repo, coordinates, metrics)
+        if decorate:
+            for node in graph["nodes"]:
+                decorate(node)
+        with phase("encode"):
+            payload = dumps(to_columnar(graph, properties) if columnar else graph)
+        graph_cache.put(key, payload, version)
+    return Response(content=payload, media_type=media_type, headers=headers)
 
-    # Build relationship query
-    if rel_filter:
-        rel_types = "|".join(rel_filter)
-        rel_query = f"MATCH (a)-[r:{rel_types}]->(b) RETURN a.id as source, b.id as target, type(r) as type, properties(r) as props"
+
+@router.get("/properties")
+async def get_node_properties(
+    ids: str = Query(..., min_length=1, description="Comma-separated node ids"),
+    repo=Depends(get_repository)
+):
+    id_list = list(dict.fromkeys(ids.split(",")))
+    if len(id_list) > MAX_PROPERTY_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROPERTY_IDS} ids per request")
+
+    return {properties["id"]: properties for _, properties in await repo.get_nodes(id_list)}
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    return graph_cache.stats()
+
+
+@router.get("/metrics")
+async def get_graph_metrics(
+    ids: Optional[str] = Query(None, description="Comma-separated node ids; all nodes if omitted"),
+    repo=Depends(get_repository)
+):
+    snapshot = await snapshot_cache.get(repo)
+    metrics = await metrics_cache.get(snapshot)
+    if ids is None:
+        nodes = metrics.nodes()
     else:
-        rel_query = "MATCH (a)-[r]->(b) RETURN a.id as source, b.id as target, type(r) as type, properties(r) as props"
-
-    result = db.run(rel_query)
-    for record in result:
-        links.append(GraphLink(
-            source=record["source"],
-            target=record["target"],
-            type=record["type"],
-            properties=record["props"]
-        ))
+        nodes = {
+            node_id: metrics.node(snapshot.index[node_id])
+            for node_id in dict.fromkeys(ids.split(","))
+            if node_id in snapshot.index
+        }
+    return {"summary": metrics.summary(), "nodes": nodes}
 
-    return GraphData(nodes=nodes, links=links)
+
+@router.get("/changes")
+async def get_changes(
+    since: int = Query(..., ge=0, description="X-Graph-Seq or seq of the client's current state"),
+    epoch: Optional[str] = Query(None, description="X-Graph-Epoch or epoch of the client's current state; without it a full snapshot is returned"),
+    repo=Depends(get_repository)
+):
+    seq = change_log.seq
+    entries = change_log.since(since) if epoch == change_log.epoch else None
+    if entries is None:
+        # The requested point was compacted away, belongs to another
+        # process or has no epoch; the client replaces its state wholesale.
+        graph = await _load_graph(repo, GraphFilter())
+        return FastJSONResponse({"epoch": change_log.epoch, "seq": seq, "full": True, "graph": graph})
+    return {"epoch": change_log.epoch, "seq": seq, "full": False, **coalesce(entries)}
 
 
 @router.get("/search")
 async def search_nodes(
     query: str = Query(..., min_length=1),
-    db=Depends(get_db)
+    node_types: Optional[str] = Query(None, description="Comma-separated node types to include"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    repo=Depends(get_repository)
 ):
-    search_query = """
-    MATCH (n)
-    WHERE n.title CONTAINS $search_term OR n.name CONTAINS $search_term
-    RETURN n, labels(n) as labels
-    LIMIT 20
-    """
-    result = db.run(search_query, search_term=query)
-    nodes = []
-    for record in result:
-        node = record["n"]
-        labels = record["labels"]
-        node_type = labels[0] if labels else "Unknown"
-
-        if "Book" in labels:
-            label = node.get("title", "Unknown Book")
-        elif "Author" in labels:
-            label = node.get("name", "Unknown Author")
-        else:
-            label = node.get("name", node.get("title", "Unknown"))
-
-        nodes.append({
-            "id": node["id"],
-            "label": label,
+    type_filter = node_types.split(",") if node_types else None
+    if type_filter and not set(type_filter) <= set(NodeType._value2member_map_):
+        raise HTTPException(status_code=400, detail="Unknown node type")
+
+    matches = await repo.search(query, type_filter, skip, limit)
+    return [
+        {
+            "id": properties["id"],
+            "label": display_label(node_type, properties),
             "type": node_type,
-            "properties": dict(node)
-        })
-    return nodes
+            "score": score,
+            "properties": properties
+        }
+        for node_type, properties, score in matches
+    ]
 
 
 @router.get("/neighbors/{node_id}")
-async def get_neighbors(node_id: str, db=Depends(get_db)):
-    query = """
-    MATCH (n {id: $id})-[r]-(neighbor)
-    RETURN neighbor, labels(neighbor) as labels, type(r) as relation_type,
-           startNode(r).id = $id as is_outgoing
-    """
-    result = db.run(query, id=node_id)
-    neighbors = []
-    for record in result:
-        node = record["neighbor"]
-        labels = record["labels"]
-        node_type = labels[0] if labels else "Unknown"
-
-        if "Book" in labels:
-            label = node.get("title", "Unknown Book")
-        elif "Author" in labels:
-            label = node.get("name", "Unknown Author")
-        else:
-            label = node.get("name", node.get("title", "Unknown"))
-
-        neighbors.append({
-            "id": node["id"],
-            "label": label,
-            "type": node_type,
-            "relation_type": record["relation_type"],
-            "is_outgoing": record["is_outgoing"],
-            "properties": dict(node)
-        })
-    return neighbors
+async def get_neighbors(node_id: str, repo=Depends(get_repository)):
+    return [
+        {
+            "id": neighbor["properties"]["id"],
+            "label": display_label(neighbor["label"], neighbor["properties"]),
+            "type": neighbor["label"],
+            "relation_type": neighbor["relation_type"],
+            "is_outgoing": neighbor["is_outgoing"],
+            "properties": neighbor["properties"]
+        }
+        for neighbor in await repo.neighbors(node_id)
+    ]
+
+
+@router.get("/subgraph", response_model=SubgraphData)
+async def get_subgraph(
+    seeds: str = Query(..., min_length=1, description="Comma-separated seed node ids"),
+    depth: int = Query(1, ge=0, le=MAX_SUBGRAPH_DEPTH),
+    max_nodes: int = Query(200, ge=1, le=MAX_SUBGRAPH_NODES),
+    max_fanout: int = Query(50, ge=1, le=MAX_SUBGRAPH_FANOUT, description="Relationships followed per node and hop"),
+    relation_types: Optional[str] = Query(None, description="Comma-separated relation types to follow"),
+    properties: bool = Query(False, description="Include full node properties"),
+    repo=Depends(get_repository)
+):
+    seed_ids = list(dict.fromkeys(seeds.split(",")))
+    if len(seed_ids) > MAX_SUBGRAPH_SEEDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SUBGRAPH_SEEDS} seeds per request")
+    rel_filter = _parse_filter(relation_types, RelationType._value2member_map_, "relation type")
+
+    nodes: dict[str, dict] = {}
+    links: dict[str, dict] = {}
+
+    def add_node(node_type: str, props: dict) -> bool:
+        if props["id"] in nodes:
+            return False
+        nodes[props["id"]] = _graph_node(node_type, props)
+        return True
+
+    frontier = []
+    for node_type, props in await repo.get_nodes(seed_ids, properties):
+        if len(nodes) < max_nodes and add_node(node_type, props):
+            frontier.append(props["id"])
+
+    # One repository call per hop: every frontier node contributes at most
+    # max_fanout relationships, and expansion stops at max_nodes.
+    truncated = False
+    for _ in range(depth):
+        if not frontier:
+            break
+        next_frontier = []
+        for row in await repo.expand(frontier, rel_filter, max_fanout, properties):
+            props = row["props"]
+            if props["id"] not in nodes:
+                if len(nodes) >= max_nodes:
+                    truncated = True
+                    continue
+                add_node(row["label"], props)
+                next_frontier.append(props["id"])
+            rel_props = row["rel_props"]
+            links.setdefault(rel_props["id"], _graph_link(row["source"], row["target"], row["type"], rel_props))
+        frontier = next_frontier
+
+    return FastJSONResponse({
+        "nodes": list(nodes.values()),
+        "links": list(links.values()),
+        "frontier": frontier,
+        "truncated": truncated,
+    })
+
+
+@router.get("/paths", response_model=PathsData)
+async def get_paths(
+    source: str = Query(..., description="Start node id"),
+    target: str = Query(..., description="End node id"),
+    limit: int = Query(1, ge=1, le=MAX_PATHS, description="Number of shortest paths to return"),
+    max_depth: int = Query(6, ge=1, le=MAX_PATH_DEPTH, description="Maximum number of links per path"),
+    relation_types: Optional[str] = Query(None, description="Comma-separated relation types to follow"),
+    timeout_ms: int = Query(200, ge=1, le=MAX_PATH_TIMEOUT_MS),
+    repo=Depends(get_repository)
+):
+    rel_filter = _parse_filter(relation_types, RelationType._value2member_map_, "relation type")
+    snapshot = await snapshot_cache.get(repo)
+    if source not in snapshot.index or target not in snapshot.index:
+        raise HTTPException(status_code=404, detail="Node not found")
+
+    csr = path_index.get(snapshot)
+    allowed_edges = None
+    if rel_filter:
+        allowed_types = [i for i, name in enumerate(snapshot.relation_types) if name in rel_filter]
+        allowed_edges = np.isin(snapshot.link_types, allowed_types)
+    found, complete = await asyncio.to_thread(
+        shortest_paths,
+        csr, snapshot.index[source], snapshot.index[target],
+        limit, max_depth, timeout_ms, allowed_edges
+    )
+
+    nodes: dict[int, GraphNode] = {}
+    paths = []
+    for path in found:
+        for i in path.nodes:
+            if i not in nodes:
+                node_type = snapshot.types[i]
+                nodes[i] = GraphNode(
+                    id=snapshot.ids[i],
+                    label=snapshot.labels[i],
+                    type=NodeType(node_type) if node_type in NodeType._value2member_map_ else NodeType.BOOK,
+                    properties={"id": snapshot.ids[i]}
+                )
+        paths.append(GraphPath(
+            nodes=[snapshot.ids[i] for i in path.nodes],
+            links=[
+                GraphLink(
+                    source=snapshot.ids[snapshot.sources[e]],
+                    target=snapshot.ids[snapshot.targets[e]],
+                    type=snapshot.relation_types[snapshot.link_types[e]]
+                )
+                for e in path.edges
+            ]
+        ))
+    return PathsData(nodes=list(nodes.values()), paths=paths, complete=complete)
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from app.database.connection import get_db
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
+from app.database.connection import get_repository
 from app.models.schemas import (
+    BatchResult, ImportResult, RelationshipBatch,
     RelationshipCreate, RelationshipResponse,
     EraCreate, EraResponse,
     MovementCreate, MovementResponse,
     CharacterCreate, CharacterResponse,
     PlotCreate, PlotResponse
 )
+from app.services.batch import BatchBuilder, check_batch_size, run_batch
+from app.services.changes import change_log, link_data, node_data
+from app.services.importer import BatchImporter, DEFAULT_BATCH_SIZE, PHASES
+from app.services.natural_keys import resolve_endpoint
+from app.services.pagination import (
+    LIMIT_DESCRIPTION, MAX_PAGE_SIZE, STREAM_DESCRIPTION, fetch_page, parse_fields, stream_page
+)
+from app.services.streaming import CatalogParseError, detect_format, stream_catalog
+from typing import Literal, Optional
 import json
 
 router = APIRouter()
@@ -14,162 +24,134 @@ router = APIRouter()
 
 # Era endpoints
 @router.post("/eras", response_model=EraResponse)
-async def create_era(era: EraCreate, db=Depends(get_db)):
-    query = """
-    CREATE (e:Era {
-        id: randomUUID(),
-        name: $name,
-        start_year: $start_year,
-        end_year: $end_year
-    })
-    RETURN e
-    """
-    result = db.run(query, name=era.name, start_year=era.start_year, end_year=era.end_year)
-    record = result.single()
-    if record:
-        node = record["e"]
-        return EraResponse(
-            id=node["id"],
-            name=node["name"],
-            start_year=node.get("start_year"),
-            end_year=node.get("end_year")
-        )
-    raise HTTPException(status_code=500, detail="Failed to create era")
-
-
-@router.get("/eras", response_model=list[EraResponse])
-async def get_eras(db=Depends(get_db)):
-    query = "MATCH (e:Era) RETURN e"
-    result = db.run(query)
-    return [EraResponse(
-        id=r["e"]["id"],
-        name=r["e"]["name"],
-        start_year=r["e"].get("start_year"),
-        end_year=r["e"].get("end_year")
-    ) for r in result]
+async def create_era(era: EraCreate, repo=Depends(get_repository)):
+    node = await repo.create_node("Era", era.model_dump())
+    change_log.record("added", "node", node["id"], node_data("Era", node))
+    return EraResponse(
+        id=node["id"],
+        name=node["name"],
+        start_year=node.get("start_year"),
+        end_year=node.get("end_year")
+    )
+
+
+@router.get("/eras", response_model=list[EraResponse], response_model_exclude_unset=True)
+async def get_eras(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description=STREAM_DESCRIPTION),
+    repo=Depends(get_repository)
+):
+    field_list = parse_fields(fields, EraResponse)
+    if stream:
+        return stream_page("Era", field_list, cursor, limit)
+    rows = await fetch_page(repo, "Era", field_list, cursor, limit, response)
+    return [EraResponse(**row) for row in rows]
 
 
 # Movement endpoints
 @router.post("/movements", response_model=MovementResponse)
-async def create_movement(movement: MovementCreate, db=Depends(get_db)):
-    query = """
-    CREATE (m:Movement {
-        id: randomUUID(),
-        name: $name,
-        description: $description
-    })
-    RETURN m
-    """
-    result = db.run(query, name=movement.name, description=movement.description)
-    record = result.single()
-    if record:
-        node = record["m"]
-        return MovementResponse(
-            id=node["id"],
-            name=node["name"],
-            description=node.get("description")
-        )
-    raise HTTPException(status_code=500, detail="Failed to create movement")
-
-
-@router.get("/movements", response_model=list[MovementResponse])
-async def get_movements(db=Depends(get_db)):
-    query = "MATCH (m:Movement) RETURN m"
-    result = db.run(query)
-    return [MovementResponse(
-        id=r["m"]["id"],
-        name=r["m"]["name"],
-        description=r["m"].get("description")
-    ) for r in result]
+async def create_movement(movement: MovementCreate, repo=Depends(get_repository)):
+    node = await repo.create_node("Movement", movement.model_dump())
+    change_log.record("added", "node", node["id"], node_data("Movement", node))
+    return MovementResponse(
+        id=node["id"],
+        name=node["name"],
+        description=node.get("description")
+    )
+
+
+@router.get("/movements", response_model=list[MovementResponse], response_model_exclude_unset=True)
+async def get_movements(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description=STREAM_DESCRIPTION),
+    repo=Depends(get_repository)
+):
+    field_list = parse_fields(fields, MovementResponse)
+    if stream:
+        return stream_page("Movement", field_list, cursor, limit)
+    rows = await fetch_page(repo, "Movement", field_list, cursor, limit, response)
+    return [MovementResponse(**row) for row in rows]
 
 
 # Character endpoints
 @router.post("/characters", response_model=CharacterResponse)
-async def create_character(character: CharacterCreate, db=Depends(get_db)):
-    query = """
-    CREATE (c:Character {
-        id: randomUUID(),
-        name: $name,
-        traits: $traits
-    })
-    RETURN c
-    """
-    result = db.run(query, name=character.name, traits=character.traits)
-    record = result.single()
-    if record:
-        node = record["c"]
-        return CharacterResponse(
-            id=node["id"],
-            name=node["name"],
-            traits=node.get("traits")
-        )
-    raise HTTPException(status_code=500, detail="Failed to create character")
-
-
-@router.get("/characters", response_model=list[CharacterResponse])
-async def get_characters(db=Depends(get_db)):
-    query = "MATCH (c:Character) RETURN c"
-    result = db.run(query)
-    return [CharacterResponse(
-        id=r["c"]["id"],
-        name=r["c"]["name"],
-        traits=r["c"].get("traits")
-    ) for r in result]
+async def create_character(character: CharacterCreate, repo=Depends(get_repository)):
+    node = await repo.create_node("Character", character.model_dump())
+    change_log.record("added", "node", node["id"], node_data("Character", node))
+    return CharacterResponse(
+        id=node["id"],
+        name=node["name"],
+        traits=node.get("traits")
+    )
+
+
+@router.get("/characters", response_model=list[CharacterResponse], response_model_exclude_unset=True)
+async def get_characters(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description=STREAM_DESCRIPTION),
+    repo=Depends(get_repository)
+):
+    field_list = parse_fields(fields, CharacterResponse)
+    if stream:
+        return stream_page("Character", field_list, cursor, limit)
+    rows = await fetch_page(repo, "Character", field_list, cursor, limit, response)
+    return [CharacterResponse(**row) for row in rows]
 
 
 # Plot endpoints
 @router.post("/plots", response_model=PlotResponse)
-async def create_plot(plot: PlotCreate, db=Depends(get_db)):
-    query = """
-    CREATE (p:Plot {
-        id: randomUUID(),
-        name: $name,
-        description: $description
-    })
-    RETURN p
-    """
-    result = db.run(query, name=plot.name, description=plot.description)
-    record = result.single()
-    if record:
-        node = record["p"]
-        return PlotResponse(
-            id=node["id"],
-            name=node["name"],
-            description=node.get("description")
-        )
-    raise HTTPException(status_code=500, detail="Failed to create plot")
-
-
-@router.get("/plots", response_model=list[PlotResponse])
-async def get_plots(db=Depends(get_db)):
-    query = "MATCH (p:Plot) RETURN p"
-    result = db.run(query)
-    return [PlotResponse(
-        id=r["p"]["id"],
-        name=r["p"]["name"],
-        description=r["p"].get("description")
-    ) for r in result]
+async def create_plot(plot: PlotCreate, repo=Depends(get_repository)):
+    node = await repo.create_node("Plot", plot.model_dump())
+    change_log.record("added", "node", node["id"], node_data("Plot", node))
+    return PlotResponse(
+        id=node["id"],
+        name=node["name"],
+        description=node.get("description")
+    )
+
+
+@router.get("/plots", response_model=list[PlotResponse], response_model_exclude_unset=True)
+async def get_plots(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=LIMIT_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[Literal["ndjson"]] = Query(None, description=STREAM_DESCRIPTION),
+    repo=Depends(get_repository)
+):
+    field_list = parse_fields(fields, PlotResponse)
+    if stream:
+        return stream_page("Plot", field_list, cursor, limit)
+    rows = await fetch_page(repo, "Plot", field_list, cursor, limit, response)
+    return [PlotResponse(**row) for row in rows]
 
 
 # Relationship creation
 @router.post("/connect", response_model=RelationshipResponse)
-async def create_relationship(rel: RelationshipCreate, db=Depends(get_db)):
-    query = f"""
-    MATCH (a {{id: $source_id}}), (b {{id: $target_id}})
-    CREATE (a)-[r:{rel.relation_type.value} {{id: randomUUID()}}]->(b)
-    SET r += $properties
-    RETURN r, a.id as source, b.id as target
-    """
-    result = db.run(query,
-                    source_id=rel.source_id,
-                    target_id=rel.target_id,
-                    properties=rel.properties or {})
-    record = result.single()
-    if record:
+async def create_relationship(rel: RelationshipCreate, repo=Depends(get_repository)):
+    source_id = await resolve_endpoint(repo, rel.source_id, rel.source_key, "source")
+    target_id = await resolve_endpoint(repo, rel.target_id, rel.target_key, "target")
+    created = await repo.create_relationship(
+        source_id, target_id, rel.relation_type.value, rel.properties or {}
+    )
+    if created:
+        change_log.record("added", "link", created["id"], link_data(
+            created["id"], created["source"], created["target"],
+            rel.relation_type.value, created["properties"]
+        ))
         return RelationshipResponse(
-            id=record["r"]["id"],
-            source_id=record["source"],
-            target_id=record["target"],
+            id=created["id"],
+            source_id=created["source"],
+            target_id=created["target"],
             relation_type=rel.relation_type.value,
             properties=rel.properties
         )
@@ -177,76 +159,71 @@ async def create_relationship(rel: RelationshipCreate, db=Depends(get_db)):
 
 
 @router.delete("/connect/{relationship_id}")
-async def delete_relationship(relationship_id: str, db=Depends(get_db)):
-    query = """
-    MATCH ()-[r {id: $id}]-()
-    DELETE r
-    RETURN count(r) as deleted
-    """
-    result = db.run(query, id=relationship_id)
-    record = result.single()
-    if record and record["deleted"] > 0:
+async def delete_relationship(relationship_id: str, repo=Depends(get_repository)):
+    if await repo.delete_relationship(relationship_id):
+        change_log.record("removed", "link", relationship_id)
         return {"message": "Relationship deleted successfully"}
     raise HTTPException(status_code=404, detail="Relationship not found")
 
 
+# Batch writes: nodes created in the batch can be linked through their ref
+@router.post("/batch", response_model=BatchResult)
+async def batch_relationships(
+    batch: RelationshipBatch,
+    response: Response,
+    atomic: bool = Query(False, description="Write nothing unless every item applies"),
+    repo=Depends(get_repository)
+):
+    check_batch_size(batch.nodes, batch.create, batch.delete)
+    builder = BatchBuilder()
+    for index, node in enumerate(batch.nodes):
+        builder.create_node("nodes", index, node.type.value, node.properties, node.ref)
+    for index, rel in enumerate(batch.create):
+        builder.create_relationship("create", index, rel)
+    for index, rel_id in enumerate(batch.delete):
+        builder.delete_relationship("delete", index, rel_id)
+    result = await run_batch(repo, builder, atomic)
+    if result.error:
+        response.status_code = 500
+    return result
+
+
 # Import data from JSON
-@router.post("/import")
-async def import_data(file: UploadFile = File(...), db=Depends(get_db)):
-    content = await file.read()
-    data = json.loads(content)
-
-    imported = {"books": 0, "authors": 0, "relationships": 0}
-
-    # Import authors
-    for author in data.get("authors", []):
-        author_data = {
-            "name": author.get("name"),
-            "birth_year": author.get("birth_year"),
-            "death_year": author.get("death_year"),
-            "nationality": author.get("nationality")
-        }
-        query = """
-        MERGE (a:Author {name: $name})
-        SET a.id = coalesce(a.id, randomUUID()),
-            a.birth_year = $birth_year,
-            a.death_year = $death_year,
-            a.nationality = $nationality
-        """
-        db.run(query, **author_data)
-        imported["authors"] += 1
-
-    # Import books
-    for book in data.get("books", []):
-        book_data = {
-            "title": book.get("title"),
-            "publication_year": book.get("publication_year"),
-            "genre": book.get("genre"),
-            "description": book.get("description")
-        }
-        query = """
-        MERGE (b:Book {title: $title})
-        SET b.id = coalesce(b.id, randomUUID()),
-            b.publication_year = $publication_year,
-            b.genre = $genre,
-            b.description = $description
-        """
-        db.run(query, **book_data)
-        imported["books"] += 1
-
-    # Import relationships
-    for rel in data.get("relationships", []):
-        rel_type = rel.get("type", "SIMILAR_TO")
-        # Handle both title and name for matching
-        source = rel["source"]
-        target = rel["target"]
-        query = f"""
-        MATCH (a) WHERE a.name = $source OR a.title = $source
-        MATCH (b) WHERE b.name = $target OR b.title = $target
-        MERGE (a)-[r:{rel_type}]->(b)
-        SET r.id = coalesce(r.id, randomUUID())
-        """
-        db.run(query, source=source, target=target)
-        imported["relationships"] += 1
-
-    return {"message": "Import completed", "imported": imported}
+@router.post("/import", response_model=ImportResult)
+async def import_data(
+    response: Response,
+    file: UploadFile = File(...),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    resume_phase: Optional[Literal["authors", "books", "relationships"]] = Query(None),
+    resume_offset: int = Query(0, ge=0),
+    stream: bool = Query(False, description="Parse the file incrementally and write rows as they are read"),
+    format: Optional[Literal["json", "ndjson"]] = Query(None, description="File format; detected from the file name if omitted"),
+    repo=Depends(get_repository)
+):
+    fmt = format or detect_format(file.filename, file.content_type)
+    importer = BatchImporter(repo, batch_size, resume_phase, resume_offset)
+
+    if stream or fmt == "ndjson":
+        try:
+            async for phase, item in stream_catalog(file, fmt):
+                if not await importer.add(phase, item):
+                    break
+        except CatalogParseError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid import file: {exc}")
+    else:
+        content = await file.read()
+        try:
+            data = json.loads(content)
+            # Like the streaming parser, ignore phase keys that are not arrays.
+            items = {phase: data.get(phase) if isinstance(data.get(phase), list) else [] for phase in PHASES}
+        except (ValueError, AttributeError) as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid import file: {exc}")
+        for phase in PHASES:
+            for item in items[phase]:
+                if not await importer.add(phase, item):
+                    break
+
+    result = await importer.finish()
+    if result.failure:
+        response.status_code = 500
+    return result
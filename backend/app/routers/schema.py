@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+from app.database.connection import get_repository
+
+router = APIRouter()
+
+
+@router.get("")
+@router.get("/")
+async def get_schema(repo=Depends(get_repository)):
+    return await repo.schema_state()
@@ -0,0 +1,224 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.services.snapshot import GraphSnapshot
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-8
+PAGERANK_MAX_ITERATIONS = 100
+COMMUNITY_MAX_ITERATIONS = 30
+
+
+@dataclass
+class CsrGraph:
+    """Compressed sparse row adjacency over a snapshot's node indexes.
+
+    The neighbors of node ``i`` are ``indices[indptr[i]:indptr[i + 1]]``;
+    ``edges`` holds the snapshot link each entry came from, so relation
+    types can be looked up through ``snapshot.link_types[edges]``.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    edges: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return len(self.indptr) - 1
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def entries(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Positions in ``indices`` of the neighbor lists of ``nodes``,
+        concatenated, along with the node each position belongs to."""
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        offsets = np.cumsum(counts) - counts
+        positions = np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+        return positions, np.repeat(nodes, counts)
+
+
+def build_csr(node_count: int, sources: np.ndarray, targets: np.ndarray, directed: bool = False) -> CsrGraph:
+    """CSR adjacency from parallel edge arrays; undirected graphs list every
+    link under both endpoints."""
+    edges = np.arange(len(sources), dtype=np.int32)
+    if not directed:
+        sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        edges = np.concatenate([edges, edges])
+    order = np.argsort(sources, kind="stable")
+    counts = np.bincount(sources, minlength=node_count)
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return CsrGraph(indptr, targets[order].astype(np.int32), edges[order])
+
+
+def pagerank(
+    node_count: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    damping: float = PAGERANK_DAMPING,
+    tolerance: float = PAGERANK_TOLERANCE,
+    max_iterations: int = PAGERANK_MAX_ITERATIONS
+) -> np.ndarray:
+    """Power-iteration PageRank over directed links; the rank of nodes
+    without outgoing links is spread evenly over all nodes."""
+    if node_count == 0:
+        return np.zeros(0)
+    out_degree = np.bincount(sources, minlength=node_count).astype(np.float64)
+    dangling = out_degree == 0
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(node_count), where=~dangling)
+    rank = np.full(node_count, 1.0 / node_count)
+    for _ in range(max_iterations):
+        spread = np.bincount(targets, rank[sources] * inverse_degree[sources], minlength=node_count)
+        updated = damping * (spread + rank[dangling].sum() / node_count) + (1 - damping) / node_count
+        converged = np.abs(updated - rank).sum() < tolerance
+        rank = updated
+        if converged:
+            break
+    return rank
+
+
+def _compact(labels: np.ndarray) -> np.ndarray:
+    """Renumber labels 0..k-1, largest group first."""
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse].astype(np.int32)
+
+
+def connected_components(node_count: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Weakly connected components by min-label propagation with pointer
+    jumping; returns one component id per node, largest component first."""
+    labels = np.arange(node_count)
+    if node_count == 0 or len(sources) == 0:
+        return _compact(labels)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, sources, labels[targets])
+        np.minimum.at(updated, targets, labels[sources])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return _compact(labels)
+        labels = updated
+
+
+def communities(
+    csr: CsrGraph,
+    max_iterations: int = COMMUNITY_MAX_ITERATIONS,
+    seed: int = 0
+) -> np.ndarray:
+    """Label propagation: each node repeatedly adopts the most common label
+    among its neighbors (ties go to the smallest label).
+
+    Updates are semi-synchronous: every round only a random half of the
+    nodes moves, which keeps bipartite structures (author/book) from
+    flipping labels back and forth forever.
+    """
+    n = csr.node_count
+    labels = np.arange(n)
+    if n == 0 or len(csr.indices) == 0:
+        return _compact(labels)
+    rng = np.random.default_rng(seed)
+    owners = np.repeat(np.arange(n, dtype=np.int64), csr.degree())
+    has_neighbors = csr.degree() > 0
+    for _ in range(max_iterations):
+        # Count (node, label) pairs: sort the combined keys, measure runs.
+        keys = np.sort(owners * n + labels[csr.indices])
+        boundary = np.ones(len(keys), dtype=bool)
+        boundary[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(boundary)
+        run_owner, run_label = np.divmod(keys[starts], n)
+        run_count = np.diff(np.append(starts, len(keys)))
+        # Best run per node: highest count, then smallest label (runs are
+        # already ordered by label within a node).
+        best_count = np.zeros(n, dtype=run_count.dtype)
+        np.maximum.at(best_count, run_owner, run_count)
+        winners = np.flatnonzero(run_count == best_count[run_owner])
+        first = np.ones(len(winners), dtype=bool)
+        first[1:] = run_owner[winners][1:] != run_owner[winners][:-1]
+        chosen = np.full(n, -1)
+        chosen[run_owner[winners][first]] = run_label[winners][first]
+
+        if np.array_equal(chosen[has_neighbors], labels[has_neighbors]):
+            break
+        move = has_neighbors & (rng.random(n) < 0.5)
+        labels = np.where(move, chosen, labels)
+    return _compact(labels)
+
+
+@dataclass
+class GraphMetrics:
+    seq: int
+    ids: list[str]
+    degree: np.ndarray
+    in_degree: np.ndarray
+    out_degree: np.ndarray
+    pagerank: np.ndarray
+    component: np.ndarray
+    community: np.ndarray
+
+    def node(self, i: int) -> dict:
+        return {
+            "degree": int(self.degree[i]),
+            "in_degree": int(self.in_degree[i]),
+            "out_degree": int(self.out_degree[i]),
+            "pagerank": round(float(self.pagerank[i]), 8),
+            "component": int(self.component[i]),
+            "community": int(self.community[i]),
+        }
+
+    def nodes(self) -> dict[str, dict]:
+        return {node_id: self.node(i) for i, node_id in enumerate(self.ids)}
+
+    def summary(self) -> dict:
+        component_sizes = np.bincount(self.component) if len(self.component) else np.zeros(0, dtype=int)
+        return {
+            "seq": self.seq,
+            "node_count": len(self.ids),
+            "link_count": int(self.out_degree.sum()),
+            "components": len(component_sizes),
+            "largest_component": int(component_sizes.max()) if len(component_sizes) else 0,
+            "communities": int(self.community.max()) + 1 if len(self.community) else 0,
+        }
+
+
+def compute_metrics(snapshot: GraphSnapshot) -> GraphMetrics:
+    n = snapshot.node_count
+    csr = build_csr(n, snapshot.sources, snapshot.targets)
+    return GraphMetrics(
+        seq=snapshot.seq,
+        ids=snapshot.ids,
+        degree=csr.degree(),
+        in_degree=np.bincount(snapshot.targets, minlength=n),
+        out_degree=np.bincount(snapshot.sources, minlength=n),
+        pagerank=pagerank(n, snapshot.sources, snapshot.targets),
+        component=connected_components(n, snapshot.sources, snapshot.targets),
+        community=communities(csr)
+    )
+
+
+class MetricsCache:
+    """Metrics of the latest snapshot, recomputed off the event loop."""
+
+    def __init__(self):
+        self.metrics: Optional[GraphMetrics] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, snapshot: GraphSnapshot) -> GraphMetrics:
+        if self.metrics is not None and self.metrics.seq == snapshot.seq:
+            return self.metrics
+        async with self._lock:
+            if self.metrics is None or self.metrics.seq != snapshot.seq:
+                self.metrics = await asyncio.to_thread(compute_metrics, snapshot)
+            return self.metrics
+
+
+metrics_cache = MetricsCache()
@@ -0,0 +1,192 @@
+import uuid
+from typing import Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+from app.database.repository import BATCH_ACTIONS, BatchOperation, StorageError
+from app.models.schemas import (
+    AuthorCreate, BatchItemResult, BatchResult, BookCreate, CharacterCreate, EraCreate,
+    MovementCreate, NodeType, PlotCreate, RelationshipBatchCreate
+)
+from app.services.changes import change_log, link_data, node_data
+
+MAX_BATCH_SIZE = 1000
+
+CREATE_MODELS: dict[NodeType, type[BaseModel]] = {
+    NodeType.BOOK: BookCreate,
+    NodeType.AUTHOR: AuthorCreate,
+    NodeType.ERA: EraCreate,
+    NodeType.MOVEMENT: MovementCreate,
+    NodeType.CHARACTER: CharacterCreate,
+    NodeType.PLOT: PlotCreate,
+}
+
+NOT_FOUND = {
+    "create_relationship": "Source or target node not found",
+    "delete_relationship": "Relationship not found",
+}
+
+
+def _clean(properties: dict) -> dict:
+    return {key: value for key, value in properties.items() if value is not None}
+
+
+class BatchBuilder:
+    """Turns the items of one batch request into repository operations.
+
+    Created nodes get their ids here rather than in the database, so a
+    ``ref`` naming a node created earlier in the batch resolves to its id
+    before anything is written. Items that cannot become an operation
+    (unknown or duplicate ref, invalid properties, nothing to update) are
+    reported as failed and never reach the repository.
+    """
+
+    def __init__(self):
+        self.results: list[BatchItemResult] = []
+        self.refs: dict[str, str] = {}
+        self._failed_refs: set[str] = set()
+        self._operations: list[tuple[BatchOperation, BatchItemResult]] = []
+
+    def _result(self, section: str, index: int, ref: Optional[str] = None) -> BatchItemResult:
+        result = BatchItemResult(section=section, index=index, ref=ref)
+        self.results.append(result)
+        return result
+
+    def _add(self, op: BatchOperation, result: BatchItemResult):
+        self._operations.append((op, result))
+
+    def create_node(self, section: str, index: int, label: str, properties: dict, ref: Optional[str] = None):
+        result = self._result(section, index, ref)
+        if ref is not None and (ref in self.refs or ref in self._failed_refs):
+            result.error = f"Duplicate ref '{ref}'"
+            return
+        try:
+            properties = CREATE_MODELS[NodeType(label)].model_validate(properties).model_dump()
+        except ValidationError as exc:
+            result.error = f"Invalid properties: {exc.errors()[0]['msg']}"
+            if ref is not None:
+                self._failed_refs.add(ref)
+            return
+        node_id = str(uuid.uuid4())
+        if ref is not None:
+            self.refs[ref] = node_id
+        result.id = node_id
+        self._add(BatchOperation("create_node", node_id, label, {**_clean(properties), "id": node_id}), result)
+
+    def update_node(self, section: str, index: int, label: str, node_id: str, updates: dict):
+        result = self._result(section, index)
+        result.id = node_id
+        if not updates:
+            result.error = "No fields to update"
+            return
+        self._add(BatchOperation("update_node", node_id, label, updates), result)
+
+    def delete_node(self, section: str, index: int, label: str, node_id: str):
+        result = self._result(section, index)
+        result.id = node_id
+        self._add(BatchOperation("delete_node", node_id, label), result)
+
+    def _endpoint(self, node_id: Optional[str], ref: Optional[str], end: str) -> tuple[Optional[str], Optional[str]]:
+        if (node_id is None) == (ref is None):
+            return None, f"Give exactly one of {end}_id and {end}_ref"
+        if node_id is not None:
+            return node_id, None
+        if ref in self._failed_refs:
+            return None, f"Node '{ref}' was not created"
+        if ref not in self.refs:
+            return None, f"Unknown ref '{ref}'"
+        return self.refs[ref], None
+
+    def create_relationship(self, section: str, index: int, rel: RelationshipBatchCreate):
+        result = self._result(section, index)
+        source, error = self._endpoint(rel.source_id, rel.source_ref, "source")
+        if error is None:
+            target, error = self._endpoint(rel.target_id, rel.target_ref, "target")
+        if error is not None:
+            result.error = error
+            return
+        rel_id = str(uuid.uuid4())
+        result.id = rel_id
+        self._add(BatchOperation(
+            "create_relationship", rel_id, rel.relation_type.value,
+            {**_clean(rel.properties or {}), "id": rel_id}, source, target
+        ), result)
+
+    def delete_relationship(self, section: str, index: int, rel_id: str):
+        result = self._result(section, index)
+        result.id = rel_id
+        self._add(BatchOperation("delete_relationship", rel_id), result)
+
+    def operations(self) -> list[tuple[BatchOperation, BatchItemResult]]:
+        return sorted(self._operations, key=lambda item: BATCH_ACTIONS.index(item[0].action))
+
+
+def check_batch_size(*sections: list):
+    if sum(len(section) for section in sections) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"A batch holds at most {MAX_BATCH_SIZE} items")
+
+
+def build_node_batch(label: str, batch) -> BatchBuilder:
+    """Builder for a ``BookBatch``/``AuthorBatch`` of one label."""
+    check_batch_size(batch.create, batch.update, batch.delete)
+    builder = BatchBuilder()
+    for index, item in enumerate(batch.create):
+        builder.create_node("create", index, label, item.model_dump(exclude={"ref"}), item.ref)
+    for index, item in enumerate(batch.update):
+        builder.update_node("update", index, label, item.id, item.model_dump(exclude={"id"}, exclude_none=True))
+    for index, node_id in enumerate(batch.delete):
+        builder.delete_node("delete", index, label, node_id)
+    return builder
+
+
+def _record(op: BatchOperation, outcome):
+    if op.action == "create_node":
+        change_log.record("added", "node", op.id, node_data(op.label, outcome))
+    elif op.action == "update_node":
+        change_log.record("updated", "node", op.id, node_data(op.label, outcome))
+    elif op.action == "create_relationship":
+        change_log.record("added", "link", op.id, link_data(
+            op.id, outcome["source"], outcome["target"], op.label, outcome["properties"]
+        ))
+    elif op.action == "delete_relationship":
+        change_log.record("removed", "link", op.id)
+    elif op.action == "delete_node":
+        for link_id in outcome:
+            change_log.record("removed", "link", link_id)
+        change_log.record("removed", "node", op.id)
+
+
+async def run_batch(repo, builder: BatchBuilder, atomic: bool) -> BatchResult:
+    """Apply the builder's operations in one repository transaction and
+    fill in the per-item results.
+
+    Without ``atomic`` every applicable item is committed and the others
+    are reported; with it nothing is written unless every item applies.
+    """
+    operations = builder.operations()
+    rejected = len(operations) < len(builder.results)
+    if not operations or (atomic and rejected):
+        outcomes, committed = [None] * len(operations), not (atomic and rejected)
+    else:
+        try:
+            outcomes, committed = await repo.apply_batch([op for op, _ in operations], atomic)
+        except StorageError as exc:
+            for op, result in operations:
+                result.error = "Not applied"
+                if op.action.startswith("create"):
+                    result.id = None
+            return BatchResult(committed=False, results=builder.results, error=str(exc))
+
+    for (op, result), outcome in zip(operations, outcomes):
+        if outcome is not None and committed:
+            result.ok = True
+            _record(op, outcome)
+            continue
+        if outcome is None and not (atomic and rejected):
+            result.error = NOT_FOUND.get(op.action, f"{op.label} not found")
+        else:
+            result.error = "Not applied: the batch was rolled back"
+        if op.action.startswith("create"):
+            result.id = None
+    return BatchResult(committed=committed, results=builder.results)
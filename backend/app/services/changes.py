@@ -0,0 +1,109 @@
+import os
+import uuid
+from collections import deque
+from typing import Literal, Optional
+
+from app.services.graph_cache import graph_cache
+
+CHANGE_LOG_MAX_ENTRIES = int(os.getenv("CHANGE_LOG_MAX_ENTRIES", "10000"))
+
+Op = Literal["added", "updated", "removed"]
+Kind = Literal["node", "link"]
+
+
+def display_label(node_type: str, properties: dict) -> str:
+    if node_type == "Book":
+        return properties.get("title", "Unknown Book")
+    if node_type == "Author":
+        return properties.get("name", "Unknown Author")
+    return properties.get("name", properties.get("title", "Unknown"))
+
+
+def node_data(node_type: str, properties: dict) -> dict:
+    return {
+        "id": properties["id"],
+        "label": display_label(node_type, properties),
+        "type": node_type,
+        "properties": properties,
+    }
+
+
+def link_data(link_id: str, source: str, target: str, rel_type: str, properties: Optional[dict] = None) -> dict:
+    return {
+        "id": link_id,
+        "source": source,
+        "target": target,
+        "type": rel_type,
+        "properties": properties,
+    }
+
+
+class ChangeLog:
+    """Ordered, bounded log of graph mutations.
+
+    Every entry gets the next sequence number. Once the log is full the
+    oldest entries are dropped and ``compacted_through`` advances; clients
+    asking for changes from before that point need a full snapshot. The
+    ``epoch`` identifies this process so sequence numbers from a previous
+    run are never mistaken for current ones.
+    """
+
+    def __init__(self, max_entries: int = CHANGE_LOG_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.compacted_through = 0
+        self._entries: deque[dict] = deque()
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """Call ``listener(entry)`` for every entry recorded from now on."""
+        self._listeners.append(listener)
+
+    def record(self, op: Op, kind: Kind, item_id: str, data: Optional[dict] = None) -> int:
+        self.seq += 1
+        entry = {"seq": self.seq, "op": op, "kind": kind, "id": item_id, "data": data}
+        self._entries.append(entry)
+        while len(self._entries) > self.max_entries:
+            self.compacted_through = self._entries.popleft()["seq"]
+        graph_cache.invalidate()
+        for listener in self._listeners:
+            listener(entry)
+        return self.seq
+
+    def since(self, seq: int) -> Optional[list[dict]]:
+        """Entries after ``seq``, or None if they are no longer available."""
+        if seq < self.compacted_through or seq > self.seq:
+            return None
+        return [entry for entry in self._entries if entry["seq"] > seq]
+
+
+def coalesce(entries: list[dict]) -> dict:
+    """Fold a run of entries into the net added/updated/removed sets."""
+    state: dict[tuple[str, str], tuple[str, Optional[dict]]] = {}
+    for entry in entries:
+        key = (entry["kind"], entry["id"])
+        previous = state.get(key)
+        op = entry["op"]
+        if previous is not None:
+            if previous[0] == "added" and op == "removed":
+                # Created and deleted within the window: nothing to report.
+                del state[key]
+                continue
+            if previous[0] == "added" and op == "updated":
+                op = "added"
+            if previous[0] == "removed" and op == "added":
+                op = "updated"
+        state[key] = (op, entry["data"])
+
+    delta = {
+        kind: {"added": [], "updated": [], "removed": []}
+        for kind in ("nodes", "links")
+    }
+    for (kind, item_id), (op, data) in state.items():
+        bucket = delta["nodes" if kind == "node" else "links"][op]
+        bucket.append(item_id if op == "removed" else data)
+    return delta
+
+
+change_log = ChangeLog()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+from typing import Optional
+
+from app.services.changes import change_log, coalesce
+
+# Changes are collected for this long before being sent, so a burst (an
+# import writes thousands of rows) goes out as a few coalesced messages.
+EVENT_FLUSH_INTERVAL = float(os.getenv("EVENT_FLUSH_INTERVAL", "0.1"))
+
+# Pending messages per subscriber before it is considered too slow. A
+# lagging subscriber gets a single "resync" message instead of the backlog.
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "64"))
+
+KEEPALIVE_INTERVAL = 15.0
+
+
+class Subscriber:
+    def __init__(self, max_pending: int = EVENT_QUEUE_SIZE):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(max_pending)
+        self.lagging = False
+        self.dropped = 0
+
+
+class Broadcaster:
+    """Fans change-log entries out to connected clients as SSE messages.
+
+    Entries are buffered and flushed every ``flush_interval`` seconds as one
+    ``changes`` message holding the net delta, encoded once and shared by
+    every subscriber. Delivery never blocks the writer: a subscriber whose
+    queue is full is marked lagging, its queue is replaced by one ``resync``
+    message, and it is expected to refetch from ``/api/graph/changes``.
+    """
+
+    def __init__(self, flush_interval: float = EVENT_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.subscribers: set[Subscriber] = set()
+        self.messages_sent = 0
+        self.resyncs = 0
+        self._pending: list[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, max_pending: int = EVENT_QUEUE_SIZE) -> Subscriber:
+        subscriber = Subscriber(max_pending)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, entry: dict):
+        if not self.subscribers:
+            return
+        self._pending.append(entry)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self.flush()
+
+    def flush(self):
+        entries, self._pending = self._pending, []
+        if not entries:
+            return
+        message = format_event("changes", {
+            "epoch": change_log.epoch,
+            "from_seq": entries[0]["seq"] - 1,
+            "seq": entries[-1]["seq"],
+            **coalesce(entries),
+        })
+        for subscriber in list(self.subscribers):
+            self._deliver(subscriber, message)
+
+    def _deliver(self, subscriber: Subscriber, message: str):
+        if subscriber.lagging:
+            subscriber.dropped += 1
+            return
+        try:
+            subscriber.queue.put_nowait(message)
+            self.messages_sent += 1
+        except asyncio.QueueFull:
+            subscriber.lagging = True
+            subscriber.dropped += subscriber.queue.qsize() + 1
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(format_event("resync", {
+                "epoch": change_log.epoch,
+                "seq": change_log.seq,
+            }))
+            self.resyncs += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            "lagging": sum(1 for subscriber in self.subscribers if subscriber.lagging),
+            "pending_entries": len(self._pending),
+            "messages_sent": self.messages_sent,
+            "resyncs": self.resyncs,
+        }
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+async def event_stream(request):
+    # Subscribe only once the response body starts, so a client that
+    # disconnects before then never leaves a subscriber behind.
+    subscriber = broadcaster.subscribe()
+    try:
+        yield format_event("hello", {"epoch": change_log.epoch, "seq": change_log.seq})
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield message
+            if subscriber.lagging and subscriber.queue.empty():
+                # The resync message has been sent; the client reconnects.
+                break
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+broadcaster = Broadcaster()
+change_log.subscribe(broadcaster.publish)
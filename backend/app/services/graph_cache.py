@@ -0,0 +1,87 @@
+import hashlib
+import os
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+GRAPH_CACHE_MAX_ENTRIES = int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "32"))
+GRAPH_CACHE_MAX_BYTES = int(os.getenv("GRAPH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class GraphCache:
+    """Serialized graph snapshots keyed by request variant (filters, format).
+
+    Every write bumps ``version``; entries only ever belong to the current
+    version, so a bump simply drops them. ETags include a per-process epoch
+    so a restarted server never confirms a client's copy from a previous
+    process that happened to reach the same version number.
+    """
+
+    def __init__(self, max_entries: int = GRAPH_CACHE_MAX_ENTRIES, max_bytes: int = GRAPH_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+
+    def invalidate(self) -> int:
+        self.version += 1
+        self._entries.clear()
+        self._bytes = 0
+        return self.version
+
+    def etag(self, key: str, version: Optional[int] = None) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+        return f'W/"{self.epoch}-{self.version if version is None else version}-{digest}"'
+
+    def get(self, key: str) -> Optional[bytes]:
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key: str, payload: bytes, version: int):
+        # The snapshot was read before a concurrent write landed; don't
+        # store it under the newer version.
+        if version != self.version or len(payload) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = payload
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+graph_cache = GraphCache()
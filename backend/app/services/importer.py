@@ -0,0 +1,218 @@
+import time
+from typing import Optional
+
+from app.database.repository import StorageError
+from app.models.schemas import (
+    AmbiguousKey, ImportFailure, ImportPhaseStats, ImportResult, KeyMatch, RelationType
+)
+from app.services.changes import change_log, link_data, node_data
+from app.services.natural_keys import natural_keys
+
+PHASES = ("authors", "books", "relationships")
+PHASE_LABELS = {"authors": "Author", "books": "Book"}
+
+DEFAULT_BATCH_SIZE = 500
+
+# Ambiguous relationship endpoints listed in the import result
+MAX_AMBIGUOUS_REPORTED = 100
+
+
+def author_row(author: dict) -> Optional[dict]:
+    if not author.get("name"):
+        return None
+    return {
+        "name": author.get("name"),
+        "birth_year": author.get("birth_year"),
+        "death_year": author.get("death_year"),
+        "nationality": author.get("nationality")
+    }
+
+
+def book_row(book: dict) -> Optional[dict]:
+    if not book.get("title"):
+        return None
+    return {
+        "title": book.get("title"),
+        "publication_year": book.get("publication_year"),
+        "genre": book.get("genre"),
+        "description": book.get("description")
+    }
+
+
+def relationship_row(rel: dict) -> Optional[dict]:
+    rel_type = rel.get("type", RelationType.SIMILAR_TO.value)
+    if not rel.get("source") or not rel.get("target"):
+        return None
+    if rel_type not in RelationType._value2member_map_:
+        return None
+    return {"source": rel["source"], "target": rel["target"], "type": rel_type}
+
+
+ROW_BUILDERS = {
+    "authors": author_row,
+    "books": book_row,
+    "relationships": relationship_row,
+}
+
+
+def _record_nodes(node_type: str, written: list[tuple[dict, bool]]):
+    for properties, created in written:
+        change_log.record(
+            "added" if created else "updated", "node", properties["id"], node_data(node_type, properties)
+        )
+
+
+def _record_relationships(written: list[tuple[str, dict, bool]]):
+    for rel_type, row, created in written:
+        change_log.record(
+            "added" if created else "updated", "link", row["id"],
+            link_data(row["id"], row["source"], row["target"], rel_type, row["props"])
+        )
+
+
+class BatchImporter:
+    """Buffers import rows per phase and writes each full buffer as one
+    repository merge (an ``UNWIND $rows`` statement inside a managed write
+    transaction on Neo4j).
+
+    Rows are addressed by their index within their phase, so a failed run
+    can be resumed with ``resume_phase``/``resume_offset`` taken from the
+    reported failure. All writes are ``MERGE``s, so replaying a partially
+    committed batch is harmless.
+    """
+
+    def __init__(
+        self,
+        repo,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        resume_phase: Optional[str] = None,
+        resume_offset: int = 0
+    ):
+        self.repo = repo
+        self.batch_size = batch_size
+        self.resume_phase = resume_phase or PHASES[0]
+        self.resume_offset = resume_offset if resume_phase else 0
+        self.stats = {phase: ImportPhaseStats() for phase in PHASES}
+        self.failure: Optional[ImportFailure] = None
+        self._buffers: dict[str, list[dict]] = {phase: [] for phase in PHASES}
+        self._buffer_start = {phase: 0 for phase in PHASES}
+        self._seen = {phase: 0 for phase in PHASES}
+        self._keys_warmed = False
+        self._ambiguous: dict[str, list[tuple[str, str]]] = {}
+
+    def _resumed_past(self, phase: str, index: int) -> bool:
+        phase_order = PHASES.index(phase)
+        resume_order = PHASES.index(self.resume_phase)
+        if phase_order != resume_order:
+            return phase_order < resume_order
+        return index < self.resume_offset
+
+    async def add(self, phase: str, item: dict) -> bool:
+        """Queue one raw item; returns False once the import has failed."""
+        if self.failure:
+            return False
+
+        index = self._seen[phase]
+        self._seen[phase] += 1
+        if self._resumed_past(phase, index):
+            return True
+
+        row = ROW_BUILDERS[phase](item) if isinstance(item, dict) else None
+        if row is None:
+            self.stats[phase].skipped += 1
+            return True
+
+        buffer = self._buffers[phase]
+        if not buffer:
+            self._buffer_start[phase] = index
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            await self.flush(phase)
+        return self.failure is None
+
+    async def flush(self, phase: str):
+        if self.failure or not self._buffers[phase]:
+            return
+        # Relationships are matched against existing nodes, so every
+        # pending node row has to be committed first.
+        if phase == "relationships":
+            await self.flush("authors")
+            await self.flush("books")
+            if self.failure:
+                return
+
+        rows = self._buffers[phase]
+        stats = self.stats[phase]
+        started = time.perf_counter()
+        try:
+            if phase == "relationships":
+                written = await self.repo.merge_relationships(await self._resolve(rows))
+            else:
+                written = await self.repo.merge_nodes(PHASE_LABELS[phase], rows)
+        except StorageError as exc:
+            self.failure = ImportFailure(
+                phase=phase,
+                batch=stats.batches,
+                offset=self._buffer_start[phase],
+                error=str(exc)
+            )
+            return
+        finally:
+            stats.seconds += time.perf_counter() - started
+
+        stats.rows += len(rows)
+        stats.batches += 1
+        self._buffers[phase] = []
+
+        if phase == "relationships":
+            _record_relationships(written)
+        else:
+            _record_nodes(PHASE_LABELS[phase], written)
+
+    async def _resolve(self, rows: list[dict]) -> list[dict]:
+        """Replace endpoint names with node ids from the natural-key cache.
+
+        The cache is loaded with one query when the first relationship batch
+        is written (node batches are flushed first, so it includes them);
+        a name shared by several nodes links every one of them, as the
+        per-row lookup did, and is reported.
+        """
+        if not self._keys_warmed:
+            await natural_keys.warm(self.repo)
+            self._keys_warmed = True
+        resolved = []
+        for row in rows:
+            sources = natural_keys.resolve(row["source"])
+            targets = natural_keys.resolve(row["target"])
+            for key, matches in ((row["source"], sources), (row["target"], targets)):
+                if len(matches) > 1 and len(self._ambiguous) < MAX_AMBIGUOUS_REPORTED:
+                    self._ambiguous.setdefault(key, matches)
+            for source_id, source_label in sources:
+                for target_id, target_label in targets:
+                    resolved.append({
+                        "source": source_id,
+                        "target": target_id,
+                        "type": row["type"],
+                        "source_label": source_label,
+                        "target_label": target_label,
+                    })
+        return resolved
+
+    async def finish(self) -> ImportResult:
+        for phase in PHASES:
+            await self.flush(phase)
+
+        for stats in self.stats.values():
+            stats.seconds = round(stats.seconds, 4)
+            stats.rows_per_sec = round(stats.rows / stats.seconds, 1) if stats.seconds else 0.0
+
+        return ImportResult(
+            message="Import failed" if self.failure else "Import completed",
+            imported={phase: stats.rows for phase, stats in self.stats.items()},
+            phases=self.stats,
+            failure=self.failure,
+            ambiguous=[
+                AmbiguousKey(key=key, matches=[KeyMatch(id=node_id, type=label) for node_id, label in matches])
+                for key, matches in self._ambiguous.items()
+            ]
+        )
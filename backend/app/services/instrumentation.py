@@ -0,0 +1,264 @@
+"""Request and query timings, exposed in the Prometheus text format.
+
+The middleware times every HTTP request by route template. While a request
+runs, the database wrapper (``app.database.instrumented``) adds its query
+time to the request's stats and routes can time named phases (model
+construction, encoding) with :func:`phase`, so a slow route can be split
+into database, build and encode time.
+"""
+import hashlib
+import logging
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Queries are labelled by their normalized text; labels and relationship
+# types are formatted into some statements, so the number of series is
+# capped and anything past the cap is counted as "other".
+MAX_QUERY_LABELS = 200
+QUERY_LABEL_LENGTH = 120
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.series: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, value: float = 1.0):
+        self.series[labels] = self.series.get(labels, 0.0) + value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [per-bucket counts (non-cumulative, last is +Inf), sum]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(self.labels, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...]) -> Counter:
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...]) -> Histogram:
+        metric = Histogram(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"))
+REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent in database queries per request.", ("route",))
+REQUEST_QUERIES = registry.counter(
+    "http_request_db_queries_total", "Database queries issued, by route.", ("route",))
+PHASE_SECONDS = registry.histogram(
+    "http_request_phase_seconds", "Time spent in named phases of a request.", ("route", "phase"))
+QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "Client-side query time: run plus fetching every record.", ("query",))
+QUERY_AVAILABLE_SECONDS = registry.histogram(
+    "db_query_available_after_seconds", "Server time until the first record was available.", ("query",))
+QUERY_CONSUMED_SECONDS = registry.histogram(
+    "db_query_consumed_after_seconds", "Server time until every record was consumed.", ("query",))
+QUERY_ROWS = registry.counter("db_query_rows_total", "Records returned.", ("query",))
+QUERY_DB_HITS = registry.counter("db_query_db_hits_total", "Database hits of profiled queries.", ("query",))
+QUERY_ERRORS = registry.counter("db_query_errors_total", "Queries that raised.", ("query",))
+
+
+@dataclass
+class RequestStats:
+    db_seconds: float = 0.0
+    queries: int = 0
+    phases: dict[str, float] = field(default_factory=dict)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """Time a named part of the current request (e.g. "build", "encode")."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.phases[name] = stats.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+_query_labels: dict[str, str] = {}
+_distinct_labels: set[str] = set()
+
+
+def query_label(query: str) -> str:
+    label = _query_labels.get(query)
+    if label is None:
+        label = _WHITESPACE.sub(" ", query).strip()
+        if len(label) > QUERY_LABEL_LENGTH:
+            # Long statements often share a prefix; the digest tells them apart.
+            digest = hashlib.blake2b(label.encode(), digest_size=4).hexdigest()
+            label = f"{label[:QUERY_LABEL_LENGTH]}... #{digest}"
+        if label not in _distinct_labels:
+            if len(_distinct_labels) >= MAX_QUERY_LABELS:
+                label = "other"
+            else:
+                _distinct_labels.add(label)
+        _query_labels[query] = label
+    return label
+
+
+def _db_hits(profile: Optional[dict]) -> int:
+    if not profile:
+        return 0
+    return profile.get("dbHits", 0) + sum(_db_hits(child) for child in profile.get("children", []))
+
+
+def record_query(
+    query: str,
+    seconds: float,
+    rows: int,
+    summary=None,
+    slow_query_ms: Optional[float] = None
+):
+    label = query_label(query)
+    QUERY_SECONDS.observe((label,), seconds)
+    QUERY_ROWS.inc((label,), rows)
+    available = consumed = hits = None
+    if summary is not None:
+        available = summary.result_available_after
+        consumed = summary.result_consumed_after
+        if available is not None:
+            QUERY_AVAILABLE_SECONDS.observe((label,), available / 1000)
+        if consumed is not None:
+            QUERY_CONSUMED_SECONDS.observe((label,), consumed / 1000)
+        if summary.profile:
+            hits = _db_hits(summary.profile)
+            QUERY_DB_HITS.inc((label,), hits)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+        stats.queries += 1
+
+    if slow_query_ms is not None and seconds * 1000 >= slow_query_ms:
+        logger.warning(
+            "Slow query: %.1f ms, %d rows, available after %s ms, consumed after %s ms, db hits %s: %s",
+            seconds * 1000, rows, available, consumed, hits, _WHITESPACE.sub(" ", query).strip()
+        )
+
+
+def record_query_error(query: str):
+    QUERY_ERRORS.inc((query_label(query),))
+
+
+def _route_template(scope) -> str:
+    # Recent FastAPI versions leave the router-relative path on
+    # scope["route"] and put the prefixed template on the route context.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None and getattr(context, "path", None):
+        return context.path
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware recording latency, database time and phases per
+    route template (``/api/books/{book_id}``, not the concrete path)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            path = _route_template(scope)
+            REQUEST_SECONDS.observe((scope["method"], path, str(status)), elapsed)
+            if stats.queries:
+                REQUEST_DB_SECONDS.observe((path,), stats.db_seconds)
+                REQUEST_QUERIES.inc((path,), stats.queries)
+            for name, seconds in stats.phases.items():
+                PHASE_SECONDS.observe((path, name), seconds)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from app.services.snapshot import GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Same force model and defaults as the frontend's d3-force-3d simulation
+# (charge nodeSpread * -3, link distance nodeSpread * 0.5), so precomputed
+# coordinates land on the scale and shape the 3D view would settle into.
+LAYOUT_LINK_DISTANCE = float(os.getenv("LAYOUT_LINK_DISTANCE", "100"))
+LAYOUT_CHARGE = float(os.getenv("LAYOUT_CHARGE", "-600"))
+LAYOUT_ITERATIONS = int(os.getenv("LAYOUT_ITERATIONS", "150"))
+INCREMENTAL_ITERATIONS = 40
+INCREMENTAL_ALPHA = 0.1
+
+# Above this many nodes repulsion is estimated from a random sample of
+# nodes per iteration instead of all pairs.
+EXACT_REPULSION_LIMIT = 2000
+REPULSION_SAMPLE = 256
+
+# Graphs that changed by more than this fraction get a full recomputation
+# instead of a warm-started update.
+INCREMENTAL_MAX_CHANGE = 0.1
+
+_CHUNK = 512
+_ALPHA_MIN = 0.001
+_VELOCITY_DECAY = 0.4
+_EPSILON = 1e-2
+
+
+def _repulsion(pos: np.ndarray, strength: float, rng: np.random.Generator) -> np.ndarray:
+    """Many-body force, strength/d^2 along the separation vector."""
+    n = len(pos)
+    if n <= EXACT_REPULSION_LIMIT:
+        others, scale = pos, 1.0
+    else:
+        others = pos[rng.choice(n, REPULSION_SAMPLE, replace=False)]
+        scale = n / REPULSION_SAMPLE
+
+    # sum_j (p_i - p_j) w_ij == p_i * sum_j w_ij - W @ p_j, computed with a
+    # matrix product instead of materializing every difference vector.
+    others_sq = np.einsum("ij,ij->i", others, others)
+    force = np.empty_like(pos)
+    for start in range(0, n, _CHUNK):
+        block = pos[start:start + _CHUNK]
+        block_sq = np.einsum("ij,ij->i", block, block)
+        dist2 = block_sq[:, None] + others_sq[None, :] - 2 * block @ others.T
+        weight = 1.0 / np.maximum(dist2, 1.0)
+        force[start:start + _CHUNK] = block * weight.sum(axis=1)[:, None] - weight @ others
+    return force * (-strength * scale)
+
+
+def force_layout(
+    node_count: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    positions: Optional[np.ndarray] = None,
+    iterations: int = LAYOUT_ITERATIONS,
+    alpha: float = 1.0,
+    link_distance: float = LAYOUT_LINK_DISTANCE,
+    charge: float = LAYOUT_CHARGE,
+    seed: int = 0
+) -> np.ndarray:
+    """Vectorized 3D force-directed layout; returns an (n, 3) float32 array.
+
+    Mirrors d3-force: every tick adds many-body repulsion and link springs
+    (weighted by endpoint degree) to the velocities, scaled by ``alpha``,
+    which decays to ``_ALPHA_MIN`` over ``iterations`` ticks; velocities are
+    damped and the layout is re-centered on the origin.
+    """
+    rng = np.random.default_rng(seed)
+    if positions is None:
+        spread = link_distance * max(node_count, 1) ** (1 / 3) / 2
+        positions = rng.uniform(-spread, spread, (node_count, 3))
+    pos = positions.astype(np.float32, copy=True)
+    if node_count < 2:
+        return pos
+
+    velocity = np.zeros_like(pos)
+    degree = np.bincount(np.concatenate([sources, targets]), minlength=node_count).astype(np.float32)
+    link_strength = 1.0 / np.maximum(np.minimum(degree[sources], degree[targets]), 1.0)
+    bias = degree[sources] / np.maximum(degree[sources] + degree[targets], 1.0)
+    alpha_decay = 1 - _ALPHA_MIN ** (1 / iterations)
+
+    for _ in range(iterations):
+        alpha -= alpha * alpha_decay
+        velocity += _repulsion(pos, charge, rng) * alpha
+        if len(sources):
+            delta = (pos[targets] + velocity[targets]) - (pos[sources] + velocity[sources])
+            dist = np.sqrt(np.einsum("ij,ij->i", delta, delta)) + _EPSILON
+            pull = delta * ((dist - link_distance) / dist * alpha * link_strength)[:, None]
+            for axis in range(3):
+                velocity[:, axis] -= np.bincount(targets, pull[:, axis] * bias, minlength=node_count)
+                velocity[:, axis] += np.bincount(sources, pull[:, axis] * (1 - bias), minlength=node_count)
+        velocity *= 1 - _VELOCITY_DECAY
+        pos += velocity
+        pos -= pos.mean(axis=0)
+    return pos
+
+
+def warm_start(
+    snapshot: GraphSnapshot,
+    previous_ids: list[str],
+    previous_positions: np.ndarray,
+    seed: int = 0
+) -> np.ndarray:
+    """Initial positions for an updated graph: known nodes keep theirs, new
+    nodes start at the centroid of their already placed neighbors."""
+    rng = np.random.default_rng(seed)
+    n = snapshot.node_count
+    previous_index = {node_id: i for i, node_id in enumerate(previous_ids)}
+    pos = np.zeros((n, 3), dtype=np.float32)
+    known = np.zeros(n, dtype=bool)
+    for i, node_id in enumerate(snapshot.ids):
+        j = previous_index.get(node_id)
+        if j is not None:
+            pos[i] = previous_positions[j]
+            known[i] = True
+
+    jitter = rng.normal(0, LAYOUT_LINK_DISTANCE / 4, (n, 3)).astype(np.float32)
+    src, dst = snapshot.sources, snapshot.targets
+    ends = np.concatenate([src, dst])
+    others = np.concatenate([dst, src])
+    placed = known[others]
+    counts = np.bincount(ends[placed], minlength=n)
+    for axis in range(3):
+        sums = np.bincount(ends[placed], pos[others[placed], axis], minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centroid = np.where(counts > 0, sums / counts, 0.0)
+        pos[~known, axis] = centroid[~known] + jitter[~known, axis]
+    return pos
+
+
+@dataclass
+class Layout:
+    seq: int
+    ids: list[str]
+    positions: np.ndarray
+
+    def coordinates(self) -> dict[str, tuple[float, float, float]]:
+        rounded = np.round(self.positions.astype(np.float64), 1).tolist()
+        return {node_id: tuple(xyz) for node_id, xyz in zip(self.ids, rounded)}
+
+
+def compute_layout(snapshot: GraphSnapshot, previous: Optional[Layout] = None) -> Layout:
+    if previous is not None and previous.ids:
+        previous_ids = set(previous.ids)
+        current_ids = set(snapshot.ids)
+        changed = len(previous_ids ^ current_ids)
+        if changed <= INCREMENTAL_MAX_CHANGE * max(len(current_ids), 1):
+            positions = force_layout(
+                snapshot.node_count,
+                snapshot.sources,
+                snapshot.targets,
+                positions=warm_start(snapshot, previous.ids, previous.positions),
+                iterations=INCREMENTAL_ITERATIONS,
+                alpha=INCREMENTAL_ALPHA
+            )
+            return Layout(snapshot.seq, snapshot.ids, positions)
+
+    positions = force_layout(snapshot.node_count, snapshot.sources, snapshot.targets)
+    return Layout(snapshot.seq, snapshot.ids, positions)
+
+
+class LayoutCache:
+    """Layout of the latest snapshot, recomputed off the event loop.
+
+    Graph responses never wait for a layout: they use ``current`` and, when
+    it is missing or stale, ``refresh`` starts computing the new one in the
+    background for later requests.
+    """
+
+    def __init__(self):
+        self.layout: Optional[Layout] = None
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def get(self, snapshot: GraphSnapshot) -> Layout:
+        if self.layout is not None and self.layout.seq == snapshot.seq:
+            return self.layout
+        async with self._lock:
+            if self.layout is None or self.layout.seq != snapshot.seq:
+                self.layout = await asyncio.to_thread(compute_layout, snapshot, self.layout)
+            return self.layout
+
+    def current(self, seq: int) -> Optional[Layout]:
+        """The cached layout if it is of change-log position ``seq``."""
+        if self.layout is not None and self.layout.seq == seq:
+            return self.layout
+        return None
+
+    def refresh(self, load_snapshot: Callable[[], Awaitable[GraphSnapshot]]):
+        """Compute the layout of the snapshot ``load_snapshot`` returns in
+        the background, unless that is already under way."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().create_task(self._compute(load_snapshot))
+
+    async def _compute(self, load_snapshot: Callable[[], Awaitable[GraphSnapshot]]):
+        try:
+            await self.get(await load_snapshot())
+        except Exception:
+            logger.exception("Background layout failed")
+
+
+layout_cache = LayoutCache()
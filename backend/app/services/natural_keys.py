@@ -0,0 +1,108 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.services.changes import change_log
+
+
+def natural_key(label: str, properties: dict) -> Optional[str]:
+    return properties.get("title" if label == "Book" else "name")
+
+
+class NaturalKeyCache:
+    """Natural key (``Book.title``, ``name`` otherwise) -> ids and labels of
+    the nodes carrying it.
+
+    Filled by one bulk query (``warm``) and then kept current from the
+    change log, so relationship endpoints given by name resolve without a
+    query per row. Several nodes may share a key; callers decide what an
+    ambiguous key means.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._ids: dict[str, dict[str, str]] = {}
+        self._keys: dict[str, str] = {}
+
+    def _put(self, label: str, key: Optional[str], node_id: str):
+        previous = self._keys.get(node_id)
+        if previous is not None and previous != key:
+            self._discard(node_id)
+        if key is None:
+            return
+        self._ids.setdefault(key, {})[node_id] = label
+        self._keys[node_id] = key
+
+    def _discard(self, node_id: str):
+        key = self._keys.pop(node_id, None)
+        ids = self._ids.get(key)
+        if ids is not None:
+            ids.pop(node_id, None)
+            if not ids:
+                del self._ids[key]
+
+    async def warm(self, repo):
+        # Writes recorded while the query runs are replayed on top of it.
+        seq = change_log.seq
+        rows = await repo.load_keys()
+        self._ids = {}
+        self._keys = {}
+        for label, key, node_id in rows:
+            self._put(label, key, node_id)
+        self.ready = True
+        for entry in change_log.since(seq) or ():
+            self.apply(entry)
+
+    def resolve(self, key: str) -> list[tuple[str, str]]:
+        """``(id, label)`` of every node whose natural key is ``key``."""
+        return list(self._ids.get(key, {}).items())
+
+    async def lookup(self, repo, key: str) -> list[tuple[str, str]]:
+        """``resolve``, falling back to an indexed query for keys the cache
+        has not seen (e.g. written by another process)."""
+        if not self.ready:
+            await self.warm(repo)
+        matches = self.resolve(key)
+        if not matches:
+            for label, found_key, node_id in await repo.load_keys([key]):
+                self._put(label, found_key, node_id)
+            matches = self.resolve(key)
+        return matches
+
+    def apply(self, entry: dict):
+        if not self.ready or entry["kind"] != "node":
+            return
+        if entry["op"] == "removed":
+            self._discard(entry["id"])
+        else:
+            data = entry["data"]
+            self._put(data["type"], natural_key(data["type"], data["properties"]), entry["id"])
+
+    def clear(self):
+        self.ready = False
+        self._ids = {}
+        self._keys = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+natural_keys = NaturalKeyCache()
+change_log.subscribe(natural_keys.apply)
+
+
+async def resolve_endpoint(repo, node_id: Optional[str], key: Optional[str], end: str) -> str:
+    """The id of a relationship endpoint given either by id or by natural key."""
+    if (node_id is None) == (key is None):
+        raise HTTPException(status_code=400, detail=f"Give exactly one of {end}_id and {end}_key")
+    if node_id is not None:
+        return node_id
+    matches = await natural_keys.lookup(repo, key)
+    if not matches:
+        raise HTTPException(status_code=404, detail=f"No node named '{key}'")
+    if len(matches) > 1:
+        raise HTTPException(status_code=409, detail={
+            "message": f"'{key}' names {len(matches)} nodes; give {end}_id instead",
+            "matches": [{"id": match_id, "type": label} for match_id, label in matches],
+        })
+    return matches[0][0]
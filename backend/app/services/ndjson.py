@@ -0,0 +1,32 @@
+from typing import AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+from app.services.encoding import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Lines are sent in chunks of this many, so each write carries a useful
+# amount of data while only one chunk is ever buffered.
+NDJSON_CHUNK_LINES = 500
+
+
+async def _chunks(lines: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buffer = []
+    async for line in lines:
+        buffer.append(dumps(line))
+        if len(buffer) >= NDJSON_CHUNK_LINES:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+
+
+def ndjson_response(lines: AsyncIterator[dict], headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream one JSON object per line as ``lines`` yields them.
+
+    The generator should open its own repository (``open_repository``):
+    it keeps running after the route returns, when request-scoped
+    dependencies may already be closed.
+    """
+    return StreamingResponse(_chunks(lines), media_type=NDJSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,67 @@
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.database.connection import open_repository
+from app.services.ndjson import ndjson_response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+LIMIT_DESCRIPTION = f"Page size (default {DEFAULT_PAGE_SIZE}); when streaming, every row is sent unless set"
+STREAM_DESCRIPTION = "Send rows as newline-delimited JSON while they are read"
+
+
+def parse_fields(fields: Optional[str], model: type[BaseModel]) -> list[str]:
+    """Validate a ``fields=`` projection against a response model.
+
+    Required model fields (the id and the display name) are always
+    included so the response still validates and can be paged.
+    """
+    available = list(model.model_fields)
+    if not fields:
+        return available
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [
+        name for name, info in model.model_fields.items()
+        if name in requested or info.is_required()
+    ]
+
+
+async def fetch_page(
+    repo,
+    label: str,
+    fields: list[str],
+    cursor: Optional[str],
+    limit: Optional[int],
+    response: Response
+) -> list[dict]:
+    """Keyset page over ``label`` ordered by ``id``.
+
+    Only the projected properties are read. One row past the page is
+    fetched to learn whether another page exists; if so its cursor is
+    returned in the ``X-Next-Cursor`` header.
+    """
+    limit = limit or DEFAULT_PAGE_SIZE
+    rows = await repo.list_nodes(label, fields, cursor, limit + 1)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = rows[-1]["id"]
+    return rows
+
+
+def stream_page(label: str, fields: list[str], cursor: Optional[str], limit: Optional[int]) -> StreamingResponse:
+    """The rows of ``fetch_page`` as NDJSON, from ``cursor`` to the end
+    (or ``limit`` rows), without holding them in memory."""
+    async def rows():
+        async with open_repository() as repo:
+            async for row in repo.iter_nodes_page(label, fields, cursor, limit):
+                yield row
+    return ndjson_response(rows())
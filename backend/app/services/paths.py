@@ -0,0 +1,171 @@
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.services.analytics import CsrGraph, build_csr
+from app.services.snapshot import GraphSnapshot
+
+MAX_PATH_DEPTH = 10
+MAX_PATHS = 10
+MAX_PATH_TIMEOUT_MS = 2000
+
+
+@dataclass
+class Path:
+    nodes: list[int]
+    edges: list[int]
+
+
+class _Budget:
+    def __init__(self, timeout_ms: float):
+        self.deadline = time.perf_counter() + timeout_ms / 1000
+        self.exceeded = False
+
+    def check(self) -> bool:
+        if time.perf_counter() > self.deadline:
+            self.exceeded = True
+        return not self.exceeded
+
+
+class _Search:
+    """One side of a bidirectional BFS."""
+
+    def __init__(self, node_count: int, start: int):
+        self.depth = np.full(node_count, -1, dtype=np.int32)
+        self.parent = np.full(node_count, -1, dtype=np.int32)
+        self.parent_edge = np.full(node_count, -1, dtype=np.int32)
+        self.depth[start] = 0
+        self.frontier = np.array([start], dtype=np.int32)
+        self.level = 0
+
+    def trace(self, node: int) -> tuple[list[int], list[int]]:
+        """Nodes and edges from ``node`` back to the start of this side."""
+        nodes, edges = [node], []
+        while self.parent[node] >= 0:
+            edges.append(int(self.parent_edge[node]))
+            node = int(self.parent[node])
+            nodes.append(node)
+        return nodes, edges
+
+
+def shortest_path(
+    csr: CsrGraph,
+    source: int,
+    target: int,
+    max_depth: int,
+    budget: _Budget,
+    allowed_edges: Optional[np.ndarray] = None,
+    banned_nodes: Optional[np.ndarray] = None,
+    banned_edges: Optional[np.ndarray] = None
+) -> Optional[Path]:
+    """Bidirectional BFS, always expanding the smaller frontier one whole
+    level at a time. Returns None when no path of at most ``max_depth``
+    links exists or the budget runs out."""
+    if source == target:
+        return Path([source], [])
+    n = csr.node_count
+    forward, backward = _Search(n, source), _Search(n, target)
+    while len(forward.frontier) and len(backward.frontier):
+        if forward.level + backward.level >= max_depth or not budget.check():
+            return None
+        side, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+        positions, owners = csr.entries(side.frontier)
+        neighbors = csr.indices[positions]
+        edges = csr.edges[positions]
+        keep = side.depth[neighbors] < 0
+        if allowed_edges is not None:
+            keep &= allowed_edges[edges]
+        if banned_edges is not None:
+            keep &= ~banned_edges[edges]
+        if banned_nodes is not None:
+            keep &= ~banned_nodes[neighbors]
+        neighbors, owners, edges = neighbors[keep], owners[keep], edges[keep]
+        neighbors, first = np.unique(neighbors, return_index=True)
+        side.level += 1
+        side.depth[neighbors] = side.level
+        side.parent[neighbors] = owners[first]
+        side.parent_edge[neighbors] = edges[first]
+        side.frontier = neighbors
+
+        met = neighbors[other.depth[neighbors] >= 0]
+        if len(met):
+            meet = int(met[np.argmin(other.depth[met])])
+            head_nodes, head_edges = forward.trace(meet)
+            tail_nodes, tail_edges = backward.trace(meet)
+            return Path(head_nodes[::-1] + tail_nodes[1:], head_edges[::-1] + tail_edges)
+    return None
+
+
+def shortest_paths(
+    csr: CsrGraph,
+    source: int,
+    target: int,
+    limit: int,
+    max_depth: int,
+    timeout_ms: float,
+    allowed_edges: Optional[np.ndarray] = None
+) -> tuple[list[Path], bool]:
+    """Up to ``limit`` shortest simple paths (Yen's algorithm with
+    bidirectional BFS for the spur searches), shortest first.
+
+    Returns the paths and whether the search finished within the time
+    budget; on timeout the paths found so far are returned.
+    """
+    budget = _Budget(timeout_ms)
+    first = shortest_path(csr, source, target, max_depth, budget, allowed_edges)
+    if first is None:
+        return [], not budget.exceeded
+    found = [first]
+    candidates: list[tuple[int, int, Path]] = []
+    seen = {tuple(first.edges)}
+    counter = 0
+    banned_nodes = np.zeros(csr.node_count, dtype=bool)
+    banned_edges = np.zeros(int(csr.edges.max()) + 1 if len(csr.edges) else 0, dtype=bool)
+
+    while len(found) < limit:
+        previous = found[-1]
+        for i in range(len(previous.nodes) - 1):
+            if not budget.check():
+                return found, False
+            root_nodes, root_edges = previous.nodes[:i + 1], previous.edges[:i]
+            spur_edges = [path.edges[i] for path in found if path.edges[:i] == root_edges and len(path.edges) > i]
+            banned_nodes[root_nodes[:-1]] = True
+            banned_edges[spur_edges] = True
+            spur = shortest_path(
+                csr, root_nodes[-1], target, max_depth - i, budget,
+                allowed_edges, banned_nodes, banned_edges
+            )
+            banned_nodes[root_nodes[:-1]] = False
+            banned_edges[spur_edges] = False
+            if spur is None:
+                continue
+            path = Path(root_nodes[:-1] + spur.nodes, root_edges + spur.edges)
+            key = tuple(path.edges)
+            if key not in seen:
+                seen.add(key)
+                counter += 1
+                heapq.heappush(candidates, (len(path.edges), counter, path))
+        if not candidates:
+            break
+        found.append(heapq.heappop(candidates)[2])
+    return found, not budget.exceeded
+
+
+class PathIndex:
+    """Undirected CSR of the latest snapshot, rebuilt when it changes."""
+
+    def __init__(self):
+        self.seq: Optional[int] = None
+        self.csr: Optional[CsrGraph] = None
+
+    def get(self, snapshot: GraphSnapshot) -> CsrGraph:
+        if self.csr is None or self.seq != snapshot.seq:
+            self.csr = build_csr(snapshot.node_count, snapshot.sources, snapshot.targets)
+            self.seq = snapshot.seq
+        return self.csr
+
+
+path_index = PathIndex()
@@ -0,0 +1,155 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.services.analytics import CsrGraph, build_csr
+from app.services.snapshot import GraphSnapshot
+
+RECOMMENDATION_K = int(os.getenv("RECOMMENDATION_K", "20"))
+
+# Score for a direct link between two books, by relation type.
+DIRECT_WEIGHTS = {"SIMILAR_TO": 1.0, "INFLUENCED": 0.5}
+
+# Nodes linked to more than this many others (a large era, a prolific
+# author) are too generic to say two books are alike and are skipped
+# when looking for shared neighbors.
+MAX_SHARED_DEGREE = int(os.getenv("RECOMMENDATION_MAX_SHARED_DEGREE", "2000"))
+
+# Rebuild everything once this fraction of books is affected by a change.
+INCREMENTAL_MAX_AFFECTED = 0.5
+
+
+def _score_book(
+    csr: CsrGraph,
+    book: int,
+    is_book: np.ndarray,
+    shared_weight: np.ndarray,
+    direct_weight: np.ndarray,
+    k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Top-k books for ``book``: direct links count by relation type, every
+    shared neighbor adds ``1 / log(degree)`` (Adamic-Adar)."""
+    start, end = csr.indptr[book], csr.indptr[book + 1]
+    neighbors = csr.indices[start:end]
+    shared = neighbors[shared_weight[neighbors] > 0]
+    positions, via = csr.entries(shared)
+    candidates = np.concatenate([neighbors, csr.indices[positions]])
+    weights = np.concatenate([direct_weight[csr.edges[start:end]], shared_weight[via]])
+
+    keep = is_book[candidates] & (candidates != book) & (weights > 0)
+    if not keep.any():
+        return candidates[:0], weights[:0]
+    unique, inverse = np.unique(candidates[keep], return_inverse=True)
+    scores = np.bincount(inverse, weights[keep])
+    if len(unique) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        unique, scores = unique[top], scores[top]
+    order = np.lexsort((unique, -scores))
+    return unique[order], scores[order]
+
+
+def _changed_nodes(previous: GraphSnapshot, snapshot: GraphSnapshot) -> np.ndarray:
+    """Nodes of ``snapshot`` that were added or whose links changed."""
+    n = snapshot.node_count
+    remap = np.array([snapshot.index.get(node_id, -1) for node_id in previous.ids], dtype=np.int64)
+    changed = np.ones(n, dtype=bool)
+    changed[remap[remap >= 0]] = False
+
+    old_sources = remap[previous.sources]
+    old_targets = remap[previous.targets]
+    alive = (old_sources >= 0) & (old_targets >= 0)
+    # Links of removed nodes: their surviving endpoint changed.
+    changed[old_sources[~alive & (old_sources >= 0)]] = True
+    changed[old_targets[~alive & (old_targets >= 0)]] = True
+
+    type_ids = {name: i for i, name in enumerate(dict.fromkeys(previous.relation_types + snapshot.relation_types))}
+    stride = max(len(type_ids), 1)
+
+    def link_keys(sources, targets, link_types, relation_types):
+        ids = np.array([type_ids[name] for name in relation_types], dtype=np.int64)
+        return (sources.astype(np.int64) * n + targets) * stride + ids[link_types]
+
+    old_keys = link_keys(old_sources[alive], old_targets[alive], previous.link_types[alive], previous.relation_types)
+    new_keys = link_keys(snapshot.sources, snapshot.targets, snapshot.link_types, snapshot.relation_types)
+    pairs = np.setxor1d(old_keys, new_keys) // stride
+    changed[pairs // n] = True
+    changed[pairs % n] = True
+    return np.flatnonzero(changed)
+
+
+@dataclass
+class RecommendationIndex:
+    snapshot: GraphSnapshot
+    top: dict[str, list[tuple[str, float]]]
+    rebuilt: int
+
+    @property
+    def seq(self) -> int:
+        return self.snapshot.seq
+
+
+def build_index(
+    snapshot: GraphSnapshot,
+    previous: Optional[RecommendationIndex] = None,
+    k: int = RECOMMENDATION_K
+) -> RecommendationIndex:
+    """Top-k similar books per book.
+
+    With a previous index only books whose scores can have changed are
+    recomputed: those within two hops of a node whose links changed
+    (the second hop skipping nodes too generic to be shared neighbors).
+    """
+    n = snapshot.node_count
+    csr = build_csr(n, snapshot.sources, snapshot.targets)
+    degree = csr.degree()
+    is_book = np.array([node_type == "Book" for node_type in snapshot.types], dtype=bool)
+    shared_weight = np.where(
+        (degree >= 2) & (degree <= MAX_SHARED_DEGREE),
+        1.0 / np.log(np.maximum(degree, 2)),
+        0.0
+    )
+    type_weights = np.array([DIRECT_WEIGHTS.get(name, 0.0) for name in snapshot.relation_types])
+    direct_weight = type_weights[snapshot.link_types] if len(type_weights) else np.zeros(0)
+
+    books = np.flatnonzero(is_book)
+    top: dict[str, list[tuple[str, float]]] = {}
+    if previous is not None:
+        changed = _changed_nodes(previous.snapshot, snapshot)
+        positions, _ = csr.entries(changed)
+        first_hop = np.union1d(changed, csr.indices[positions])
+        positions, _ = csr.entries(first_hop[shared_weight[first_hop] > 0])
+        affected = np.union1d(first_hop, csr.indices[positions])
+        affected = affected[is_book[affected]]
+        if len(affected) <= INCREMENTAL_MAX_AFFECTED * len(books):
+            top = {book_id: previous.top[book_id] for book_id in (snapshot.ids[i] for i in books)
+                   if book_id in previous.top}
+            books = affected
+
+    for book in books:
+        ranked, scores = _score_book(csr, book, is_book, shared_weight, direct_weight, k)
+        top[snapshot.ids[book]] = [
+            (snapshot.ids[other], round(float(score), 4)) for other, score in zip(ranked, scores)
+        ]
+    return RecommendationIndex(snapshot, top, len(books))
+
+
+class RecommendationCache:
+    """Recommendation index of the latest snapshot, updated off the event loop."""
+
+    def __init__(self):
+        self.index: Optional[RecommendationIndex] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, snapshot: GraphSnapshot) -> RecommendationIndex:
+        if self.index is not None and self.index.seq == snapshot.seq:
+            return self.index
+        async with self._lock:
+            if self.index is None or self.index.seq != snapshot.seq:
+                self.index = await asyncio.to_thread(build_index, snapshot, self.index)
+            return self.index
+
+
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,96 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from app.services.changes import change_log, display_label
+
+
+@dataclass
+class GraphSnapshot:
+    """Topology of the whole graph with nodes addressed by integer index.
+
+    ``sources``/``targets``/``link_types`` are parallel arrays with one
+    entry per relationship; ``link_types`` indexes into ``relation_types``.
+    """
+
+    seq: int
+    ids: list[str]
+    types: list[str]
+    labels: list[str]
+    sources: np.ndarray
+    targets: np.ndarray
+    link_types: np.ndarray
+    relation_types: list[str]
+    index: dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def link_count(self) -> int:
+        return len(self.sources)
+
+
+async def load_snapshot(repo) -> GraphSnapshot:
+    seq = change_log.seq
+    nodes, links = await repo.load_topology()
+    ids, types, labels = [], [], []
+    for node_type, properties in nodes:
+        ids.append(properties["id"])
+        types.append(node_type)
+        labels.append(display_label(node_type, {
+            key: value for key, value in properties.items() if value is not None
+        }))
+    index = {node_id: i for i, node_id in enumerate(ids)}
+
+    sources, targets, link_types = [], [], []
+    relation_types: list[str] = []
+    relation_index: dict[str, int] = {}
+    for source_id, target_id, rel_type in links:
+        source = index.get(source_id)
+        target = index.get(target_id)
+        if source is None or target is None:
+            continue
+        if rel_type not in relation_index:
+            relation_index[rel_type] = len(relation_types)
+            relation_types.append(rel_type)
+        sources.append(source)
+        targets.append(target)
+        link_types.append(relation_index[rel_type])
+
+    return GraphSnapshot(
+        seq=seq,
+        ids=ids,
+        types=types,
+        labels=labels,
+        sources=np.asarray(sources, dtype=np.int32),
+        targets=np.asarray(targets, dtype=np.int32),
+        link_types=np.asarray(link_types, dtype=np.int16),
+        relation_types=relation_types
+    )
+
+
+class SnapshotCache:
+    """Holds the latest snapshot and reloads it when the change log moves."""
+
+    def __init__(self):
+        self.snapshot: Optional[GraphSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, repo) -> GraphSnapshot:
+        if self.snapshot is not None and self.snapshot.seq == change_log.seq:
+            return self.snapshot
+        async with self._lock:
+            # Another request may have reloaded it while we waited.
+            if self.snapshot is None or self.snapshot.seq != change_log.seq:
+                self.snapshot = await load_snapshot(repo)
+            return self.snapshot
+
+
+snapshot_cache = SnapshotCache()
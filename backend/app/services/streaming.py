@@ -0,0 +1,259 @@
+import codecs
+import json
+import re
+from typing import Iterator, Optional
+
+from app.services.importer import PHASES
+
+CHUNK_SIZE = 64 * 1024
+
+# Upper bound on a single buffered value (one author/book/relationship or
+# one NDJSON line); anything larger is treated as a malformed file.
+MAX_ITEM_SIZE = 16 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_KINDS = {
+    "author": "authors", "authors": "authors",
+    "book": "books", "books": "books",
+    "relationship": "relationships", "relationships": "relationships",
+}
+
+
+class CatalogParseError(ValueError):
+    pass
+
+
+def _phase_for_line(item: dict) -> Optional[str]:
+    kind = item.get("kind")
+    if kind is not None:
+        return _KINDS.get(kind)
+    if "source" in item and "target" in item:
+        return "relationships"
+    if "title" in item:
+        return "books"
+    if "name" in item:
+        return "authors"
+    return None
+
+
+class JsonCatalogParser:
+    """Incremental parser for the ``{"authors": [...], "books": [...],
+    "relationships": [...]}`` import shape.
+
+    Text is pushed with :meth:`feed` and array items are yielded as
+    ``(phase, item)`` as soon as they are complete, so only the item being
+    parsed is held in memory. Other top-level keys are parsed and dropped.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        # Offset in the file of ``self._buf[0]``, for error messages.
+        self._base = 0
+        self._state = "start"
+        self._key: Optional[str] = None
+        # Whether the object or array being read has no entries yet, so a
+        # closing bracket is allowed where a key or item is expected.
+        self._first = True
+        self._closed = False
+
+    def feed(self, text: str) -> Iterator[tuple[str, dict]]:
+        self._base += self._pos
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        yield from self._parse()
+        if len(self._buf) - self._pos > MAX_ITEM_SIZE:
+            raise CatalogParseError("Import item exceeds maximum size")
+
+    def close(self) -> Iterator[tuple[str, dict]]:
+        self._closed = True
+        yield from self._parse()
+        self._skip_whitespace()
+        if self._state != "done" or self._pos != len(self._buf):
+            raise CatalogParseError("Unexpected end of import file")
+
+    def _skip_whitespace(self):
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+
+    def _peek(self) -> Optional[str]:
+        self._skip_whitespace()
+        return self._buf[self._pos] if self._pos < len(self._buf) else None
+
+    def _expect(self, char: str) -> bool:
+        found = self._peek()
+        if found is None:
+            return False
+        if found != char:
+            raise CatalogParseError(f"Expected '{char}' at offset {self._base + self._pos}, found '{found}'")
+        self._pos += 1
+        return True
+
+    def _decode_value(self):
+        """Decode the value at the cursor, or return ``...`` if more input is needed."""
+        self._skip_whitespace()
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError as exc:
+            if self._closed:
+                raise CatalogParseError(str(exc)) from exc
+            return ...
+        # A number at the very end of the buffer may still be incomplete.
+        if end == len(self._buf) and not self._closed:
+            return ...
+        self._pos = end
+        return value
+
+    def _parse(self) -> Iterator[tuple[str, dict]]:
+        while True:
+            if self._state == "start":
+                if not self._expect("{"):
+                    return
+                self._first = True
+                self._state = "key"
+
+            elif self._state == "key":
+                char = self._peek()
+                if char is None:
+                    return
+                if char == "}" and self._first:
+                    self._pos += 1
+                    self._state = "done"
+                    continue
+                if char != '"':
+                    raise CatalogParseError(f"Expected object key at offset {self._base + self._pos}, found '{char}'")
+                key = self._decode_value()
+                if key is ...:
+                    return
+                self._key = key
+                self._state = "colon"
+
+            elif self._state == "colon":
+                if not self._expect(":"):
+                    return
+                self._state = "value"
+
+            elif self._state == "value":
+                char = self._peek()
+                if char is None:
+                    return
+                if self._key in PHASES and char == "[":
+                    self._pos += 1
+                    self._first = True
+                    self._state = "items"
+                    continue
+                if self._decode_value() is ...:
+                    return
+                self._state = "key_separator"
+
+            elif self._state == "key_separator":
+                char = self._peek()
+                if char is None:
+                    return
+                if char not in ",}":
+                    raise CatalogParseError(f"Expected ',' or '}}' at offset {self._base + self._pos}, found '{char}'")
+                self._pos += 1
+                self._first = False
+                self._state = "key" if char == "," else "done"
+
+            elif self._state == "items":
+                char = self._peek()
+                if char is None:
+                    return
+                if char == "]" and self._first:
+                    self._pos += 1
+                    self._state = "key_separator"
+                    continue
+                if char in ",]":
+                    raise CatalogParseError(f"Expected array item at offset {self._base + self._pos}, found '{char}'")
+                item = self._decode_value()
+                if item is ...:
+                    return
+                self._state = "item_separator"
+                yield self._key, item
+
+            elif self._state == "item_separator":
+                char = self._peek()
+                if char is None:
+                    return
+                if char not in ",]":
+                    raise CatalogParseError(f"Expected ',' or ']' at offset {self._base + self._pos}, found '{char}'")
+                self._pos += 1
+                self._first = False
+                self._state = "items" if char == "," else "key_separator"
+
+            else:
+                if self._peek() is not None:
+                    raise CatalogParseError(f"Unexpected data after import object at offset {self._base + self._pos}")
+                return
+
+
+class NdjsonCatalogParser:
+    """Incremental parser for newline-delimited imports, one author, book or
+    relationship object per line. Lines may carry an explicit ``kind``
+    (``author``/``book``/``relationship``); otherwise the phase is inferred
+    from the fields present.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._line = 0
+
+    def feed(self, text: str) -> Iterator[tuple[str, dict]]:
+        self._buf += text
+        *lines, self._buf = self._buf.split("\n")
+        for line in lines:
+            yield from self._parse_line(line)
+        if len(self._buf) > MAX_ITEM_SIZE:
+            raise CatalogParseError("Import line exceeds maximum size")
+
+    def close(self) -> Iterator[tuple[str, dict]]:
+        line, self._buf = self._buf, ""
+        yield from self._parse_line(line)
+
+    def _parse_line(self, line: str) -> Iterator[tuple[str, dict]]:
+        self._line += 1
+        line = line.strip()
+        if not line:
+            return
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise CatalogParseError(f"Line {self._line}: {exc}") from exc
+        phase = _phase_for_line(item) if isinstance(item, dict) else None
+        if phase is None:
+            raise CatalogParseError(f"Line {self._line}: cannot determine record kind")
+        yield phase, item
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "json"
+
+
+async def stream_catalog(file, fmt: str):
+    """Yield ``(phase, item)`` pairs from an uploaded catalog file, reading it
+    in fixed-size chunks."""
+    parser = NdjsonCatalogParser() if fmt == "ndjson" else JsonCatalogParser()
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def decode(chunk: bytes, final: bool = False) -> str:
+        try:
+            return decoder.decode(chunk, final)
+        except UnicodeDecodeError as exc:
+            raise CatalogParseError(f"Invalid UTF-8: {exc.reason}") from exc
+
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        for entry in parser.feed(decode(chunk)):
+            yield entry
+    for entry in parser.feed(decode(b"", final=True)):
+        yield entry
+    for entry in parser.close():
+        yield entry
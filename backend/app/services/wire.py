@@ -0,0 +1,77 @@
+from typing import Optional
+
+from app.models.schemas import NodeType, RelationType
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.book-topology.columnar+json"
+
+# Keys already carried by the id/label columns.
+_REDUNDANT_PROPERTIES = ("id", "title", "name")
+
+
+def wants_columnar(accept: Optional[str]) -> bool:
+    return bool(accept) and COLUMNAR_MEDIA_TYPE in accept
+
+
+def to_columnar(graph: dict, include_properties: bool = False) -> dict:
+    """Re-encode a graph (``GraphData`` as plain dicts) as parallel arrays.
+
+    Node types and relation types become indexes into small dictionaries,
+    and links reference nodes by their position in the node arrays instead
+    of repeating UUIDs. Links whose endpoints are not part of the node set
+    cannot be addressed and are dropped. Per-node properties are left out
+    unless requested; clients load them on demand from
+    ``/api/graph/properties``. Precomputed coordinates, when present, are
+    sent as ``x``/``y``/``z`` columns.
+    """
+    node_types = [node_type.value for node_type in NodeType]
+    relation_types = [rel_type.value for rel_type in RelationType]
+    node_type_index = {name: i for i, name in enumerate(node_types)}
+    relation_type_index = {name: i for i, name in enumerate(relation_types)}
+
+    ids = []
+    labels = []
+    types = []
+    properties = []
+    coordinates = ([], [], [])
+    position = {}
+    for node in graph["nodes"]:
+        position[node["id"]] = len(ids)
+        ids.append(node["id"])
+        labels.append(node["label"])
+        types.append(node_type_index[node["type"]])
+        if include_properties:
+            properties.append({
+                key: value for key, value in node["properties"].items()
+                if key not in _REDUNDANT_PROPERTIES and value is not None
+            })
+        for column, axis in zip(coordinates, ("x", "y", "z")):
+            column.append(node.get(axis))
+
+    sources = []
+    targets = []
+    link_types = []
+    for link in graph["links"]:
+        source = position.get(link["source"])
+        target = position.get(link["target"])
+        if source is None or target is None:
+            continue
+        link_type = link["type"]
+        if link_type not in relation_type_index:
+            relation_type_index[link_type] = len(relation_types)
+            relation_types.append(link_type)
+        sources.append(source)
+        targets.append(target)
+        link_types.append(relation_type_index[link_type])
+
+    nodes = {"id": ids, "label": labels, "type": types}
+    if include_properties:
+        nodes["properties"] = properties
+    if any(value is not None for value in coordinates[0]):
+        nodes.update(zip(("x", "y", "z"), coordinates))
+    return {
+        "format": "columnar-v1",
+        "node_types": node_types,
+        "relation_types": relation_types,
+        "nodes": nodes,
+        "links": {"source": sources, "target": targets, "type": link_types},
+    }
@@ -0,0 +1,111 @@
+"""Synthetic catalogs shaped like my_books.json / sample_data.json.
+
+Node counts split into authors and books in the same proportion as
+my_books.json (about 3 authors per 8 books). Every book is WRITTEN_BY one
+author, skewed so that a few authors are prolific; books get
+SIMILAR_TO links and authors INFLUENCED links at roughly the real
+catalog's density. Names and titles are unique, since the importer merges
+on them. The same size and seed always produce the same catalog.
+
+    python -m benchmarks.catalog 100000 --out catalog-100k.ndjson
+"""
+import argparse
+import json
+import random
+from typing import Iterator
+
+AUTHOR_SHARE = 0.375
+SIMILAR_PER_BOOK = 0.4
+INFLUENCED_PER_AUTHOR = 0.1
+DESCRIPTION_SHARE = 0.5
+
+_SYLLABLES = [
+    "가", "나", "다", "라", "마", "바", "사", "아", "자", "차", "카", "타", "파", "하",
+    "민", "준", "서", "윤", "지", "현", "수", "영", "호", "진", "석", "우", "은", "혜",
+]
+_TITLE_WORDS = [
+    "밤", "바다", "전쟁", "평화", "죄", "벌", "형제들", "노인", "기억", "시간", "도시",
+    "정원", "여름", "겨울", "별", "그림자", "침묵", "귀향", "변신", "성", "섬", "꿈",
+]
+_NATIONALITIES = [
+    "러시아", "프랑스", "영국", "독일", "미국", "일본", "한국", "중국", "이탈리아",
+    "스페인", "그리스", "로마", "오스트리아", "아일랜드", "콜롬비아",
+]
+_GENRES = ["소설", "심리 소설", "철학 소설", "역사 소설", "서사시", "희곡", "시", "단편집", "에세이"]
+
+
+def _word(index: int) -> str:
+    """A unique syllable string for ``index`` (base-N digits)."""
+    syllables = []
+    while True:
+        index, digit = divmod(index, len(_SYLLABLES))
+        syllables.append(_SYLLABLES[digit])
+        if not index:
+            return "".join(syllables)
+        index -= 1
+
+
+def split(nodes: int) -> tuple[int, int]:
+    authors = max(1, round(nodes * AUTHOR_SHARE))
+    return authors, max(1, nodes - authors)
+
+
+def iter_catalog(nodes: int, seed: int = 0) -> Iterator[tuple[str, dict]]:
+    """Yield ``(phase, item)`` in import order without holding the catalog."""
+    rng = random.Random(seed)
+    author_count, book_count = split(nodes)
+
+    authors = [_word(i) for i in range(author_count)]
+    for name in authors:
+        birth = rng.randint(-800, 1990)
+        author = {"name": name, "nationality": rng.choice(_NATIONALITIES)}
+        if rng.random() < 0.7:
+            author["birth_year"] = birth
+            author["death_year"] = birth + rng.randint(25, 95)
+        yield "authors", author
+
+    titles = []
+    for i in range(book_count):
+        title = f"{rng.choice(_TITLE_WORDS)} {_word(i)}"
+        titles.append(title)
+        book = {"title": title, "publication_year": rng.randint(-800, 2024), "genre": rng.choice(_GENRES)}
+        if rng.random() < DESCRIPTION_SHARE:
+            book["description"] = " ".join(rng.choices(_TITLE_WORDS, k=8))
+        yield "books", book
+
+    for title in titles:
+        # Cubing a uniform draw skews towards low indices: early authors
+        # write many books, most write one or none.
+        author = authors[int(author_count * rng.random() ** 3)]
+        yield "relationships", {"source": title, "target": author, "type": "WRITTEN_BY"}
+    for _ in range(int(book_count * SIMILAR_PER_BOOK)):
+        a, b = rng.sample(titles, 2) if book_count > 1 else (titles[0], titles[0])
+        yield "relationships", {"source": a, "target": b, "type": "SIMILAR_TO"}
+    for _ in range(int(author_count * INFLUENCED_PER_AUTHOR)):
+        a, b = rng.sample(authors, 2) if author_count > 1 else (authors[0], authors[0])
+        yield "relationships", {"source": a, "target": b, "type": "INFLUENCED"}
+
+
+def write_catalog(path: str, nodes: int, seed: int = 0) -> dict:
+    """Write the catalog as NDJSON (one item per line, as the streaming
+    importer reads it) and return per-phase counts."""
+    counts = {"authors": 0, "books": 0, "relationships": 0}
+    with open(path, "w", encoding="utf-8") as f:
+        for phase, item in iter_catalog(nodes, seed):
+            counts[phase] += 1
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write("\n")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("nodes", type=int)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(write_catalog(args.out, args.nodes, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
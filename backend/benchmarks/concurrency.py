@@ -0,0 +1,83 @@
+"""Concurrency load test against a running API.
+
+Fires a mix of /api/graph and CRUD requests from a thread pool and reports
+how far the requests overlapped on the server. With a blocking data layer
+the concurrent run takes as long as the serial one (speedup ~1); with the
+async driver requests overlap and the speedup approaches the concurrency.
+
+    uvicorn app.main:app &
+    python -m benchmarks.concurrency --url http://localhost:8000 --requests 200 --concurrency 20
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.http import json_call
+
+
+def _request(base_url: str, method: str, path: str, body: dict = None) -> tuple[tuple[float, float, int], bytes]:
+    started = time.perf_counter()
+    status, payload = json_call(base_url, method, path, body)
+    return (started, time.perf_counter(), status), payload
+
+
+def _crud_cycle(base_url: str, i: int) -> list[tuple[float, float, int]]:
+    timing, payload = _request(base_url, "POST", "/api/books/", {"title": f"loadtest-{i}"})
+    timings = [timing]
+    if timing[2] >= 400:
+        return timings
+    book = json.loads(payload)
+    for method, body in (("GET", None), ("PUT", {"genre": "loadtest"}), ("DELETE", None)):
+        timings.append(_request(base_url, method, f"/api/books/{book['id']}", body)[0])
+    return timings
+
+
+def _job(base_url: str, i: int) -> list[tuple[float, float, int]]:
+    if i % 2 == 0:
+        return [_request(base_url, "GET", "/api/graph")[0]]
+    return _crud_cycle(base_url, i)
+
+
+def _run_jobs(base_url: str, requests: int, concurrency: int) -> dict:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: _job(base_url, i), range(requests)))
+    wall = time.perf_counter() - started
+    intervals = [timing for timings in results for timing in timings]
+    return {
+        "requests": len(intervals),
+        "errors": sum(1 for _, _, status in intervals if status >= 400),
+        "wall_seconds": round(wall, 3),
+    }
+
+
+def run(base_url: str, requests: int, concurrency: int) -> dict:
+    """Run the same workload serially and concurrently.
+
+    Client-side timings cannot tell queued requests from running ones, so
+    overlap is judged by speedup: a server that handles one request at a
+    time needs as long for the concurrent run as for the serial one.
+    """
+    serial = _run_jobs(base_url, requests, 1)
+    concurrent = _run_jobs(base_url, requests, concurrency)
+    return {
+        "concurrency": concurrency,
+        "serial": serial,
+        "concurrent": concurrent,
+        "speedup": round(serial["wall_seconds"] / concurrent["wall_seconds"], 2)
+        if concurrent["wall_seconds"] else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.url.rstrip("/"), args.requests, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
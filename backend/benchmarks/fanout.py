@@ -0,0 +1,87 @@
+"""Fan-out benchmark for the SSE broadcaster.
+
+Connects N in-process subscribers that only drain their queues (idle
+browsers), records change-log bursts and measures how long it takes until
+every subscriber has received the coalesced message, plus the encoded
+message size and the memory held per subscriber.
+
+    python -m benchmarks.fanout --subscribers 300 --bursts 20 --burst-size 500
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+
+from app.services.changes import change_log, node_data
+from app.services.events import Broadcaster
+
+
+async def run(subscribers: int, bursts: int, burst_size: int, flush_interval: float) -> dict:
+    broadcaster = Broadcaster(flush_interval)
+    change_log.subscribe(broadcaster.publish)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    subs = [broadcaster.subscribe() for _ in range(subscribers)]
+    per_subscriber_bytes = (tracemalloc.get_traced_memory()[0] - baseline) / subscribers
+    tracemalloc.stop()
+
+    received = asyncio.Event()
+    remaining = 0
+    sizes = []
+
+    async def drain(subscriber):
+        nonlocal remaining
+        while True:
+            message = await subscriber.queue.get()
+            sizes.append(len(message))
+            remaining -= 1
+            if remaining == 0:
+                received.set()
+
+    tasks = [asyncio.create_task(drain(subscriber)) for subscriber in subs]
+    latencies = []
+    for burst in range(bursts):
+        remaining = subscribers
+        received.clear()
+        for i in range(burst_size):
+            node_id = f"bench-{burst}-{i}"
+            change_log.record("added", "node", node_id, node_data("Book", {"id": node_id, "title": node_id}))
+        record_done = time.perf_counter()
+        await received.wait()
+        delivered = time.perf_counter()
+        # Delivery latency excludes the deliberate coalescing delay.
+        latencies.append((delivered - record_done - flush_interval) * 1000)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "subscribers": subscribers,
+        "bursts": bursts,
+        "burst_size": burst_size,
+        "messages_per_burst": 1,
+        "message_bytes": int(statistics.fmean(sizes)),
+        "fanout_p50_ms": round(statistics.median(latencies), 3),
+        "fanout_max_ms": round(max(latencies), 3),
+        "bytes_per_idle_subscriber": int(per_subscriber_bytes),
+        **broadcaster.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--burst-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.01)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.subscribers, args.bursts, args.burst_size, args.flush_interval))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
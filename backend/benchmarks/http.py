@@ -0,0 +1,25 @@
+"""Minimal HTTP client shared by the benchmarks.
+
+Error responses are returned like any other response, with their status,
+instead of raising, so a load test counts them rather than stopping.
+"""
+import json
+import urllib.error
+import urllib.request
+from typing import Optional
+
+
+def call(base_url: str, method: str, path: str, body: Optional[bytes] = None,
+         headers: Optional[dict] = None, timeout: float = 600) -> tuple[int, bytes]:
+    req = urllib.request.Request(base_url + path, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def json_call(base_url: str, method: str, path: str, body: dict = None) -> tuple[int, bytes]:
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if data else {}
+    return call(base_url, method, path, data, headers)
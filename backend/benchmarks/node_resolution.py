@@ -0,0 +1,149 @@
+"""Label-less vs label-aware node resolution benchmark.
+
+Seeds a synthetic graph into the configured Neo4j database (NEO4J_URI etc.
+from backend/.env), then times and PROFILEs the old label-less lookups
+against the queries built by app.database.resolver. Seeded nodes carry a
+`bench` property and are removed afterwards.
+
+    python -m benchmarks.node_resolution --nodes 100000 --runs 50
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from neo4j import GraphDatabase
+
+from app.database.connection import NEO4J_PASSWORD, NEO4J_URI, NEO4J_USER
+from app.database.resolver import node_match, relationship_match
+from app.database.schema import schema_statements
+from app.models.schemas import NodeType
+
+SEED_BATCH = 10_000
+
+
+def seed(session, nodes: int) -> tuple[list[str], list[str]]:
+    labels = [node_type.value for node_type in NodeType]
+    nodes_by_label: dict[str, list[str]] = {label: [] for label in labels}
+    for start in range(0, nodes, SEED_BATCH):
+        values = [f"bench-{i}" for i in range(start, min(start + SEED_BATCH, nodes))]
+        for offset, label in enumerate(labels):
+            key = "title" if label == "Book" else "name"
+            result = session.run(
+                f"UNWIND $values AS value CREATE (n:{label} {{id: randomUUID(), bench: true}}) "
+                f"SET n.{key} = value RETURN n.id AS id",
+                values=values[offset::len(labels)]
+            )
+            nodes_by_label[label].extend(record["id"] for record in result)
+
+    rel_ids = []
+    per_pair = max(1, nodes // (len(labels) ** 2))
+    for source_label in labels:
+        for target_label in labels:
+            rows = [
+                {
+                    "source": random.choice(nodes_by_label[source_label]),
+                    "target": random.choice(nodes_by_label[target_label]),
+                }
+                for _ in range(per_pair)
+            ]
+            result = session.run(
+                f"UNWIND $rows AS row "
+                f"MATCH (a:{source_label} {{id: row.source}}) "
+                f"MATCH (b:{target_label} {{id: row.target}}) "
+                "CREATE (a)-[r:SIMILAR_TO {id: randomUUID(), bench: true}]->(b) RETURN r.id AS id",
+                rows=rows
+            )
+            rel_ids.extend(record["id"] for record in result)
+
+    node_ids = [node_id for ids in nodes_by_label.values() for node_id in ids]
+    return node_ids, rel_ids
+
+
+def cleanup(session):
+    session.run("""
+    MATCH (n) WHERE n.bench = true
+    CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+    """).consume()
+
+
+def measure(session, query: str, params_for) -> dict:
+    timings = []
+    for params in params_for:
+        started = time.perf_counter()
+        session.run(query, **params).consume()
+        timings.append((time.perf_counter() - started) * 1000)
+    summary = session.run("PROFILE " + query, **params_for[0]).consume()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "db_hits": _db_hits(summary.profile),
+    }
+
+
+def _db_hits(profile: dict) -> int:
+    if not profile:
+        return 0
+    return profile.get("dbHits", 0) + sum(_db_hits(child) for child in profile.get("children", []))
+
+
+def run(nodes: int, runs: int) -> dict:
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        with driver.session() as session:
+            for statement in schema_statements():
+                session.run(statement).consume()
+            session.run("CALL db.awaitIndexes(300)").consume()
+            node_ids, rel_ids = seed(session, nodes)
+            try:
+                node_params = [{"id": random.choice(node_ids)} for _ in range(runs)]
+                rel_params = [{"id": random.choice(rel_ids)} for _ in range(runs)]
+                pair_params = [
+                    {"source_id": random.choice(node_ids), "target_id": random.choice(node_ids)}
+                    for _ in range(runs)
+                ]
+                cases = {
+                    "neighbors": (
+                        "MATCH (n {id: $id})-[r]-(m) RETURN m.id",
+                        f"{node_match('n', 'id')} MATCH (n)-[r]-(m) RETURN m.id",
+                        node_params,
+                    ),
+                    "connect_endpoints": (
+                        "MATCH (a {id: $source_id}), (b {id: $target_id}) RETURN a.id, b.id",
+                        f"{node_match('a', 'source_id')} {node_match('b', 'target_id')} RETURN a.id, b.id",
+                        pair_params,
+                    ),
+                    "relationship_by_id": (
+                        "MATCH ()-[r {id: $id}]-() RETURN r.id",
+                        f"{relationship_match('r', 'id')} RETURN r.id",
+                        rel_params,
+                    ),
+                }
+                return {
+                    "nodes": nodes,
+                    "runs": runs,
+                    "results": {
+                        name: {
+                            "label_less": measure(session, before, params),
+                            "label_aware": measure(session, after, params),
+                        }
+                        for name, (before, after, params) in cases.items()
+                    },
+                }
+            finally:
+                cleanup(session)
+    finally:
+        driver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.nodes, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Time the ways /api/graph can turn repository records into a JSON body.
+
+Records shaped like ``repo.load_graph()`` output are generated from a
+synthetic catalog, then each strategy is timed separately for building
+the response object and for encoding it:
+
+- response_model: Pydantic models re-validated and encoded the way
+  FastAPI handles a returned model with ``response_model``
+- model: Pydantic models encoded with ``model_dump_json``
+- dicts+json: plain dicts encoded with the standard library
+- dicts+orjson: plain dicts encoded with orjson (what the route does now)
+
+    python -m benchmarks.serialization --nodes 50000 --rounds 5
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.schemas import GraphData, GraphLink, GraphNode, NodeType
+from app.services import encoding
+from app.services.changes import display_label
+from benchmarks.catalog import iter_catalog
+
+
+def load_records(nodes: int) -> tuple[list, list]:
+    """Synthetic ``(node records, link dicts)`` as a repository returns them."""
+    records = []
+    links = []
+    ids = {}
+    for phase, item in iter_catalog(nodes):
+        if phase == "relationships":
+            links.append({
+                "source": ids[item["source"]],
+                "target": ids[item["target"]],
+                "type": item["type"],
+                "properties": {"id": str(uuid.uuid4())},
+            })
+            continue
+        label = "Author" if phase == "authors" else "Book"
+        props = {"id": str(uuid.uuid4()), **item}
+        ids[item.get("name") or item["title"]] = props["id"]
+        records.append((label, props))
+    return records, links
+
+
+def build_models(records: list, links: list) -> GraphData:
+    return GraphData(
+        nodes=[
+            GraphNode(id=props["id"], label=display_label(label, props), type=NodeType(label),
+                      properties=dict(props))
+            for label, props in records
+        ],
+        links=[GraphLink(**link) for link in links]
+    )
+
+
+def build_dicts(records: list, links: list) -> dict:
+    return {
+        "nodes": [
+            {"id": props["id"], "label": display_label(label, props), "type": label, "properties": dict(props)}
+            for label, props in records
+        ],
+        "links": [dict(link) for link in links],
+    }
+
+
+_graph_adapter = TypeAdapter(GraphData)
+
+
+def encode_response_model(graph: GraphData) -> bytes:
+    validated = _graph_adapter.validate_python(graph.model_dump())
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_stdlib(graph: dict) -> bytes:
+    return json.dumps(graph, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+STRATEGIES = {
+    "response_model": (build_models, encode_response_model),
+    "model": (build_models, lambda graph: graph.model_dump_json(exclude_unset=True).encode()),
+    "dicts+json": (build_dicts, encode_stdlib),
+    "dicts+orjson": (build_dicts, encoding.dumps),
+}
+
+
+def _time(fn, *args) -> tuple[float, object]:
+    started = time.perf_counter()
+    value = fn(*args)
+    return (time.perf_counter() - started) * 1000, value
+
+
+def run(nodes: int, rounds: int) -> dict:
+    records, links = load_records(nodes)
+    results = {}
+    payloads = {}
+    for name, (build, encode) in STRATEGIES.items():
+        if name == "dicts+orjson" and encoding.orjson is None:
+            continue
+        build_ms = []
+        encode_ms = []
+        for _ in range(rounds):
+            elapsed, graph = _time(build, records, links)
+            build_ms.append(elapsed)
+            elapsed, payload = _time(encode, graph)
+            encode_ms.append(elapsed)
+        payloads[name] = payload
+        build_median = statistics.median(build_ms)
+        encode_median = statistics.median(encode_ms)
+        results[name] = {
+            "build_ms": round(build_median, 1),
+            "encode_ms": round(encode_median, 1),
+            "total_ms": round(build_median + encode_median, 1),
+            "bytes": len(payload),
+        }
+
+    baseline = results["model"]["total_ms"]
+    for result in results.values():
+        result["speedup_vs_model"] = round(baseline / result["total_ms"], 2)
+    reference = json.loads(payloads["model"])
+    return {
+        "nodes": len(records),
+        "links": len(links),
+        "rounds": rounds,
+        # response_model output also carries the unset x/y/z as nulls.
+        "same_document": all(
+            json.loads(payload) == reference for name, payload in payloads.items() if name != "response_model"
+        ),
+        "strategies": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.nodes, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""End-to-end benchmark suite over synthetic catalogs.
+
+For every catalog size this starts a fresh API server (embedded memory
+backend unless --backend neo4j), imports a generated catalog through
+/api/relationships/import, then drives a weighted mix of graph, search, neighbors,
+list, read and CRUD requests from a thread pool. It reports import
+throughput, request throughput, p50/p95/p99 latency per operation and the
+server's peak RSS as JSON, so two result files can be diffed or compared
+by a script.
+
+    python -m benchmarks.suite --sizes 1000 10000 --requests 1000 --concurrency 16 --out bench.json
+
+With --backend neo4j the server uses the NEO4J_* settings from the
+environment; point it at an empty database, since every size imports
+into it. --url skips starting a server and benchmarks an already running
+one (single size, no RSS).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.catalog import write_catalog
+from benchmarks.http import call, json_call
+
+# Relative frequency of each operation in the request mix.
+OPERATIONS = {
+    "graph": 1,
+    "search": 4,
+    "neighbors": 4,
+    "books.list": 2,
+    "books.get": 4,
+    "books.crud": 1,
+}
+
+SAMPLE_IDS = 1000
+SEARCH_TERMS = ["밤", "바다", "전쟁", "기억", "도시", "별", "그림자", "꿈"]
+
+
+def _timed(samples: dict, name: str, call, *args) -> Optional[bytes]:
+    started = time.perf_counter()
+    try:
+        status, payload = call(*args)
+    except OSError:
+        status, payload = 599, b""
+    samples.setdefault(name, []).append((time.perf_counter() - started, status))
+    return payload if status < 400 else None
+
+
+def import_catalog(base_url: str, path: str, batch_size: int) -> dict:
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as f:
+        content = f.read()
+    body = b"".join([
+        f"--{boundary}\r\n".encode(),
+        b'Content-Disposition: form-data; name="file"; filename="catalog.ndjson"\r\n',
+        b"Content-Type: application/x-ndjson\r\n\r\n",
+        content,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    started = time.perf_counter()
+    status, payload = call(
+        base_url, "POST", f"/api/relationships/import?format=ndjson&batch_size={batch_size}", body,
+        {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    seconds = time.perf_counter() - started
+    if status >= 400:
+        raise RuntimeError(f"Import failed ({status}): {payload[:500]!r}")
+    result = json.loads(payload)
+    rows = sum(result["imported"].values())
+    return {
+        "seconds": round(seconds, 3),
+        "rows": rows,
+        "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+        "phases": result["phases"],
+        "failure": result.get("failure"),
+    }
+
+
+def sample_ids(base_url: str, path: str, count: int) -> list[str]:
+    status, payload = call(base_url, "GET", f"{path}?limit={count}&fields=id")
+    if status >= 400:
+        raise RuntimeError(f"Listing {path} failed ({status})")
+    return [row["id"] for row in json.loads(payload)]
+
+
+def _job(base_url: str, operation: str, rng: random.Random, ids: dict, samples: dict):
+    if operation == "graph":
+        _timed(samples, operation, call, base_url, "GET", "/api/graph")
+    elif operation == "search":
+        query = urllib.parse.quote(rng.choice(SEARCH_TERMS))
+        _timed(samples, operation, call, base_url, "GET", f"/api/graph/search?query={query}")
+    elif operation == "neighbors":
+        node_id = rng.choice(ids["books"] + ids["authors"])
+        _timed(samples, operation, call, base_url, "GET", f"/api/graph/neighbors/{node_id}")
+    elif operation == "books.list":
+        _timed(samples, operation, call, base_url, "GET", "/api/books/?limit=100")
+    elif operation == "books.get":
+        _timed(samples, operation, call, base_url, "GET", f"/api/books/{rng.choice(ids['books'])}")
+    elif operation == "books.crud":
+        payload = _timed(samples, "books.create", json_call, base_url, "POST", "/api/books/",
+                         {"title": f"bench-{uuid.uuid4().hex}", "genre": "benchmark"})
+        if payload is None:
+            return
+        book_id = json.loads(payload)["id"]
+        _timed(samples, "books.update", json_call, base_url, "PUT", f"/api/books/{book_id}",
+               {"genre": "benchmark-updated"})
+        _timed(samples, "books.delete", json_call, base_url, "DELETE", f"/api/books/{book_id}")
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(timings: list[tuple[float, int]], wall: float) -> dict:
+    latencies = sorted(seconds * 1000 for seconds, _ in timings)
+    return {
+        "requests": len(timings),
+        "errors": sum(1 for _, status in timings if status >= 400),
+        "throughput_rps": round(len(timings) / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def drive(base_url: str, operations: dict, requests: int, concurrency: int, seed: int) -> dict:
+    ids = {
+        "books": sample_ids(base_url, "/api/books/", SAMPLE_IDS),
+        "authors": sample_ids(base_url, "/api/authors/", SAMPLE_IDS),
+    }
+    rng = random.Random(seed)
+    plan = rng.choices(list(operations), weights=list(operations.values()), k=requests)
+    # One sample dict per job keeps the workers free of shared mutable state.
+    per_job = [{} for _ in plan]
+    job_rngs = [random.Random(rng.random()) for _ in plan]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda i: _job(base_url, plan[i], job_rngs[i], ids, per_job[i]), range(len(plan))))
+    wall = time.perf_counter() - started
+
+    merged: dict[str, list] = {}
+    for samples in per_job:
+        for name, timings in samples.items():
+            merged.setdefault(name, []).extend(timings)
+    every = [timing for timings in merged.values() for timing in timings]
+    return {
+        "wall_seconds": round(wall, 3),
+        "overall": summarize(every, wall),
+        "operations": {name: summarize(merged[name], wall) for name in sorted(merged)},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    """High-water resident set size of a process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+class Server:
+    """A uvicorn process running this checkout's app."""
+
+    def __init__(self, backend: str):
+        self.port = _free_port()
+        env = {**os.environ, "STORAGE_BACKEND": backend}
+        env.pop("MEMORY_STORE_PATH", None)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app",
+             "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env,
+        )
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def wait_ready(self, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                if call(self.url, "GET", "/health", timeout=1)[0] < 500:
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError("Server did not start")
+
+    def peak_rss_mb(self) -> Optional[float]:
+        return _peak_rss_mb(self.process.pid)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def run_size(nodes: int, args, workdir: str) -> dict:
+    path = os.path.join(workdir, f"catalog-{nodes}.ndjson")
+    counts = write_catalog(path, nodes, args.seed)
+    server = None if args.url else Server(args.backend)
+    try:
+        if server:
+            server.wait_ready()
+        base_url = args.url.rstrip("/") if args.url else server.url
+        result = {
+            "nodes": counts["authors"] + counts["books"],
+            "links": counts["relationships"],
+            "import": import_catalog(base_url, path, args.batch_size),
+        }
+        operations = {name: OPERATIONS[name] for name in args.operations}
+        result.update(drive(base_url, operations, args.requests, args.concurrency, args.seed))
+        result["peak_rss_mb"] = server.peak_rss_mb() if server else None
+        return result
+    finally:
+        if server:
+            server.stop()
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--backend", choices=["memory", "neo4j"], default="memory")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    if args.url and len(args.sizes) > 1:
+        parser.error("--url benchmarks a single catalog size")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [run_size(nodes, args, workdir) for nodes in args.sizes]
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": "external" if args.url else args.backend,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
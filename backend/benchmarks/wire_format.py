@@ -0,0 +1,89 @@
+"""Compare the JSON and columnar /api/graph payloads.
+
+Builds the GraphData the API would return for a catalog file (ids are
+generated the way Neo4j's randomUUID() would) and reports raw and gzipped
+size plus decode time for both encodings.
+
+    python -m benchmarks.wire_format ../my_books.json --repeat 10
+"""
+import argparse
+import gzip
+import json
+import time
+import uuid
+
+from app.models.schemas import GraphData, GraphLink, GraphNode, NodeType
+from app.services.wire import to_columnar
+
+
+def graph_from_catalog(catalog: dict, repeat: int = 1) -> GraphData:
+    nodes = []
+    links = []
+    for copy in range(repeat):
+        suffix = f" #{copy}" if copy else ""
+        ids = {}
+        for author in catalog.get("authors", []):
+            props = {"id": str(uuid.uuid4()), **author, "name": author["name"] + suffix}
+            ids[author["name"]] = props["id"]
+            nodes.append(GraphNode(id=props["id"], label=props["name"], type=NodeType.AUTHOR, properties=props))
+        for book in catalog.get("books", []):
+            props = {"id": str(uuid.uuid4()), **book, "title": book["title"] + suffix}
+            ids[book["title"]] = props["id"]
+            nodes.append(GraphNode(id=props["id"], label=props["title"], type=NodeType.BOOK, properties=props))
+        for rel in catalog.get("relationships", []):
+            if rel["source"] in ids and rel["target"] in ids:
+                links.append(GraphLink(
+                    source=ids[rel["source"]],
+                    target=ids[rel["target"]],
+                    type=rel.get("type", "SIMILAR_TO"),
+                    properties={"id": str(uuid.uuid4())}
+                ))
+    return GraphData(nodes=nodes, links=links)
+
+
+def _decode_ms(payload: bytes, rounds: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        json.loads(payload)
+    return round((time.perf_counter() - started) * 1000 / rounds, 3)
+
+
+def measure(payload: bytes) -> dict:
+    return {
+        "bytes": len(payload),
+        "gzip_bytes": len(gzip.compress(payload)),
+        "decode_ms": _decode_ms(payload),
+    }
+
+
+def run(path: str, repeat: int) -> dict:
+    with open(path, encoding="utf-8") as f:
+        graph = graph_from_catalog(json.load(f), repeat)
+
+    def columnar(include_properties: bool) -> bytes:
+        return json.dumps(
+            to_columnar(graph.model_dump(mode="json"), include_properties), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    results = {
+        "json": measure(graph.model_dump_json(exclude_unset=True).encode()),
+        "columnar": measure(columnar(False)),
+        "columnar+properties": measure(columnar(True)),
+    }
+    baseline = results["json"]
+    for name, result in results.items():
+        result["size_ratio"] = round(result["bytes"] / baseline["bytes"], 3)
+        result["gzip_ratio"] = round(result["gzip_bytes"] / baseline["gzip_bytes"], 3)
+    return {"nodes": len(graph.nodes), "links": len(graph.links), "formats": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("catalog")
+    parser.add_argument("--repeat", type=int, default=1, help="Concatenate the catalog N times")
+    args = parser.parse_args()
+    print(json.dumps(run(args.catalog, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
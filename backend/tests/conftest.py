@@ -0,0 +1,23 @@
+import os
+
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.pop("MEMORY_STORE_PATH", None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import connection
+from app.database.memory_repository import MemoryRepository
+from app.main import app
+from app.services.graph_cache import graph_cache
+from app.services.natural_keys import natural_keys
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """An app client on a fresh, empty in-memory store."""
+    monkeypatch.setattr(connection, "_memory_repository", MemoryRepository())
+    graph_cache.invalidate()
+    natural_keys.clear()
+    with TestClient(app) as client:
+        yield client
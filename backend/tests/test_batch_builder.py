@@ -0,0 +1,55 @@
+from app.models.schemas import RelationshipBatchCreate, RelationType
+from app.services.batch import BatchBuilder
+
+
+def _relationship(**endpoints):
+    return RelationshipBatchCreate(relation_type=RelationType.WRITTEN_BY, **endpoints)
+
+
+def test_refs_resolve_to_generated_ids():
+    builder = BatchBuilder()
+    builder.create_node("nodes", 0, "Book", {"title": "변신"}, "book")
+    builder.create_node("nodes", 1, "Author", {"name": "카프카"}, "author")
+    builder.create_relationship("create", 0, _relationship(source_ref="book", target_ref="author"))
+
+    operations = builder.operations()
+    assert [op.action for op, _ in operations] == ["create_node", "create_node", "create_relationship"]
+    book, author, link = (op for op, _ in operations)
+    assert (link.source, link.target) == (book.id, author.id)
+    assert book.properties == {"id": book.id, "title": "변신"}
+    assert builder.refs == {"book": book.id, "author": author.id}
+
+
+def test_items_that_cannot_apply_are_reported_and_dropped():
+    builder = BatchBuilder()
+    builder.create_node("nodes", 0, "Book", {"title": "변신"}, "dup")
+    builder.create_node("nodes", 1, "Book", {"title": "성"}, "dup")
+    builder.create_node("nodes", 2, "Book", {"genre": "소설"}, "untitled")
+    builder.create_relationship("create", 0, _relationship(source_ref="untitled", target_id="x"))
+    builder.create_relationship("create", 1, _relationship(source_ref="missing", target_id="x"))
+    builder.create_relationship("create", 2, _relationship(source_id="a", source_ref="dup", target_id="x"))
+    builder.update_node("update", 0, "Book", "b", {})
+
+    errors = [result.error for result in builder.results]
+    assert errors == [
+        None,
+        "Duplicate ref 'dup'",
+        errors[2],
+        "Node 'untitled' was not created",
+        "Unknown ref 'missing'",
+        "Give exactly one of source_id and source_ref",
+        "No fields to update",
+    ]
+    assert errors[2].startswith("Invalid properties")
+    assert len(builder.operations()) == 1
+
+
+def test_operations_are_ordered_by_action():
+    builder = BatchBuilder()
+    builder.delete_node("delete", 0, "Book", "old")
+    builder.delete_relationship("delete", 0, "r")
+    builder.update_node("update", 0, "Book", "b", {"genre": "시"})
+    builder.create_node("create", 0, "Book", {"title": "새 책"})
+    assert [op.action for op, _ in builder.operations()] == [
+        "create_node", "update_node", "delete_relationship", "delete_node",
+    ]
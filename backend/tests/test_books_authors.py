@@ -0,0 +1,46 @@
+def test_book_crud(client):
+    book = client.post("/api/books/", json={"title": "변신", "publication_year": 1915}).json()
+    assert client.get(f"/api/books/{book['id']}").json()["title"] == "변신"
+
+    updated = client.put(f"/api/books/{book['id']}", json={"genre": "소설"}).json()
+    assert updated == {**book, "genre": "소설"}
+
+    assert client.delete(f"/api/books/{book['id']}").status_code == 200
+    assert client.get(f"/api/books/{book['id']}").status_code == 404
+
+
+def test_list_pages_follow_the_cursor(client):
+    titles = sorted(f"책 {i:02}" for i in range(25))
+    ids = {client.post("/api/books/", json={"title": title}).json()["id"] for title in titles}
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10, "fields": "title"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/books/", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert len(seen) == 25
+    assert {row["id"] for row in seen} == ids
+    assert [row["id"] for row in seen] == sorted(ids)
+    assert all(set(row) == {"id", "title"} for row in seen)
+
+
+def test_list_defaults_to_one_page(client):
+    for i in range(101):
+        client.post("/api/authors/", json={"name": f"작가 {i}"})
+    response = client.get("/api/authors/")
+    assert len(response.json()) == 100
+    assert response.headers.get("x-next-cursor") is not None
+
+
+def test_list_streams_every_row(client):
+    for i in range(3):
+        client.post("/api/authors/", json={"name": f"작가 {i}"})
+    response = client.get("/api/authors/", params={"stream": "ndjson"})
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
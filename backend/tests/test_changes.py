@@ -0,0 +1,45 @@
+from app.services.changes import ChangeLog, coalesce
+
+
+def test_since_returns_entries_after_seq():
+    log = ChangeLog(max_entries=10)
+    for i in range(3):
+        log.record("added", "node", f"n{i}")
+    assert [entry["id"] for entry in log.since(1)] == ["n1", "n2"]
+    assert log.since(3) == []
+
+
+def test_since_is_none_once_compacted_or_ahead():
+    log = ChangeLog(max_entries=2)
+    for i in range(5):
+        log.record("added", "node", f"n{i}")
+    assert log.compacted_through == 3
+    assert log.since(2) is None
+    assert [entry["id"] for entry in log.since(3)] == ["n3", "n4"]
+    assert log.since(6) is None
+
+
+def test_listeners_see_every_entry():
+    log = ChangeLog()
+    seen = []
+    log.subscribe(seen.append)
+    log.record("removed", "link", "r1")
+    assert seen == [{"seq": 1, "op": "removed", "kind": "link", "id": "r1", "data": None}]
+
+
+def _entry(op, kind, item_id, data=None):
+    return {"op": op, "kind": kind, "id": item_id, "data": data}
+
+
+def test_coalesce_folds_a_run_of_changes():
+    delta = coalesce([
+        _entry("added", "node", "a", {"v": 1}),
+        _entry("updated", "node", "a", {"v": 2}),
+        _entry("added", "node", "b", {"v": 1}),
+        _entry("removed", "node", "b"),
+        _entry("removed", "node", "c"),
+        _entry("added", "node", "c", {"v": 3}),
+        _entry("removed", "link", "r"),
+    ])
+    assert delta["nodes"] == {"added": [{"v": 2}], "updated": [{"v": 3}], "removed": []}
+    assert delta["links"] == {"added": [], "updated": [], "removed": ["r"]}
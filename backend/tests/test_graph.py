@@ -0,0 +1,143 @@
+import json
+import time
+
+import pytest
+
+from app.database import connection
+
+CATALOG = {
+    "authors": [
+        {"name": "호메로스", "nationality": "그리스"},
+        {"name": "카프카", "nationality": "체코"},
+    ],
+    "books": [
+        {"title": "일리아스", "publication_year": -750, "genre": "서사시"},
+        {"title": "변신", "publication_year": 1915, "genre": "소설"},
+        {"title": "성", "publication_year": 1926, "genre": "소설"},
+    ],
+    "relationships": [
+        {"source": "일리아스", "target": "호메로스", "type": "WRITTEN_BY"},
+        {"source": "변신", "target": "카프카", "type": "WRITTEN_BY"},
+        {"source": "성", "target": "카프카", "type": "WRITTEN_BY"},
+        {"source": "변신", "target": "성", "type": "SIMILAR_TO"},
+    ],
+}
+
+
+@pytest.fixture
+def catalog(client):
+    response = client.post(
+        "/api/relationships/import",
+        files={"file": ("catalog.json", json.dumps(CATALOG).encode(), "application/json")},
+    )
+    assert response.status_code == 200
+    return client
+
+
+def _labels(graph):
+    return sorted(node["label"] for node in graph["nodes"])
+
+
+@pytest.mark.parametrize("params, labels, links", [
+    ({}, ["변신", "성", "일리아스", "카프카", "호메로스"], 4),
+    ({"node_types": "Book"}, ["변신", "성", "일리아스"], 1),
+    ({"relation_types": "SIMILAR_TO"}, ["변신", "성", "일리아스", "카프카", "호메로스"], 1),
+    ({"year_from": 1920}, ["성", "카프카", "호메로스"], 1),
+    ({"genre": "소설", "nationality": "그리스"}, ["변신", "성", "호메로스"], 1),
+])
+def test_filters_return_a_consistent_subgraph(catalog, params, labels, links):
+    for stream in (False, True):
+        response = catalog.get("/api/graph", params={**params, **({"stream": "ndjson"} if stream else {})})
+        assert response.status_code == 200
+        if stream:
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            graph = {
+                "nodes": [line for line in lines if line["kind"] == "node"],
+                "links": [line for line in lines if line["kind"] == "link"],
+            }
+            assert lines[-1] == {"kind": "end", "nodes": len(graph["nodes"]), "links": len(graph["links"])}
+        else:
+            graph = response.json()
+        ids = {node["id"] for node in graph["nodes"]}
+        assert _labels(graph) == labels
+        assert len(graph["links"]) == links
+        assert all(link["source"] in ids and link["target"] in ids for link in graph["links"])
+
+
+def test_rejects_unknown_types_and_inverted_year_range(catalog):
+    assert catalog.get("/api/graph", params={"node_types": "Planet"}).status_code == 400
+    assert catalog.get("/api/graph", params={"year_from": 2000, "year_to": 1900}).status_code == 400
+
+
+def test_etag_changes_with_every_write(catalog):
+    first = catalog.get("/api/graph")
+    etag = first.headers["etag"]
+    assert catalog.get("/api/graph", headers={"If-None-Match": etag}).status_code == 304
+
+    catalog.post("/api/books/", json={"title": "소송"})
+    second = catalog.get("/api/graph", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+
+
+def test_changes_replay_writes_since_a_snapshot(catalog):
+    snapshot = catalog.get("/api/graph")
+    epoch, seq = snapshot.headers["x-graph-epoch"], int(snapshot.headers["x-graph-seq"])
+    book = catalog.post("/api/books/", json={"title": "소송"}).json()
+
+    delta = catalog.get("/api/graph/changes", params={"since": seq, "epoch": epoch}).json()
+    assert not delta["full"]
+    assert [node["id"] for node in delta["nodes"]["added"]] == [book["id"]]
+
+    for params in ({"since": 0, "epoch": "other"}, {"since": seq}):
+        full = catalog.get("/api/graph/changes", params=params).json()
+        assert full["full"]
+        assert len(full["graph"]["nodes"]) == 6
+
+
+def test_layout_is_computed_in_the_background(catalog):
+    pending = catalog.get("/api/graph", params={"layout": True})
+    assert pending.headers["x-layout"] == "pending"
+    assert all("x" not in node for node in pending.json()["nodes"])
+
+    for _ in range(50):
+        response = catalog.get("/api/graph", params={"layout": True})
+        if "x-layout" not in response.headers:
+            break
+        time.sleep(0.1)
+    assert all({"x", "y", "z"} <= set(node) for node in response.json()["nodes"])
+
+
+def test_columnar_format_round_trips(catalog):
+    graph = catalog.get("/api/graph").json()
+    columnar = catalog.get("/api/graph", headers={"Accept": "application/vnd.book-topology.columnar+json"}).json()
+    assert columnar["nodes"]["id"] == [node["id"] for node in graph["nodes"]]
+    assert len(columnar["links"]["source"]) == len(graph["links"])
+
+
+def test_stream_drops_links_to_nodes_written_after_the_node_phase(catalog, monkeypatch):
+    repo = connection.memory_repository()
+    iter_graph_links = repo.iter_graph_links
+
+    async def write_between_phases(graph_filter):
+        author = next(node_id for node_id, (label, _) in repo.nodes.items() if label == "Author")
+        book = await repo.create_node("Book", {"title": "소송"})
+        await repo.create_relationship(book["id"], author, "WRITTEN_BY", {})
+        async for link in iter_graph_links(graph_filter):
+            yield link
+    monkeypatch.setattr(repo, "iter_graph_links", write_between_phases)
+
+    lines = [json.loads(line) for line in catalog.get("/api/graph", params={"stream": "ndjson"}).text.splitlines()]
+    ids = {line["id"] for line in lines if line["kind"] == "node"}
+    links = [line for line in lines if line["kind"] == "link"]
+    assert len(ids) == 5
+    assert len(links) == 4
+    assert all(link["source"] in ids and link["target"] in ids for link in links)
+    assert lines[-1] == {"kind": "end", "nodes": 5, "links": 4}
+
+
+def test_lean_subgraph_carries_only_present_keys(catalog):
+    seed = next(node["id"] for node in catalog.get("/api/graph").json()["nodes"] if node["label"] == "카프카")
+    subgraph = catalog.get("/api/graph/subgraph", params={"seeds": seed, "depth": 2}).json()
+    keys = {node["label"]: set(node["properties"]) for node in subgraph["nodes"]}
+    assert keys == {"카프카": {"id", "name"}, "변신": {"id", "title"}, "성": {"id", "title"}}
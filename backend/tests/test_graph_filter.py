@@ -0,0 +1,33 @@
+import pytest
+
+from app.database.repository import GraphFilter
+
+BOOK = {"id": "b", "title": "일리아스", "publication_year": 1900, "genre": "서사시"}
+AUTHOR = {"id": "a", "name": "호메로스", "nationality": "그리스"}
+
+
+def test_empty_filter_matches_everything():
+    graph_filter = GraphFilter()
+    assert not graph_filter.restricts_nodes()
+    assert graph_filter.matches("Book", BOOK)
+    assert graph_filter.matches("Era", {"id": "e", "name": "고대"})
+
+
+@pytest.mark.parametrize("graph_filter, book, author", [
+    (GraphFilter(node_types=["Book"]), True, False),
+    (GraphFilter(year_from=1900, year_to=1900), True, True),
+    (GraphFilter(year_from=1901), False, True),
+    (GraphFilter(year_to=1899), False, True),
+    (GraphFilter(genres=["서사시", "시"]), True, True),
+    (GraphFilter(genres=["소설"]), False, True),
+    (GraphFilter(nationalities=["그리스"]), True, True),
+    (GraphFilter(nationalities=["로마"]), True, False),
+])
+def test_attribute_filters_constrain_only_their_label(graph_filter, book, author):
+    assert graph_filter.restricts_nodes()
+    assert graph_filter.matches("Book", BOOK) is book
+    assert graph_filter.matches("Author", AUTHOR) is author
+
+
+def test_year_range_excludes_books_without_a_year():
+    assert not GraphFilter(year_from=0).matches("Book", {"id": "b", "title": "?"})
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+CATALOG = {
+    "authors": [{"name": "호메로스", "nationality": "그리스"}],
+    "books": [{"title": "일리아스", "publication_year": -750}],
+    "relationships": [{"source": "일리아스", "target": "호메로스", "type": "WRITTEN_BY"}],
+}
+
+
+def upload(client, content: bytes, filename: str = "catalog.json", **params):
+    return client.post(
+        "/api/relationships/import", params=params,
+        files={"file": (filename, content, "application/json")},
+    )
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_import_creates_nodes_and_links(client, stream):
+    response = upload(client, json.dumps(CATALOG).encode(), stream=stream)
+    assert response.status_code == 200
+    assert response.json()["imported"] == {"authors": 1, "books": 1, "relationships": 1}
+    graph = client.get("/api/graph").json()
+    assert len(graph["nodes"]) == 2
+    assert len(graph["links"]) == 1
+
+
+@pytest.mark.parametrize("content", [
+    b'{"authors": [{"name": "a"}',
+    b'[1, 2]',
+    b'{"authors":[{"name":"a"} {"name":"b"}]}',
+    b'{,"authors":[{"name":"a"},]}',
+])
+@pytest.mark.parametrize("stream", [False, True])
+def test_import_rejects_malformed_files(client, content, stream):
+    response = upload(client, content, stream=stream)
+    assert response.status_code == 400
+    assert client.get("/api/authors/").json() == []
+
+
+@pytest.mark.parametrize("filename, content, stream", [
+    ("catalog.json", b'{"authors": [{"name": "\xff\xfe"}]}', False),
+    ("catalog.json", b'{"authors": [{"name": "\xff\xfe"}]}', True),
+    ("catalog.ndjson", b'{"name": "a"}\n{"name": "\xc3"}\n', False),
+    ("catalog.ndjson", b'{"name": "\xe3\x81"}', False),
+])
+def test_import_rejects_invalid_utf8(client, filename, content, stream):
+    response = upload(client, content, filename, stream=stream)
+    assert response.status_code == 400
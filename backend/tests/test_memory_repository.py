@@ -0,0 +1,58 @@
+import asyncio
+
+from app.database.memory_repository import MemoryRepository, SqlitePersistence
+from app.database.repository import BatchOperation, GraphFilter
+
+
+def test_writes_survive_a_restart(tmp_path):
+    path = str(tmp_path / "store.db")
+    repo = MemoryRepository(SqlitePersistence(path))
+
+    async def write():
+        book = await repo.create_node("Book", {"title": "변신", "genre": None})
+        author = await repo.create_node("Author", {"name": "카프카"})
+        gone = await repo.create_node("Author", {"name": "삭제될 작가"})
+        link = await repo.create_relationship(book["id"], author["id"], "WRITTEN_BY", {})
+        await repo.create_relationship(book["id"], gone["id"], "WRITTEN_BY", {})
+        await repo.update_node("Book", book["id"], {"publication_year": 1915})
+        await repo.delete_node("Author", gone["id"])
+        return book, link
+    book, link = asyncio.run(write())
+    repo.close()
+
+    reopened = MemoryRepository(SqlitePersistence(path))
+    nodes, links = asyncio.run(reopened.load_graph(GraphFilter()))
+    assert sorted(properties.get("title", properties.get("name")) for _, properties in nodes) == ["변신", "카프카"]
+    assert asyncio.run(reopened.get_node("Book", book["id"])) == {"id": book["id"], "title": "변신", "publication_year": 1915}
+    assert [(found["source"], found["properties"]["id"]) for found in links] == [(book["id"], link["id"])]
+    reopened.close()
+
+
+def test_concurrent_writes_are_serialized(tmp_path):
+    repo = MemoryRepository(SqlitePersistence(str(tmp_path / "store.db")))
+
+    async def write():
+        book = await repo.create_node("Book", {"title": "책"})
+        await asyncio.gather(*(
+            repo.update_node("Book", book["id"], {f"field{i}": i}) for i in range(20)
+        ))
+        return await repo.get_node("Book", book["id"])
+    book = asyncio.run(write())
+    assert all(book[f"field{i}"] == i for i in range(20))
+    repo.close()
+
+
+def test_atomic_batch_writes_nothing_if_an_item_fails():
+    repo = MemoryRepository()
+    operations = [
+        BatchOperation("create_node", "new", "Book", {"id": "new", "title": "새 책"}),
+        BatchOperation("delete_node", "missing", "Book"),
+    ]
+    outcomes, committed = asyncio.run(repo.apply_batch(operations, atomic=True))
+    assert not committed
+    assert outcomes[1] is None
+    assert repo.nodes == {}
+
+    outcomes, committed = asyncio.run(repo.apply_batch(operations, atomic=False))
+    assert committed
+    assert list(repo.nodes) == ["new"]
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.database.memory_repository import MemoryRepository
+from app.services.natural_keys import NaturalKeyCache
+
+
+def _node_entry(op, node_id, label="Book", **properties):
+    data = None if op == "removed" else {"type": label, "properties": {"id": node_id, **properties}}
+    return {"op": op, "kind": "node", "id": node_id, "data": data}
+
+
+def _repository():
+    repo = MemoryRepository()
+
+    async def fill():
+        book = await repo.create_node("Book", {"title": "변신"})
+        author = await repo.create_node("Author", {"name": "카프카"})
+        twin = await repo.create_node("Era", {"name": "카프카"})
+        return book["id"], author["id"], twin["id"]
+    return repo, asyncio.run(fill())
+
+
+def test_warm_loads_every_key():
+    repo, (book, author, twin) = _repository()
+    cache = NaturalKeyCache()
+    asyncio.run(cache.warm(repo))
+    assert len(cache) == 3
+    assert cache.resolve("변신") == [(book, "Book")]
+    assert sorted(cache.resolve("카프카")) == sorted([(author, "Author"), (twin, "Era")])
+    assert cache.resolve("없음") == []
+
+
+def test_apply_tracks_renames_and_removals():
+    repo, (book, _, _) = _repository()
+    cache = NaturalKeyCache()
+    asyncio.run(cache.warm(repo))
+    cache.apply(_node_entry("updated", book, title="성"))
+    assert cache.resolve("변신") == []
+    assert cache.resolve("성") == [(book, "Book")]
+    cache.apply(_node_entry("removed", book))
+    assert cache.resolve("성") == []
+    cache.apply({"op": "added", "kind": "link", "id": "r", "data": {}})
+    assert len(cache) == 2
+
+
+def test_apply_is_ignored_until_warm():
+    cache = NaturalKeyCache()
+    cache.apply(_node_entry("added", "b", title="성"))
+    assert len(cache) == 0
+
+
+def test_lookup_warms_and_falls_back_to_the_repository():
+    repo, (book, _, _) = _repository()
+    cache = NaturalKeyCache()
+    assert asyncio.run(cache.lookup(repo, "변신")) == [(book, "Book")]
+    assert cache.ready
+
+    # Written behind the cache's back, e.g. by another process.
+    created = asyncio.run(repo.create_node("Book", {"title": "소송"}))
+    assert cache.resolve("소송") == []
+    assert asyncio.run(cache.lookup(repo, "소송")) == [(created["id"], "Book")]
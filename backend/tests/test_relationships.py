@@ -0,0 +1,67 @@
+def _create(client, path, **body):
+    return client.post(path, json=body).json()["id"]
+
+
+def test_connect_by_id_and_by_key(client):
+    book = _create(client, "/api/books/", title="변신")
+    author = _create(client, "/api/authors/", name="카프카")
+
+    by_id = client.post("/api/relationships/connect", json={
+        "source_id": book, "target_id": author, "relation_type": "WRITTEN_BY",
+    })
+    assert by_id.status_code == 200
+
+    era = _create(client, "/api/relationships/eras", name="모더니즘")
+    by_key = client.post("/api/relationships/connect", json={
+        "source_key": "변신", "target_key": "모더니즘", "relation_type": "BELONGS_TO_ERA",
+    })
+    assert by_key.status_code == 200
+    assert (by_key.json()["source_id"], by_key.json()["target_id"]) == (book, era)
+
+    assert client.delete(f"/api/relationships/connect/{by_id.json()['id']}").status_code == 200
+    assert len(client.get("/api/graph").json()["links"]) == 1
+
+
+def test_connect_rejects_unknown_and_ambiguous_keys(client):
+    _create(client, "/api/books/", title="변신")
+    author = _create(client, "/api/authors/", name="카프카")
+    _create(client, "/api/relationships/eras", name="카프카")
+
+    def connect(**endpoints):
+        return client.post("/api/relationships/connect", json={"relation_type": "WRITTEN_BY", **endpoints})
+
+    assert connect(source_key="변신", source_id=author, target_id=author).status_code == 400
+    assert connect(source_key="없는 책", target_id=author).status_code == 404
+    ambiguous = connect(source_key="변신", target_key="카프카")
+    assert ambiguous.status_code == 409
+    assert {match["type"] for match in ambiguous.json()["detail"]["matches"]} == {"Author", "Era"}
+
+
+def test_batch_creates_nodes_and_links_by_ref(client):
+    result = client.post("/api/relationships/batch", json={
+        "nodes": [
+            {"ref": "b", "type": "Book", "properties": {"title": "변신"}},
+            {"ref": "a", "type": "Author", "properties": {"name": "카프카"}},
+        ],
+        "create": [{"source_ref": "b", "target_ref": "a", "relation_type": "WRITTEN_BY"}],
+    }).json()
+    assert result["committed"]
+    assert all(item["ok"] for item in result["results"])
+    graph = client.get("/api/graph").json()
+    assert (len(graph["nodes"]), len(graph["links"])) == (2, 1)
+
+
+def test_atomic_batch_is_all_or_nothing(client):
+    batch = {"create": [{"title": "새 책"}], "delete": ["missing"]}
+
+    result = client.post("/api/books/batch", params={"atomic": True}, json=batch).json()
+    assert not result["committed"]
+    assert [item["error"] for item in result["results"]] == [
+        "Not applied: the batch was rolled back", "Book not found",
+    ]
+    assert client.get("/api/books/").json() == []
+
+    result = client.post("/api/books/batch", json=batch).json()
+    assert result["committed"]
+    assert [item["ok"] for item in result["results"]] == [True, False]
+    assert [book["title"] for book in client.get("/api/books/").json()] == ["새 책"]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from app.services.streaming import CatalogParseError, JsonCatalogParser, NdjsonCatalogParser
+
+
+def parse(parser, text: str, chunk_size: int) -> list[tuple[str, dict]]:
+    items = []
+    for start in range(0, len(text), chunk_size):
+        items.extend(parser.feed(text[start:start + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+CATALOG = {
+    "version": [1, {"nested": True}],
+    "authors": [{"name": "호메로스"}, {"name": "Sophocles", "nationality": "그리스"}],
+    "books": [],
+    "relationships": [{"source": "일리아스", "target": "호메로스", "type": "WRITTEN_BY"}],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 20])
+def test_json_parser_yields_items_in_order(chunk_size):
+    text = json.dumps(CATALOG, ensure_ascii=False, indent=2)
+    assert parse(JsonCatalogParser(), text, chunk_size) == [
+        ("authors", {"name": "호메로스"}),
+        ("authors", {"name": "Sophocles", "nationality": "그리스"}),
+        ("relationships", {"source": "일리아스", "target": "호메로스", "type": "WRITTEN_BY"}),
+    ]
+
+
+@pytest.mark.parametrize("text", ["{}", " { } ", '{"authors": []}', '{"authors": [ ], "books": []}'])
+def test_json_parser_accepts_empty_containers(text):
+    assert parse(JsonCatalogParser(), text, 1) == []
+
+
+@pytest.mark.parametrize("text", [
+    '{"authors":[{"name":"a"} {"name":"b"}]}',
+    '{,"authors":[{"name":"a"}]}',
+    '{"authors":[{"name":"a"},]}',
+    '{"authors":[,{"name":"a"}]}',
+    '{"authors":[]  "books":[]}',
+    '{"version":1,}',
+    '{"version":1 "authors":[]}',
+    '{"authors":[{"name":"a"}]',
+    '{"authors":[{"name":"a"}]} []',
+    '[{"name":"a"}]',
+])
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_json_parser_rejects_what_json_loads_rejects(text, chunk_size):
+    if text.startswith("{"):
+        with pytest.raises(ValueError):
+            json.loads(text)
+    with pytest.raises(CatalogParseError):
+        parse(JsonCatalogParser(), text, chunk_size)
+
+
+def test_json_parser_reports_file_offset():
+    text = '{"authors":[' + '{"name":"a"},' * 10 + '{"name":"b"} {"name":"c"}]}'
+    with pytest.raises(CatalogParseError, match=f"offset {text.index(' {')+1}"):
+        parse(JsonCatalogParser(), text, 7)
+
+
+def test_ndjson_parser_infers_phases():
+    text = '\n'.join([
+        '{"name": "호메로스"}',
+        '{"title": "일리아스"}',
+        '',
+        '{"source": "일리아스", "target": "호메로스", "type": "WRITTEN_BY"}',
+        '{"kind": "author", "title": "not a book"}',
+    ])
+    assert [phase for phase, _ in parse(NdjsonCatalogParser(), text, 4)] == [
+        "authors", "books", "relationships", "authors",
+    ]
+
+
+@pytest.mark.parametrize("line", ['{"name": "a"', '{"pages": 3}', '[1, 2]'])
+def test_ndjson_parser_rejects_bad_lines(line):
+    with pytest.raises(CatalogParseError, match="Line 2"):
+        parse(NdjsonCatalogParser(), '{"name": "ok"}\n' + line + "\n", 1 << 20)
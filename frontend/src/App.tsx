@@ -1,11 +1,11 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { Graph3D } from './components/Graph3D/Graph3D';
 import { FilterPanel } from './components/FilterPanel/FilterPanel';
 import { DetailPanel } from './components/DetailPanel/DetailPanel';
 import { BookForm } from './components/BookForm/BookForm';
 import { GraphSettings, type GraphSettingsValues } from './components/GraphSettings';
-import { fetchGraphData, searchNodes } from './services/api';
-import type { GraphData, GraphNode, NodeType, RelationType } from './types';
+import { searchNodes, streamGraphData } from './services/api';
+import type { GraphData, GraphLink, GraphNode, NodeType, RelationType } from './types';
 
 const defaultGraphSettings: GraphSettingsValues = {
   linkWidth: 3,
@@ -22,17 +22,39 @@ function App() {
   const [error, setError] = useState<string | null>(null);
   const [graphSettings, setGraphSettings] = useState<GraphSettingsValues>(defaultGraphSettings);
 
+  const loadGeneration = useRef(0);
+
   const loadGraphData = useCallback(async (nodeTypes?: NodeType[], relationTypes?: RelationType[]) => {
+    const generation = ++loadGeneration.current;
+    const current = () => generation === loadGeneration.current;
     setLoading(true);
     setError(null);
+
+    // Build the scene from the stream as nodes and links arrive, redrawing
+    // at most once per frame.
+    const nodes: GraphNode[] = [];
+    const links: GraphLink[] = [];
+    let frame: number | null = null;
+    const render = () => {
+      frame = null;
+      if (!current()) return;
+      setGraphData({ nodes: [...nodes], links: [...links] });
+      setLoading(false);
+    };
     try {
-      const data = await fetchGraphData(nodeTypes, relationTypes);
-      setGraphData(data);
+      await streamGraphData((batch) => {
+        nodes.push(...batch.nodes);
+        links.push(...batch.links);
+        frame ??= requestAnimationFrame(render);
+      }, nodeTypes, relationTypes);
+      if (frame !== null) cancelAnimationFrame(frame);
+      render();
     } catch (err) {
+      if (!current()) return;
       setError('데이터를 불러오는데 실패했습니다. 백엔드 서버가 실행 중인지 확인해주세요.');
       console.error(err);
     } finally {
-      setLoading(false);
+      if (current()) setLoading(false);
     }
   }, []);
 
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import type { GraphNode } from '../../types';
 import { NODE_COLORS, RELATION_LABELS } from '../../types';
-import { getNeighbors } from '../../services/api';
+import { getNeighbors, getNodeProperties } from '../../services/api';
 import './DetailPanel.css';
 
 interface Neighbor {
@@ -20,16 +20,35 @@ interface DetailPanelProps {
 
 export function DetailPanel({ node, onClose, onNodeSelect }: DetailPanelProps) {
   const [neighbors, setNeighbors] = useState<Neighbor[]>([]);
+  const [properties, setProperties] = useState<Record<string, unknown>>({});
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
-    if (node) {
-      setLoading(true);
-      getNeighbors(node.id)
-        .then(setNeighbors)
-        .catch(console.error)
-        .finally(() => setLoading(false));
-    }
+    if (!node) return;
+    // Responses for a node that is no longer selected are ignored.
+    let cancelled = false;
+
+    // The graph payload omits properties; load them for the selected node.
+    setProperties(node.properties);
+    getNodeProperties(node.id)
+      .then((loaded) => {
+        if (!cancelled) setProperties(loaded);
+      })
+      .catch(console.error);
+
+    setLoading(true);
+    getNeighbors(node.id)
+      .then((loaded) => {
+        if (!cancelled) setNeighbors(loaded);
+      })
+      .catch(console.error)
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+
+    return () => {
+      cancelled = true;
+    };
   }, [node]);
 
   if (!node) return null;
@@ -51,7 +70,7 @@ export function DetailPanel({ node, onClose, onNodeSelect }: DetailPanelProps) {
       </div>
 
       <div className="detail-properties">
-        {Object.entries(node.properties).map(([key, value]) => {
+        {Object.entries(properties).map(([key, value]) => {
           if (key === 'id' || key === 'title' || key === 'name' || value == null) return null;
           return (
             <div key={key} className="property">
@@ -136,8 +136,15 @@ export function Graph3D({ data, onNodeClick, highlightNodeId, focusNodeId, setti
 
   useEffect(() => {
     if (graphRef.current && data) {
+      // Reuse the simulation's node objects so nodes already on screen keep
+      // their positions while a streamed graph grows.
+      // eslint-disable-next-line @typescript-eslint/no-explicit-any
+      const previous = new Map(graphRef.current.graphData().nodes.map((n: any) => [n.id, n]));
       graphRef.current.graphData({
-        nodes: data.nodes.map((n) => ({ ...n })),
+        nodes: data.nodes.map((n) => {
+          const node = previous.get(n.id);
+          return node ? Object.assign(node, n) : { ...n };
+        }),
         links: data.links.map((l) => ({ ...l })),
       });
     }
@@ -1,37 +1,168 @@
-import type { GraphData, Book, Author } from '../types';
+import type {
+  GraphData, GraphNode, GraphLink, GraphStreamLine, GraphAttributeFilter, ColumnarGraphData, SubgraphData,
+  Book, Author,
+} from '../types';
 
 const API_BASE = import.meta.env.VITE_API_URL || '/api';
 
-export async function fetchGraphData(
+const COLUMNAR_MEDIA_TYPE = 'application/vnd.book-topology.columnar+json';
+
+const BOOKMARKS_HEADER = 'X-Neo4j-Bookmarks';
+
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+const MAX_PAGE_SIZE = 1000;
+
+// Bookmarks of the latest committed write, sent with every request so a
+// read served by a read replica still sees it.
+let bookmarks: string | null = null;
+
+async function apiFetch(input: string, init: RequestInit = {}): Promise<Response> {
+  const headers = new Headers(init.headers);
+  if (bookmarks) headers.set(BOOKMARKS_HEADER, bookmarks);
+  const response = await fetch(input, { ...init, headers });
+  bookmarks = response.headers.get(BOOKMARKS_HEADER) ?? bookmarks;
+  return response;
+}
+
+function decodeColumnarGraph(data: ColumnarGraphData): GraphData {
+  const { nodes, links } = data;
+  return {
+    nodes: nodes.id.map((id, i) => ({
+      id,
+      label: nodes.label[i],
+      type: data.node_types[nodes.type[i]],
+      properties: nodes.properties?.[i] ?? {},
+      ...(nodes.x?.[i] != null && { x: nodes.x[i]!, y: nodes.y![i]!, z: nodes.z![i]! }),
+    })),
+    links: links.source.map((source, i) => ({
+      source: nodes.id[source],
+      target: nodes.id[links.target[i]],
+      type: data.relation_types[links.type[i]],
+    })),
+  };
+}
+
+function setGraphFilter(
+  params: URLSearchParams,
   nodeTypes?: string[],
-  relationTypes?: string[]
-): Promise<GraphData> {
-  const params = new URLSearchParams();
+  relationTypes?: string[],
+  attributes?: GraphAttributeFilter
+) {
   if (nodeTypes?.length) params.set('node_types', nodeTypes.join(','));
   if (relationTypes?.length) params.set('relation_types', relationTypes.join(','));
+  if (attributes?.yearFrom != null) params.set('year_from', String(attributes.yearFrom));
+  if (attributes?.yearTo != null) params.set('year_to', String(attributes.yearTo));
+  if (attributes?.genres?.length) params.set('genre', attributes.genres.join(','));
+  if (attributes?.nationalities?.length) params.set('nationality', attributes.nationalities.join(','));
+}
+
+export async function fetchGraphData(
+  nodeTypes?: string[],
+  relationTypes?: string[],
+  attributes?: GraphAttributeFilter
+): Promise<GraphData> {
+  // Start the simulation from the server's precomputed layout.
+  const params = new URLSearchParams({ layout: 'true' });
+  setGraphFilter(params, nodeTypes, relationTypes, attributes);
 
-  const queryString = params.toString();
-  const url = queryString ? `${API_BASE}/graph?${queryString}` : `${API_BASE}/graph`;
-  const response = await fetch(url);
+  const url = `${API_BASE}/graph?${params}`;
+  const response = await apiFetch(url, { headers: { Accept: COLUMNAR_MEDIA_TYPE } });
   if (!response.ok) throw new Error('Failed to fetch graph data');
+  return decodeColumnarGraph(await response.json());
+}
+
+// Reads /api/graph as NDJSON and reports nodes and links in batches as
+// they arrive, so the scene can be built before the whole graph is loaded.
+export async function streamGraphData(
+  onBatch: (batch: GraphData) => void,
+  nodeTypes?: string[],
+  relationTypes?: string[],
+  attributes?: GraphAttributeFilter
+): Promise<void> {
+  const params = new URLSearchParams({ layout: 'true', stream: 'ndjson' });
+  setGraphFilter(params, nodeTypes, relationTypes, attributes);
+
+  const response = await apiFetch(`${API_BASE}/graph?${params}`);
+  if (!response.ok || !response.body) throw new Error('Failed to fetch graph data');
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  let complete = false;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    const lines = buffer.split('\n');
+    buffer = lines.pop() ?? '';
+    const batch: GraphData = { nodes: [], links: [] };
+    for (const line of lines) {
+      if (!line) continue;
+      const { kind, ...item } = JSON.parse(line) as GraphStreamLine;
+      if (kind === 'node') batch.nodes.push(item as GraphNode);
+      else if (kind === 'link') batch.links.push(item as GraphLink);
+      else complete = true;
+    }
+    if (batch.nodes.length || batch.links.length) onBatch(batch);
+  }
+  if (!complete) throw new Error('Graph stream ended early');
+}
+
+export async function fetchSubgraph(
+  seeds: string[],
+  depth = 1,
+  maxNodes = 200,
+  relationTypes?: string[]
+): Promise<SubgraphData> {
+  const params = new URLSearchParams({
+    seeds: seeds.join(','),
+    depth: String(depth),
+    max_nodes: String(maxNodes),
+  });
+  if (relationTypes?.length) params.set('relation_types', relationTypes.join(','));
+
+  const response = await apiFetch(`${API_BASE}/graph/subgraph?${params}`);
+  if (!response.ok) throw new Error('Failed to fetch subgraph');
   return response.json();
 }
 
+export async function getNodeProperties(nodeId: string): Promise<Record<string, unknown>> {
+  const response = await apiFetch(`${API_BASE}/graph/properties?ids=${encodeURIComponent(nodeId)}`);
+  if (!response.ok) throw new Error('Failed to get node properties');
+  const properties: Record<string, Record<string, unknown>> = await response.json();
+  return properties[nodeId] ?? {};
+}
+
 export async function searchNodes(query: string) {
-  const response = await fetch(`${API_BASE}/graph/search?query=${encodeURIComponent(query)}`);
+  const response = await apiFetch(`${API_BASE}/graph/search?query=${encodeURIComponent(query)}`);
   if (!response.ok) throw new Error('Search failed');
   return response.json();
 }
 
 export async function getNeighbors(nodeId: string) {
-  const response = await fetch(`${API_BASE}/graph/neighbors/${nodeId}`);
+  const response = await apiFetch(`${API_BASE}/graph/neighbors/${nodeId}`);
   if (!response.ok) throw new Error('Failed to get neighbors');
   return response.json();
 }
 
+// List endpoints return one page at a time and the cursor of the next page
+// in X-Next-Cursor; follow it until the last page.
+async function fetchAllPages<T>(url: string, error: string): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: String(MAX_PAGE_SIZE) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await apiFetch(`${url}?${params}`);
+    if (!response.ok) throw new Error(error);
+    rows.push(...(await response.json()));
+    cursor = response.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+  return rows;
+}
+
 // Books API
 export async function createBook(book: Omit<Book, 'id'>): Promise<Book> {
-  const response = await fetch(`${API_BASE}/books`, {
+  const response = await apiFetch(`${API_BASE}/books/`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(book),
@@ -41,19 +172,17 @@ export async function createBook(book: Omit<Book, 'id'>): Promise<Book> {
 }
 
 export async function getBooks(): Promise<Book[]> {
-  const response = await fetch(`${API_BASE}/books`);
-  if (!response.ok) throw new Error('Failed to fetch books');
-  return response.json();
+  return fetchAllPages<Book>(`${API_BASE}/books/`, 'Failed to fetch books');
 }
 
 export async function deleteBook(id: string): Promise<void> {
-  const response = await fetch(`${API_BASE}/books/${id}`, { method: 'DELETE' });
+  const response = await apiFetch(`${API_BASE}/books/${id}`, { method: 'DELETE' });
   if (!response.ok) throw new Error('Failed to delete book');
 }
 
 // Authors API
 export async function createAuthor(author: Omit<Author, 'id'>): Promise<Author> {
-  const response = await fetch(`${API_BASE}/authors`, {
+  const response = await apiFetch(`${API_BASE}/authors/`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(author),
@@ -63,9 +192,7 @@ export async function createAuthor(author: Omit<Author, 'id'>): Promise<Author>
 }
 
 export async function getAuthors(): Promise<Author[]> {
-  const response = await fetch(`${API_BASE}/authors`);
-  if (!response.ok) throw new Error('Failed to fetch authors');
-  return response.json();
+  return fetchAllPages<Author>(`${API_BASE}/authors/`, 'Failed to fetch authors');
 }
 
 // Relationships API
@@ -74,7 +201,7 @@ export async function createRelationship(
   targetId: string,
   relationType: string
 ): Promise<void> {
-  const response = await fetch(`${API_BASE}/relationships/connect`, {
+  const response = await apiFetch(`${API_BASE}/relationships/connect`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({
@@ -91,7 +218,7 @@ export async function importData(file: File): Promise<{ imported: Record<string,
   const formData = new FormData();
   formData.append('file', file);
 
-  const response = await fetch(`${API_BASE}/relationships/import`, {
+  const response = await apiFetch(`${API_BASE}/relationships/import`, {
     method: 'POST',
     body: formData,
   });
@@ -14,6 +14,9 @@ export interface GraphNode {
   label: string;
   type: NodeType;
   properties: Record<string, unknown>;
+  x?: number;
+  y?: number;
+  z?: number;
 }
 
 export interface GraphLink {
@@ -28,6 +31,47 @@ export interface GraphData {
   links: GraphLink[];
 }
 
+export interface SubgraphData extends GraphData {
+  frontier: string[];
+  truncated: boolean;
+}
+
+// Attribute filters applied by the server when loading the graph: the year
+// range and genres restrict books, nationalities restrict authors.
+export interface GraphAttributeFilter {
+  yearFrom?: number;
+  yearTo?: number;
+  genres?: string[];
+  nationalities?: string[];
+}
+
+// One line of /api/graph?stream=ndjson: nodes, then links, then "end".
+export type GraphStreamLine =
+  | ({ kind: 'node' } & GraphNode)
+  | ({ kind: 'link' } & GraphLink)
+  | { kind: 'end'; nodes: number; links: number };
+
+// Compact /api/graph payload: parallel arrays, links as node indexes.
+export interface ColumnarGraphData {
+  format: 'columnar-v1';
+  node_types: NodeType[];
+  relation_types: string[];
+  nodes: {
+    id: string[];
+    label: string[];
+    type: number[];
+    properties?: Record<string, unknown>[];
+    x?: (number | null)[];
+    y?: (number | null)[];
+    z?: (number | null)[];
+  };
+  links: {
+    source: number[];
+    target: number[];
+    type: number[];
+  };
+}
+
 export interface Book {
   id: string;
   title: string;